@@ -8,6 +8,7 @@ import argparse
 import hashlib
 import os
 import shutil
+import sqlite3
 import subprocess
 import sys
 from pathlib import Path
@@ -15,6 +16,11 @@ from typing import Dict, List, Optional, Tuple
 
 import yaml
 
+# Shared registry tooling lives alongside the build scripts
+SCRIPTS_DIR = Path(__file__).resolve().parent / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
 
 class AILeyManager:
     """Main class for managing AI-LEY repositories and content."""
@@ -27,6 +33,7 @@ class AILeyManager:
         self.shared_dir = self.base_dir / ".ai-ley" / "shared"
         self.builder_dir = self.base_dir / ".ai-ley" / "builder"
         self.docs_dir = self.base_dir / ".ai-ley" / "docs"
+        self.registry_db = self.shared_dir / "variables" / "registry.db"
         
         # Ensure directories exist
         self.external_dir.mkdir(parents=True, exist_ok=True)
@@ -156,28 +163,57 @@ class AILeyManager:
         
         return False
     
+    def _get_folder_tree(self, folder_path: Path, dir_name: str) -> Dict:
+        """Build a Merkle tree for a folder, reusing cached hashes for files whose stat is unchanged.
+        
+        Files already hashed by the registry builders (content facet cache) or listed
+        in the md5sums manifests are not read again.
+        """
+        from content_scanner import ContentScanner, default_cache_path
+        from md5sums import ManifestHashCache
+        from merkle_digest import build_tree, load_digest, save_digest
+        
+        cache_key = hashlib.md5(str(folder_path.resolve()).encode('utf-8')).hexdigest()
+        cache_path = self.external_dir / ".digests" / f"{cache_key}.json"
+        
+        previous = load_digest(cache_path)
+        with ContentScanner(self.base_dir, cache_path=default_cache_path(self.base_dir),
+                            hash_cache=ManifestHashCache(self.shared_dir)) as scanner:
+            tree = build_tree(
+                folder_path,
+                skip=lambda path: self._should_skip_file(Path(path), dir_name),
+                previous=previous,
+                hash_cache=scanner.hash_lookup
+            )
+        if tree != previous:
+            save_digest(tree, cache_path)
+        return tree
+    
     def _get_folder_hashes(self, folder_path: Path) -> Dict[str, str]:
         """Get MD5 hashes for all files in a folder, excluding skipped files."""
-        hashes = {}
-        if not folder_path.exists():
-            return hashes
-        
-        # Determine directory name for skip logic
-        dir_name = folder_path.name
-        if folder_path.parent.name == ".ai-ley":
-            dir_name = folder_path.name  # builder, docs, shared
-        
-        for file_path in folder_path.rglob("*"):
-            if file_path.is_file():
-                relative_path = file_path.relative_to(folder_path)
-                
-                # Skip files that shouldn't be tracked
-                if self._should_skip_file(file_path, dir_name):
-                    continue
-                
-                hashes[str(relative_path)] = self._calculate_md5_hash(file_path)
+        from merkle_digest import iter_files
         
-        return hashes
+        if not folder_path.exists():
+            return {}
+        return dict(iter_files(self._get_folder_tree(folder_path, folder_path.name)))
+    
+    def _get_changed_files(self, source_dir: Path, target_dir: Path, dir_name: str) -> List[str]:
+        """List files that are new or modified in source_dir relative to target_dir.
+        
+        Root digests are compared first; only subtrees whose digests differ are descended.
+        """
+        from merkle_digest import diff_trees
+        
+        source_tree = self._get_folder_tree(source_dir, dir_name)
+        target_tree = self._get_folder_tree(target_dir, dir_name)
+        if source_tree['digest'] == target_tree['digest']:
+            return []
+        
+        return sorted(
+            relative_path
+            for status, relative_path in diff_trees(target_tree, source_tree)
+            if status != 'removed'
+        )
     
     def update_shared_content(self) -> None:
         """Update AI-LEY content from ai-ley repository (shared, builder, docs)."""
@@ -205,23 +241,15 @@ class AILeyManager:
             
             target_dir.mkdir(parents=True, exist_ok=True)
             
-            # Get hashes for comparison
-            source_hashes = self._get_folder_hashes(source_dir)
-            target_hashes = self._get_folder_hashes(target_dir)
-            
             updated_count = 0
-            for relative_path, source_hash in source_hashes.items():
+            for relative_path in self._get_changed_files(source_dir, target_dir, content_type):
                 source_file = source_dir / relative_path
                 target_file = target_dir / relative_path
                 
-                # Update if file doesn't exist or hash differs
-                if (not target_file.exists() or 
-                    target_hashes.get(relative_path) != source_hash):
-                    
-                    target_file.parent.mkdir(parents=True, exist_ok=True)
-                    shutil.copy2(source_file, target_file)
-                    updated_count += 1
-                    print(f"Updated: {content_type}/{relative_path}")
+                target_file.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(source_file, target_file)
+                updated_count += 1
+                print(f"Updated: {content_type}/{relative_path}")
             
             if updated_count == 0:
                 print(f"No updates needed for {content_type}")
@@ -254,23 +282,15 @@ class AILeyManager:
         
         target_dir.mkdir(parents=True, exist_ok=True)
         
-        # Get hashes for comparison
-        source_hashes = self._get_folder_hashes(source_dir)
-        target_hashes = self._get_folder_hashes(target_dir)
-        
         updated_count = 0
-        for relative_path, source_hash in source_hashes.items():
+        for relative_path in self._get_changed_files(source_dir, target_dir, dir_name):
             source_file = source_dir / relative_path
             target_file = target_dir / relative_path
             
-            # Update if file doesn't exist or hash differs
-            if (not target_file.exists() or 
-                target_hashes.get(relative_path) != source_hash):
-                
-                target_file.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(source_file, target_file)
-                updated_count += 1
-                print(f"Updated: {dir_name}/{relative_path}")
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source_file, target_file)
+            updated_count += 1
+            print(f"Updated: {dir_name}/{relative_path}")
         
         if updated_count == 0:
             print(f"No updates needed for {dir_name}")
@@ -314,22 +334,14 @@ class AILeyManager:
                 
                 target_dir.mkdir(parents=True, exist_ok=True)
                 
-                # Get hashes for comparison
-                source_hashes = self._get_folder_hashes(source_dir)
-                target_hashes = self._get_folder_hashes(target_dir)
-                
-                for relative_path, source_hash in source_hashes.items():
+                for relative_path in self._get_changed_files(source_dir, target_dir, content_type):
                     source_file = source_dir / relative_path
                     target_file = target_dir / relative_path
                     
-                    # Update if file doesn't exist or hash differs
-                    if (not target_file.exists() or 
-                        target_hashes.get(relative_path) != source_hash):
-                        
-                        target_file.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copy2(source_file, target_file)
-                        changes_made = True
-                        print(f"Staged for contribution: shared/{content_type}/{relative_path}")
+                    target_file.parent.mkdir(parents=True, exist_ok=True)
+                    shutil.copy2(source_file, target_file)
+                    changes_made = True
+                    print(f"Staged for contribution: shared/{content_type}/{relative_path}")
             
             # Contribute builder directory
             source_builder = local_ai_ley_base / "builder"
@@ -374,23 +386,15 @@ class AILeyManager:
         
         target_dir.mkdir(parents=True, exist_ok=True)
         
-        # Get hashes for comparison
-        source_hashes = self._get_folder_hashes(source_dir)
-        target_hashes = self._get_folder_hashes(target_dir)
-        
         changes_made = False
-        for relative_path, source_hash in source_hashes.items():
+        for relative_path in self._get_changed_files(source_dir, target_dir, dir_name):
             source_file = source_dir / relative_path
             target_file = target_dir / relative_path
             
-            # Update if file doesn't exist or hash differs
-            if (not target_file.exists() or 
-                target_hashes.get(relative_path) != source_hash):
-                
-                target_file.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(source_file, target_file)
-                changes_made = True
-                print(f"Staged for contribution: {dir_name}/{relative_path}")
+            target_file.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(source_file, target_file)
+            changes_made = True
+            print(f"Staged for contribution: {dir_name}/{relative_path}")
         
         return changes_made
     
@@ -427,6 +431,9 @@ class AILeyManager:
             print(f"No portable folders configured for '{repo_name}'.")
             return
         
+        ported_files = []
+        replaced_dirs = []
+        
         for folder_mapping in folders:
             if ':' not in folder_mapping:
                 print(f"Invalid folder mapping format: {folder_mapping}")
@@ -445,15 +452,110 @@ class AILeyManager:
                 
                 if source_path.is_file():
                     shutil.copy2(source_path, target_path)
+                    ported_files.append(target_path)
                     print(f"Ported file: {source_rel} -> {target_rel}")
                 else:
                     if target_path.exists():
                         shutil.rmtree(target_path)
                     shutil.copytree(source_path, target_path)
+                    ported_files.extend(p for p in target_path.rglob('*') if p.is_file())
+                    replaced_dirs.append(target_path.relative_to(self.base_dir).as_posix())
                     print(f"Ported directory: {source_rel} -> {target_rel}")
                     
             except OSError as e:
                 print(f"Error porting {source_rel} -> {target_rel}: {e}")
+        
+        if ported_files:
+            self._register_ported_files(repo_name, ported_files, replaced_dirs)
+    
+    def _register_ported_files(self, repo_name: str, ported_files: List[Path], replaced_dirs: List[str]) -> None:
+        """Record provenance for just-ported files and upsert them into the registry."""
+        from registry_ingest import ingest_files, record_ported_sources
+        
+        rel_paths = [p.relative_to(self.base_dir).as_posix() for p in ported_files]
+        record_ported_sources(self.base_dir, rel_paths, repo_name, replaced_dirs)
+        
+        if not self.registry_db.exists():
+            return
+        try:
+            counts = ingest_files(self.registry_db, self.base_dir, rel_paths, repo_name, replaced_dirs)
+        except sqlite3.Error as e:
+            print(f"Warning: could not index ported content ({e})")
+            return
+        for section, count in counts.items():
+            print(f"📇 Indexed {count} {section} from {repo_name}")
+
+    def query_registry(self, expression: str, output_format: str = "table") -> bool:
+        """Query the SQLite registry with the filter DSL and print the results."""
+        from registry_query import QueryError, Registry, write_results
+        
+        if not self.registry_db.exists():
+            print(f"Error: Registry database not found at {self.registry_db}", file=sys.stderr)
+            return False
+        
+        try:
+            with Registry(self.registry_db) as registry:
+                write_results(registry.query(expression), output_format)
+            return True
+        except QueryError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return False
+        except sqlite3.OperationalError as e:
+            print(f"Error: Registry database is out of date ({e}). "
+                  "Rebuild it with scripts/create_sqlite_registry.py", file=sys.stderr)
+            return False
+
+    def build_context_pack(self, task: str, budget: int) -> bool:
+        """Print the persona and instruction sections that best fit a task within a token budget."""
+        from context_pack import build_pack
+        
+        if not self.registry_db.exists():
+            print(f"Error: Registry database not found at {self.registry_db}")
+            return False
+        if budget <= 0:
+            print("Error: --budget must be a positive number of tokens")
+            return False
+        
+        try:
+            pack, stats = build_pack(self.registry_db, self.base_dir, task, budget)
+        except sqlite3.OperationalError as e:
+            print(f"Error: Registry database is out of date ({e}). "
+                  "Rebuild it with scripts/build_registry_phase3_sqlite.py")
+            return False
+        sys.stdout.write(pack)
+        print(f"📦 Packed {stats['sections']} sections from {stats['items']} items: "
+              f"{stats['tokens']}/{stats['budget']} tokens in {stats['elapsed_ms']:.0f}ms", file=sys.stderr)
+        return True
+
+    def export_prompts(self, force: bool = False) -> None:
+        """Export shared prompts to .github/prompts, .claude/commands and .opencode/commands."""
+        from export_prompts import export_prompts
+        
+        result = export_prompts(self.base_dir, self.external_dir / ".exports.json", force=force)
+        for path in result['written']:
+            print(f"✅ Exported: {path}")
+        for path in result['pruned']:
+            print(f"🗑️  Pruned: {path}")
+        print(f"📤 Prompt export: {len(result['written'])} written, "
+              f"{result['skipped']} unchanged, {len(result['pruned'])} pruned")
+
+    def render_prompt(self, prompt: str) -> bool:
+        """Print a prompt with its folder-structure.yaml variables resolved."""
+        from variable_renderer import VariableRenderer
+        
+        prompt_path = Path(prompt)
+        if not prompt_path.exists():
+            prompt_path = self.shared_dir / "prompts" / f"{prompt.removesuffix('.md')}.md"
+        if not prompt_path.exists():
+            print(f"Error: Prompt not found: {prompt}")
+            return False
+        
+        renderer = VariableRenderer(self.shared_dir / "variables" / "folder-structure.yaml")
+        text, unresolved = renderer.render_file(prompt_path)
+        sys.stdout.write(text)
+        for name in unresolved:
+            print(f"Warning: unresolved variable {{{{{name}}}}}", file=sys.stderr)
+        return True
 
     def initialize_project(self) -> None:
         """Initialize a new project with AI-LEY structure."""
@@ -491,6 +593,7 @@ class AILeyManager:
         print("📥 Fetching latest AI-LEY content...")
         if self.fetch_repo("ai-ley"):
             self.update_shared_content()
+            self.export_prompts()
         else:
             print("⚠️  Could not fetch AI-LEY repository. Creating minimal structure.")
         
@@ -637,6 +740,44 @@ def main():
         help='Port content from a portable repository'
     )
     
+    parser.add_argument(
+        '--query',
+        metavar='FILTERS',
+        help="Query the registry, e.g. 'type=instructions tag=angular score>=4 sort=-score limit=10'"
+    )
+    
+    parser.add_argument(
+        '--pack',
+        metavar='TASK',
+        help="Print the persona and instruction sections that best fit a task, e.g. 'add oauth login to a react app'"
+    )
+    
+    parser.add_argument(
+        '--budget',
+        type=int,
+        default=8000,
+        help='Token budget for --pack (default: 8000)'
+    )
+    
+    parser.add_argument(
+        '--export-prompts',
+        action='store_true',
+        help='Export shared prompts to .github/prompts, .claude/commands and .opencode/commands'
+    )
+    
+    parser.add_argument(
+        '--render',
+        metavar='PROMPT',
+        help='Print a prompt (name or path) with folder-structure.yaml variables resolved'
+    )
+    
+    parser.add_argument(
+        '--format',
+        choices=['table', 'json', 'jsonl'],
+        default='table',
+        help='Output format for --query (default: table)'
+    )
+    
     args = parser.parse_args()
     
     # Show help if no arguments provided
@@ -659,6 +800,17 @@ def main():
             manager.contribute_changes()
         elif args.port:
             manager.port_content(args.port)
+        elif args.query is not None:
+            if not manager.query_registry(args.query, args.format):
+                sys.exit(1)
+        elif args.pack is not None:
+            if not manager.build_context_pack(args.pack, args.budget):
+                sys.exit(1)
+        elif args.export_prompts:
+            manager.export_prompts()
+        elif args.render:
+            if not manager.render_prompt(args.render):
+                sys.exit(1)
         else:
             parser.print_help()
             
@@ -1,19 +1,14 @@
-import hashlib
 import json
 import os
+import sqlite3
 
+from content_scanner import ContentScanner, default_cache_path
+from md5sums import ManifestHashCache
+from merkle_digest import DEFAULT_EXCLUDE_DIRS, build_tree, diff_trees, load_digest
+from registry_db import connect
+from registry_jsonl import iter_registry_jsonl
+from registry_refs import dependents
 
-def get_md5(file_path):
-    """Computes the MD5 hash of a file."""
-    hash_md5 = hashlib.md5()
-    try:
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except IOError as e:
-        print(f"Could not read file {file_path} for MD5 calculation: {e}")
-        return None
 
 def main():
     """
@@ -22,7 +17,12 @@ def main():
     """
     base_path = "/Users/blainemcdonnell/git/ai-ley/.ai-ley/shared"
     registry_path = os.path.join(base_path, "variables/registry.json")
+    jsonl_path = os.path.join(base_path, "variables/registry.jsonl")
+    digest_path = os.path.join(base_path, "variables/digest.json")
+    registry_db_path = os.path.join(base_path, "variables/registry.db")
     worklist_path = "/Users/blainemcdonnell/git/ai-ley/.project/WORKLIST.md"
+    # Manifest hashes stand in for files whose stat matches when they were last hashed
+    hash_cache = ManifestHashCache(base_path)
     
     folders_to_scan = {
         "personas": os.path.join(base_path, "personas"),
@@ -33,7 +33,13 @@ def main():
     }
 
     existing_registry = {}
-    if os.path.exists(registry_path):
+    # Phase 3 writes registry.jsonl by default and registry.json on request;
+    # compare against whichever was written last, streaming the JSONL
+    if os.path.exists(jsonl_path) and (
+            not os.path.exists(registry_path) or os.path.getmtime(jsonl_path) >= os.path.getmtime(registry_path)):
+        for item_type, name, metadata in iter_registry_jsonl(jsonl_path):
+            existing_registry.setdefault(item_type, {})[name] = {'md5sum': metadata.get('md5sum')}
+    elif os.path.exists(registry_path):
         try:
             with open(registry_path, 'r', encoding='utf-8') as f:
                 existing_registry = json.load(f)
@@ -42,30 +48,66 @@ def main():
             # Proceed with an empty registry if the file is corrupted
             existing_registry = {}
 
+    # Compare against the Merkle digest stored at the last registry build so only
+    # subtrees whose digests differ are considered (None means full scan)
+    changed_files = None
+    stored_tree = load_digest(digest_path)
+    if stored_tree is not None:
+        current_tree = build_tree(base_path, previous=stored_tree, exclude_dirs=DEFAULT_EXCLUDE_DIRS,
+                                  hash_cache=hash_cache)
+        if current_tree['digest'] == stored_tree['digest']:
+            changed_files = set()
+        else:
+            changed_files = {
+                os.path.join(base_path, relative_path)
+                for status, relative_path in diff_trees(stored_tree, current_tree)
+                if status != 'removed'
+            }
+        print(f"Digest check: {len(changed_files)} changed files since the last registry build")
+
     worklist = []
 
     for key, folder_path in folders_to_scan.items():
         if not os.path.isdir(folder_path):
             print(f"Warning: Folder for '{key}' not found at {folder_path}")
-            continue
-        for root, _, files in os.walk(folder_path):
-            for file in files:
-                if file in ["README.md", "CHANGES.md", ".gitkeep"]:
-                    continue
-                
-                file_path = os.path.join(root, file)
-                relative_path = os.path.relpath(file_path, "/Users/blainemcdonnell/git/ai-ley")
-                
-                file_md5 = get_md5(file_path)
-                if file_md5 is None:
-                    continue
-                
-                name = os.path.splitext(file)[0]
+    
+    scanner = ContentScanner(
+        base_path, folders_to_scan.values(), exclude_files=["README.md", "CHANGES.md", ".gitkeep"],
+        skip=(lambda file_path: file_path not in changed_files) if changed_files is not None else None,
+        cache_path=default_cache_path("/Users/blainemcdonnell/git/ai-ley"), hash_cache=hash_cache
+    )
+    with scanner:
+        for item in scanner:
+            relative_path = os.path.relpath(item.path, "/Users/blainemcdonnell/git/ai-ley")
+            
+            try:
+                file_md5 = item.md5
+            except OSError as e:
+                print(f"Could not read file {item.path} for MD5 calculation: {e}")
+                continue
+            
+            key = item.rel_path.split('/', 1)[0]
+            name = os.path.splitext(item.name)[0]
+
+            entry = existing_registry.get(key, {}).get(name)
+            
+            if not entry or entry.get("md5sum") != file_md5:
+                worklist.append(relative_path)
+    hash_cache.save()
 
-                entry = existing_registry.get(key, {}).get(name)
-                
-                if not entry or entry.get("md5sum") != file_md5:
-                    worklist.append(relative_path)
+    # Files that reference a changed file need re-deriving too
+    if worklist and os.path.exists(registry_db_path):
+        conn = connect(registry_db_path, readonly=True)
+        try:
+            affected = dependents(conn, worklist)
+        except sqlite3.OperationalError as e:
+            print(f"Skipping dependent propagation, registry.db is out of date: {e}")
+            affected = set()
+        finally:
+            conn.close()
+        added = sorted(affected - set(worklist))
+        worklist.extend(added)
+        print(f"Dependents added to worklist: {len(added)}")
 
     # Create .project directory if it doesn't exist
     os.makedirs(os.path.dirname(worklist_path), exist_ok=True)
@@ -3,6 +3,8 @@ from datetime import datetime
 
 import frontmatter
 
+from content_scanner import ContentScanner
+
 
 def process_file(file_path):
     """
@@ -83,14 +85,9 @@ def main():
             os.path.join(base_path, "schemas"),
             os.path.join(base_path, "policies"),
         ]
-        all_files = []
-        for folder in folders_to_scan:
-            if not os.path.isdir(folder):
-                continue
-            for root, _, files in os.walk(folder):
-                for file in files:
-                    if file not in ["README.md", "CHANGES.md", ".gitkeep"]:
-                        all_files.append(os.path.relpath(os.path.join(root, file), "/Users/blainemcdonnell/git/ai-ley"))
+        scanner = ContentScanner("/Users/blainemcdonnell/git/ai-ley", folders_to_scan,
+                                 exclude_files=["README.md", "CHANGES.md", ".gitkeep"])
+        all_files = [os.path.relpath(file_path, "/Users/blainemcdonnell/git/ai-ley") for file_path in scanner.paths()]
         
         with open(worklist_path, 'w', encoding='utf-8') as f:
             for item in all_files:
@@ -2,48 +2,39 @@
 """
 Phase 3: Generate JSON registry file from all processed files
 """
+import argparse
+import contextlib
 import os
-import hashlib
 import json
 import yaml
 from pathlib import Path
-import frontmatter
 
-def get_md5(filepath):
-    """Calculate MD5 hash of a file"""
-    hash_md5 = hashlib.md5()
-    try:
-        with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except Exception as e:
-        print(f"Error calculating MD5 for {filepath}: {e}")
-        return None
+from content_scanner import default_cache_path
+from md5sums import ManifestHashCache, update_manifests
+from merkle_digest import update_digest
+from registry_jsonl import JsonlRegistryWriter, iter_registry_jsonl
+from registry_ingest import (
+    determine_section as section_for_path, item_name, load_ported_sources, source_scanner
+)
+from registry_snapshot import write_snapshot, write_snapshot_from_registry
+
+# Manifest hashes are trusted for files whose stat matches when they were last hashed
+MANIFEST_CACHE = ManifestHashCache("/Users/blainemcdonnell/git/ai-ley/.ai-ley/shared")
 
-def extract_metadata(filepath):
+def extract_metadata(item):
     """Extract metadata from a file's frontmatter"""
     try:
-        # Try reading with utf-8 first
-        with open(filepath, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-    except UnicodeDecodeError:
-        try:
-            # If utf-8 fails, try with latin-1
-            with open(filepath, 'r', encoding='latin-1') as f:
-                post = frontmatter.load(f)
-        except Exception as e:
-            print(f"Error loading frontmatter from {filepath}: {e}")
-            return None
+        metadata = item.metadata()
     except Exception as e:
-        print(f"Error loading frontmatter from {filepath}: {e}")
+        print(f"Error loading frontmatter from {item.path}: {e}")
         return None
     
-    metadata = post.metadata.copy()
+    if not metadata.get('title'):
+        metadata['title'] = item.title
     
     # Add computed fields
-    metadata['path'] = os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley")
-    metadata['md5sum'] = get_md5(filepath)
+    metadata['path'] = os.path.relpath(item.path, "/Users/blainemcdonnell/git/ai-ley")
+    metadata['md5sum'] = item.md5
     
     # Ensure keywords is a list
     if 'keywords' in metadata and isinstance(metadata['keywords'], str):
@@ -55,52 +46,25 @@ def extract_metadata(filepath):
     
     return metadata
 
-def scan_folder(folder_path, exclude_files):
-    """Scan a folder recursively for files"""
-    files = []
-    if not os.path.exists(folder_path):
-        return files
-    
-    for root, dirs, filenames in os.walk(folder_path):
-        for filename in filenames:
-            if filename not in exclude_files and not filename.startswith('.'):
-                filepath = os.path.join(root, filename)
-                files.append(filepath)
-    
-    return files
-
 def determine_section(filepath):
     """Determine which section of the registry a file belongs to"""
-    rel_path = os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley")
-    
-    if '/personas/' in rel_path:
-        return 'personas'
-    elif '/instructions/' in rel_path:
-        return 'instructions'
-    elif '/workflows/' in rel_path:
-        return 'workflows'
-    elif '/schemas/' in rel_path:
-        return 'schemas'
-    elif '/prompts/' in rel_path:
-        return 'prompts'
-    elif '/policies/' in rel_path:
-        return 'policies'
-    else:
-        return 'unknown'
+    return section_for_path(os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley"))
 
 def get_item_name(filepath):
     """Generate a unique item name for the registry"""
-    rel_path = os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley")
-    
-    # Remove the base shared path and file extension
-    name = rel_path.replace('.ai-ley/shared/', '').replace('.md', '').replace('.yaml', '').replace('.yml', '')
-    
-    # Replace path separators with underscores to create unique names
-    name = name.replace('/', '_').replace('\\', '_')
-    
-    return name
+    return item_name(os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley"))
 
 def main():
+    parser = argparse.ArgumentParser(description="Phase 3: generate the registry from all processed files")
+    parser.add_argument(
+        '--format',
+        choices=['json', 'jsonl', 'both'],
+        default='jsonl',
+        help='Registry output: streaming registry.jsonl (default), indented registry.json, or both. '
+             'registry.json holds the whole registry in memory while scanning; only ask for it if something reads it'
+    )
+    args = parser.parse_args()
+    
     base_path = "/Users/blainemcdonnell/git/ai-ley"
     
     # Define folders to scan
@@ -110,53 +74,91 @@ def main():
         ".ai-ley/shared/workflows",
         ".ai-ley/shared/schemas",
         ".ai-ley/shared/prompts",
-        ".ai-ley/shared/policies"
+        ".ai-ley/shared/policies",
+        ".github/chatmodes"
     ]
     
     exclude_files = ["README.md", "CHANGES.md", ".gitkeep"]
+    ported_sources = load_ported_sources(base_path)
+    # One walk: frontmatter, titles and md5s come from a single read per changed file
+    scanner = source_scanner(base_path, folders_to_scan, exclude_files, ported_sources,
+                             cache_path=default_cache_path(base_path), hash_cache=MANIFEST_CACHE)
     registry_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.json")
+    jsonl_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.jsonl")
+    snapshot_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.snap")
+    digest_path = os.path.join(base_path, ".ai-ley/shared/variables/digest.json")
+    md5sums_dir = os.path.join(base_path, ".ai-ley/shared/md5sums")
+    write_json = args.format in ('json', 'both')
+    write_jsonl = args.format in ('jsonl', 'both')
+    
+    # Initialize registry structure (only held in memory for registry.json)
+    sections = ["personas", "instructions", "workflows", "schemas", "prompts", "policies", "chatmodes"]
+    registry = {section: {} for section in sections}
+    counts = {section: 0 for section in sections}
     
-    # Initialize registry structure
-    registry = {
-        "personas": {},
-        "instructions": {},
-        "workflows": {},
-        "schemas": {},
-        "prompts": {},
-        "policies": {}
-    }
-    
-    # Collect all files and process them
-    for folder in folders_to_scan:
-        folder_path = os.path.join(base_path, folder)
-        files = scan_folder(folder_path, exclude_files)
-        
-        for filepath in files:
-            section = determine_section(filepath)
-            if section == 'unknown':
-                print(f"Warning: Could not determine section for {filepath}")
-                continue
-                
-            metadata = extract_metadata(filepath)
-            if metadata is None:
-                print(f"Warning: Could not extract metadata from {filepath}")
-                continue
-            
-            item_name = get_item_name(filepath)
-            registry[section][item_name] = metadata
-    
-    # Write the registry
     os.makedirs(os.path.dirname(registry_path), exist_ok=True)
     
-    with open(registry_path, 'w', encoding='utf-8') as f:
-        json.dump(registry, f, indent=2, ensure_ascii=False)
-    
-    # Print summary
-    total_items = sum(len(section) for section in registry.values())
-    print(f"Phase 3 complete. Registry generated with {total_items} items:")
-    for section, items in registry.items():
-        print(f"  - {section}: {len(items)} items")
-    print(f"Registry written to: {registry_path}")
+    # Closing the scanner commits its facet cache, even if the build fails
+    with scanner, MANIFEST_CACHE:
+        # Collect all files and process them, streaming each item to JSONL as it is read
+        writer_context = JsonlRegistryWriter(jsonl_path) if write_jsonl else contextlib.nullcontext()
+        with writer_context as writer:
+            for item in scanner:
+                section = determine_section(item.path)
+                if section == 'unknown':
+                    print(f"Warning: Could not determine section for {item.path}")
+                    continue
+                
+                metadata = extract_metadata(item)
+                if metadata is None:
+                    print(f"Warning: Could not extract metadata from {item.path}")
+                    continue
+            
+                if metadata['path'] in ported_sources:
+                    metadata['sourceRepo'] = ported_sources[metadata['path']]
+            
+                item_name = get_item_name(item.path)
+                counts[section] += 1
+                if writer is not None:
+                    writer.write(section, item_name, metadata)
+                if write_json:
+                    registry[section][item_name] = metadata
+    
+        # Write the registry
+        if write_json:
+            with open(registry_path, 'w', encoding='utf-8') as f:
+                json.dump(registry, f, indent=2, ensure_ascii=False)
+    
+        # Write the compact binary snapshot for agent-side lookups. With JSONL it
+        # is read back from the stream, so items are not kept while scanning.
+        if write_jsonl:
+            write_snapshot(iter_registry_jsonl(jsonl_path), snapshot_path)
+        else:
+            write_snapshot_from_registry(registry, snapshot_path)
+    
+        # Record the content digest this registry was built from
+        _, tree = update_digest(os.path.join(base_path, ".ai-ley/shared"), digest_path, hash_cache=scanner.hash_lookup)
+    
+        # Refresh the md5sums manifests from the hashes computed above
+        items = iter_registry_jsonl(jsonl_path) if write_jsonl else (
+            (section, name, metadata) for section, entries in registry.items() for name, metadata in entries.items()
+        )
+        rewritten = update_manifests(
+            md5sums_dir, ((section, metadata['path'], metadata.get('md5sum')) for section, _, metadata in items)
+        )
+    
+        # Print summary
+        total_items = sum(counts.values())
+        print(f"Phase 3 complete. Registry generated with {total_items} items:")
+        for section, count in counts.items():
+            print(f"  - {section}: {count} items")
+        if write_json:
+            print(f"Registry written to: {registry_path}")
+        if write_jsonl:
+            print(f"JSONL registry written to: {jsonl_path}")
+        print(f"Snapshot written to: {snapshot_path}")
+        print(f"Digest {tree['digest']} written to: {digest_path}")
+        print(f"Manifests updated: {', '.join(rewritten) or 'none'}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
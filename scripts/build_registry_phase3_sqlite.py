@@ -3,48 +3,40 @@
 Phase 3: Generate SQLite registry database from all processed files
 """
 import os
-import hashlib
 import json
 import sqlite3
 from pathlib import Path
-import frontmatter
 from datetime import datetime
 
-def get_md5(filepath):
-    """Calculate MD5 hash of a file"""
-    hash_md5 = hashlib.md5()
-    try:
-        with open(filepath, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
-    except Exception as e:
-        print(f"Error calculating MD5 for {filepath}: {e}")
-        return None
+from generate_indexes import update_indexes
+from content_scanner import default_cache_path
+from md5sums import ManifestHashCache, update_manifests
+from merkle_digest import update_digest
+from registry_refs import refresh_references
+from registry_db import clear_registry, connect, create_schema, migrate_schema, optimize, parse_last_updated, upsert_item
+from registry_ingest import (
+    determine_section as section_for_path, item_name, load_ported_sources, source_scanner
+)
+from registry_snapshot import write_snapshot
+from token_counts import TokenCountRefresh
 
-def extract_metadata(filepath):
+# Manifest hashes are trusted for files whose stat matches when they were last hashed
+MANIFEST_CACHE = ManifestHashCache("/Users/blainemcdonnell/git/ai-ley/.ai-ley/shared")
+
+def extract_metadata(item):
     """Extract metadata from a file's frontmatter"""
     try:
-        # Try reading with utf-8 first
-        with open(filepath, 'r', encoding='utf-8') as f:
-            post = frontmatter.load(f)
-    except UnicodeDecodeError:
-        try:
-            # If utf-8 fails, try with latin-1
-            with open(filepath, 'r', encoding='latin-1') as f:
-                post = frontmatter.load(f)
-        except Exception as e:
-            print(f"Error loading frontmatter from {filepath}: {e}")
-            return None
+        metadata = item.metadata()
     except Exception as e:
-        print(f"Error loading frontmatter from {filepath}: {e}")
+        print(f"Error loading frontmatter from {item.path}: {e}")
         return None
     
-    metadata = post.metadata.copy()
+    if not metadata.get('title'):
+        metadata['title'] = item.title
     
     # Add computed fields
-    metadata['path'] = os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley")
-    metadata['md5sum'] = get_md5(filepath)
+    metadata['path'] = os.path.relpath(item.path, "/Users/blainemcdonnell/git/ai-ley")
+    metadata['md5sum'] = item.md5
     
     # Ensure keywords is a list
     if 'keywords' in metadata and isinstance(metadata['keywords'], str):
@@ -56,131 +48,19 @@ def extract_metadata(filepath):
     
     return metadata
 
-def create_schema(cursor):
-    """Create the registry database schema"""
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS registry_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        type TEXT NOT NULL,
-        name TEXT NOT NULL,
-        path TEXT UNIQUE NOT NULL,
-        title TEXT,
-        description TEXT,
-        version TEXT,
-        author TEXT,
-        last_updated DATETIME,
-        md5sum TEXT,
-        summary_score REAL,
-        apply_to TEXT, -- JSON array as string
-        keywords TEXT, -- JSON array as string  
-        extensions TEXT, -- JSON array as string
-        agent_mode TEXT,
-        instruction_type TEXT,
-        guidelines TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    );
-    """)
-    
-    # Create indexes for better query performance
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_type ON registry_items(type);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_path ON registry_items(path);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_title ON registry_items(title);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_score ON registry_items(summary_score);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_mode ON registry_items(agent_mode);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_instruction_type ON registry_items(instruction_type);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_last_updated ON registry_items(last_updated);")
-
-def scan_folder(folder_path, exclude_files):
-    """Scan a folder recursively for files"""
-    files = []
-    if not os.path.exists(folder_path):
-        return files
-    
-    for root, dirs, filenames in os.walk(folder_path):
-        for filename in filenames:
-            if filename not in exclude_files and not filename.startswith('.'):
-                filepath = os.path.join(root, filename)
-                files.append(filepath)
-    
-    return files
-
 def determine_section(filepath):
     """Determine which section of the registry a file belongs to"""
-    rel_path = os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley")
-    
-    if '/personas/' in rel_path:
-        return 'personas'
-    elif '/instructions/' in rel_path:
-        return 'instructions'
-    elif '/workflows/' in rel_path:
-        return 'workflows'
-    elif '/schemas/' in rel_path:
-        return 'schemas'
-    elif '/prompts/' in rel_path:
-        return 'prompts'
-    elif '/policies/' in rel_path:
-        return 'policies'
-    else:
-        return 'unknown'
+    return section_for_path(os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley"))
 
 def get_item_name(filepath):
     """Generate a unique item name for the registry"""
-    rel_path = os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley")
-    
-    # Remove the base shared path and file extension
-    name = rel_path.replace('.ai-ley/shared/', '').replace('.md', '').replace('.yaml', '').replace('.yml', '')
-    
-    # Replace path separators with underscores to create unique names
-    name = name.replace('/', '_').replace('\\', '_')
-    
-    return name
+    return item_name(os.path.relpath(filepath, "/Users/blainemcdonnell/git/ai-ley"))
 
 def insert_or_update_item(cursor, item_type, name, metadata):
     """Insert or update an item in the database"""
     # Parse last_updated to proper datetime format
-    last_updated = metadata.get('lastUpdated')
-    if last_updated and isinstance(last_updated, str):
-        try:
-            # Handle ISO format with 'T' separator
-            if 'T' in last_updated:
-                last_updated = datetime.fromisoformat(last_updated.replace('Z', '+00:00'))
-            else:
-                last_updated = datetime.fromisoformat(last_updated)
-        except ValueError:
-            last_updated = None
-    
-    # Convert arrays to JSON strings
-    keywords = json.dumps(metadata.get('keywords', [])) if metadata.get('keywords') else None
-    extensions = json.dumps(metadata.get('extensions', [])) if metadata.get('extensions') else None
-    apply_to = json.dumps(metadata.get('applyTo', [])) if metadata.get('applyTo') else None
-    
-    cursor.execute("""
-    INSERT OR REPLACE INTO registry_items (
-        type, name, path, title, description, version, author,
-        last_updated, md5sum, summary_score, apply_to, keywords,
-        extensions, agent_mode, instruction_type, guidelines,
-        updated_at
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        item_type,
-        name,
-        metadata.get('path'),
-        metadata.get('title'),
-        metadata.get('description'),
-        metadata.get('version'),
-        metadata.get('author'),
-        last_updated,
-        metadata.get('md5sum'),
-        metadata.get('summaryScore'),
-        apply_to,
-        keywords,
-        extensions,
-        metadata.get('agentMode'),
-        metadata.get('instructionType'),
-        metadata.get('guidelines'),
-        datetime.now()
-    ))
+    last_updated = parse_last_updated(metadata.get('lastUpdated'))
+    upsert_item(cursor, item_type, name, metadata, last_updated, datetime.now())
 
 def main():
     base_path = "/Users/blainemcdonnell/git/ai-ley"
@@ -192,65 +72,115 @@ def main():
         ".ai-ley/shared/workflows",
         ".ai-ley/shared/schemas",
         ".ai-ley/shared/prompts",
-        ".ai-ley/shared/policies"
+        ".ai-ley/shared/policies",
+        ".github/chatmodes"
     ]
     
     exclude_files = ["README.md", "CHANGES.md", ".gitkeep"]
+    ported_sources = load_ported_sources(base_path)
+    # One walk: frontmatter, titles and md5s come from a single read per changed file
+    scanner = source_scanner(base_path, folders_to_scan, exclude_files, ported_sources,
+                             cache_path=default_cache_path(base_path), hash_cache=MANIFEST_CACHE)
     registry_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.db")
+    snapshot_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.snap")
+    digest_path = os.path.join(base_path, ".ai-ley/shared/variables/digest.json")
+    md5sums_dir = os.path.join(base_path, ".ai-ley/shared/md5sums")
+    indexes_dir = os.path.join(base_path, ".ai-ley/shared/indexes")
     
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(registry_path), exist_ok=True)
     
     # Connect to SQLite database
-    conn = sqlite3.connect(registry_path)
+    conn = connect(registry_path)
     cursor = conn.cursor()
     
-    try:
-        # Create schema
-        create_schema(cursor)
+    with scanner, MANIFEST_CACHE:
+        try:
+            # Create schema
+            create_schema(cursor)
+            migrate_schema(conn)
         
-        # Clear existing data
-        cursor.execute("DELETE FROM registry_items;")
+            # Clear existing data; token counts are keyed by path and kept
+            clear_registry(cursor)
+            token_counts = TokenCountRefresh(conn)
         
-        # Collect all files and process them
-        total_items = 0
-        section_counts = {}
+            # Collect all files and process them
+            total_items = 0
+            section_counts = {}
+            snapshot_items = []
         
-        for folder in folders_to_scan:
-            folder_path = os.path.join(base_path, folder)
-            files = scan_folder(folder_path, exclude_files)
-            
-            for filepath in files:
-                section = determine_section(filepath)
+            for item in scanner:
+                section = determine_section(item.path)
                 if section == 'unknown':
-                    print(f"Warning: Could not determine section for {filepath}")
+                    print(f"Warning: Could not determine section for {item.path}")
                     continue
-                    
-                metadata = extract_metadata(filepath)
+                
+                metadata = extract_metadata(item)
                 if metadata is None:
-                    print(f"Warning: Could not extract metadata from {filepath}")
+                    print(f"Warning: Could not extract metadata from {item.path}")
                     continue
-                
-                item_name = get_item_name(filepath)
+            
+                if metadata['path'] in ported_sources:
+                    metadata['sourceRepo'] = ported_sources[metadata['path']]
+            
+                item_name = get_item_name(item.path)
                 insert_or_update_item(cursor, section, item_name, metadata)
-                
+                snapshot_items.append((section, item_name, metadata))
+                # Recount stale items from the bytes this scan already read
+                token_counts.add(metadata['path'], metadata.get('md5sum'), lambda: item.data)
+            
                 total_items += 1
                 section_counts[section] = section_counts.get(section, 0) + 1
         
-        # Commit changes
-        conn.commit()
+            # Commit changes
+            conn.commit()
+            optimize(conn)
         
-        # Print summary
-        print(f"Phase 3 complete. SQLite registry generated with {total_items} items:")
-        for section, count in section_counts.items():
-            print(f"  - {section}: {count} items")
-        print(f"Registry written to: {registry_path}")
+            # Write the compact binary snapshot for agent-side lookups
+            write_snapshot(snapshot_items, snapshot_path)
         
-    except Exception as e:
-        print(f"Error creating SQLite registry: {e}")
-        conn.rollback()
-    finally:
-        conn.close()
+            # Re-derive reference edges for changed sources; phase 1 walks them
+            # backwards to put the dependents of changed files on the worklist
+            reference_sources = [(metadata['path'], metadata.get('md5sum')) for _, _, metadata in snapshot_items]
+            global_instructions = ".ai-ley/shared/global-instructions.md"
+            global_item = scanner.item(os.path.join(base_path, global_instructions))
+            reference_sources.append((global_instructions, global_item.md5))
+            changed_sources = refresh_references(conn, reference_sources, base_path)
+        
+            # Recount tokens for items whose content changed
+            token_counts.add(global_instructions, global_item.md5, lambda: global_item.data)
+            counted = token_counts.finish()
+        
+            # Re-render index sections whose members changed
+            updated_indexes = update_indexes(registry_path, indexes_dir)
+        
+            # Record the content digest this registry was built from
+            _, tree = update_digest(os.path.join(base_path, ".ai-ley/shared"), digest_path, hash_cache=scanner.hash_lookup)
+        
+            # Refresh the md5sums manifests from the hashes computed above
+            rewritten = update_manifests(
+                md5sums_dir,
+                ((section, metadata['path'], metadata.get('md5sum')) for section, _, metadata in snapshot_items)
+            )
+        
+            # Print summary
+            print(f"Phase 3 complete. SQLite registry generated with {total_items} items:")
+            for section, count in section_counts.items():
+                print(f"  - {section}: {count} items")
+            print(f"Registry written to: {registry_path}")
+            print(f"Snapshot written to: {snapshot_path}")
+            print(f"Digest {tree['digest']} written to: {digest_path}")
+            print(f"References re-derived for {len(changed_sources)} sources")
+            print(f"Token counts recomputed for {len(counted)} items")
+            print(f"Manifests updated: {', '.join(rewritten) or 'none'}")
+            for item_type, categories in updated_indexes.items():
+                print(f"Index {item_type}.md: re-rendered {len(categories)} section(s)")
+        
+        except Exception as e:
+            print(f"Error creating SQLite registry: {e}")
+            conn.rollback()
+        finally:
+            conn.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
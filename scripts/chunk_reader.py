@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Byte-range reads of registry item sections
+
+The registry build records every heading-delimited chunk of an item in
+registry.db (item_chunks: byte offset, length, md5sum and token estimate;
+see token_counts.py). ChunkReader serves single chunks from those ranges
+through a memory map of the file, or pread() where mapping is not possible,
+so a caller that needs one section never reads or parses the whole file.
+
+Every read is checked against the chunk's md5sum; a file edited since the
+last build raises StaleChunkError instead of returning the wrong bytes.
+Downstream caches can key on the same md5sums to invalidate one section at
+a time.
+"""
+import argparse
+import hashlib
+import mmap
+import os
+import sys
+from typing import Dict, List, Optional, Tuple, Union
+
+from registry_db import connect
+from token_counts import Chunk
+
+class StaleChunkError(ValueError):
+    """Raised when a file no longer matches the chunk recorded for it"""
+
+def read_range(path, offset: int, length: int, md5sum: Optional[str] = None) -> bytes:
+    """length bytes of a file from offset with pread(), checked against md5sum when given"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    try:
+        if hasattr(os, 'pread'):
+            data = os.pread(fd, length, offset)
+        else:
+            os.lseek(fd, offset, os.SEEK_SET)
+            data = os.read(fd, length)
+    finally:
+        os.close(fd)
+    if md5sum is not None and hashlib.md5(data).hexdigest() != md5sum:
+        raise StaleChunkError(f"{path} changed at bytes {offset}..{offset + length} since the registry was built")
+    return data
+
+class ChunkReader:
+    """Chunk metadata from registry.db and chunk bytes from the files it describes"""
+
+    def __init__(self, registry, base_path, use_mmap: bool = True):
+        # registry is an open connection or a path to registry.db
+        self._owns_conn = not hasattr(registry, 'execute')
+        self.conn = connect(registry, readonly=True) if self._owns_conn else registry
+        self.base_path = str(base_path)
+        self.use_mmap = use_mmap and hasattr(mmap, 'mmap')
+        # path -> ((size, mtime_ns), map); remapped when the file changes
+        self._maps: Dict[str, Tuple[Tuple[int, int], mmap.mmap]] = {}
+
+    def close(self):
+        for _, mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+        if self._owns_conn:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def chunks(self, path: str, max_level: Optional[int] = None) -> List[Chunk]:
+        """Chunks of one item in document order, down to heading max_level"""
+        query = ("SELECT position, level, title, byte_offset, byte_length, md5sum, tokens "
+                 "FROM item_chunks WHERE path = ?")
+        params = [path]
+        if max_level is not None:
+            query += " AND level <= ?"
+            params.append(max_level)
+        return [Chunk(*row) for row in self.conn.execute(query + " ORDER BY position;", params)]
+
+    def chunk(self, path: str, section: Union[int, str]) -> Chunk:
+        """One chunk by position or by heading title (the first one with that title)"""
+        if isinstance(section, int):
+            row = self.conn.execute(
+                "SELECT position, level, title, byte_offset, byte_length, md5sum, tokens "
+                "FROM item_chunks WHERE path = ? AND position = ?;", (path, section)
+            ).fetchone()
+        else:
+            row = self.conn.execute(
+                "SELECT position, level, title, byte_offset, byte_length, md5sum, tokens "
+                "FROM item_chunks WHERE path = ? AND title = ? ORDER BY position LIMIT 1;", (path, section)
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"No chunk {section!r} recorded for {path}")
+        return Chunk(*row)
+
+    def _map(self, path: str) -> Optional[mmap.mmap]:
+        """Read-only map of a file, reused while its size and mtime are unchanged"""
+        full_path = os.path.join(self.base_path, path)
+        stat = os.stat(full_path)
+        key = (stat.st_size, stat.st_mtime_ns)
+        cached = self._maps.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+        if cached:
+            cached[1].close()
+            del self._maps[path]
+        if not stat.st_size:
+            return None  # empty files cannot be mapped
+        with open(full_path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps[path] = (key, mapped)
+        return mapped
+
+    def read_bytes(self, path: str, chunk: Chunk) -> bytes:
+        """Bytes of one chunk; raises StaleChunkError if the file changed"""
+        end = chunk.byte_offset + chunk.byte_length
+        mapped = self._map(path) if self.use_mmap else None
+        if mapped is None:
+            data = read_range(os.path.join(self.base_path, path), chunk.byte_offset, chunk.byte_length)
+        else:
+            data = mapped[chunk.byte_offset:end]
+        if hashlib.md5(data).hexdigest() != chunk.md5sum:
+            raise StaleChunkError(f"{path} changed at bytes {chunk.byte_offset}..{end} since the registry was built")
+        return data
+
+    def read(self, path: str, section: Union[int, str, Chunk]) -> str:
+        """Text of one chunk, heading line included, with newlines normalized"""
+        chunk = section if isinstance(section, Chunk) else self.chunk(path, section)
+        text = self.read_bytes(path, chunk).decode('utf-8', errors='replace')
+        return text.replace('\r\n', '\n').replace('\r', '\n')
+
+def main():
+    """List the chunks of a registry item or print one of them"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    base_path = os.path.normpath(os.path.join(script_dir, '..'))
+
+    parser = argparse.ArgumentParser(description="Read registry item sections by byte range")
+    parser.add_argument('path', help='Repository-relative item path')
+    parser.add_argument('section', nargs='?',
+                        help='Heading title or chunk position to print (default: list the chunks)')
+    parser.add_argument('--db', default=os.path.join(base_path, '.ai-ley', 'shared', 'variables', 'registry.db'),
+                        help='Registry database (default: .ai-ley/shared/variables/registry.db)')
+    parser.add_argument('--level', type=int, metavar='LEVEL',
+                        help='Only list chunks down to heading LEVEL')
+    parser.add_argument('--no-mmap', action='store_true', help='Read with pread() instead of mapping files')
+    args = parser.parse_args()
+
+    with ChunkReader(args.db, base_path, use_mmap=not args.no_mmap) as reader:
+        if args.section is None:
+            chunks = reader.chunks(args.path, args.level)
+            if not chunks:
+                print(f"{args.path}: no chunks (not in the registry, or no headings)")
+            for chunk in chunks:
+                print(f"{chunk.position:>4}  {chunk.byte_offset:>8}+{chunk.byte_length:<7} {chunk.tokens:>6} tok  "
+                      f"{chunk.md5sum[:8]}  {'  ' * (chunk.level - 1)}{chunk.title}")
+            return
+        section = int(args.section) if args.section.isdigit() else args.section
+        try:
+            print(reader.read(args.path, section).rstrip('\n'))
+        except KeyError as e:
+            print(f"Error: {e.args[0]}")
+            sys.exit(1)
+        except StaleChunkError as e:
+            print(f"Error: {e}. Rebuild the registry.")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+One lazy walk over ai-ley content, with memoized per-file facets
+
+ContentScanner walks folders under a base directory in os.walk order and
+yields a ContentItem per file. Facets are computed the first time they are
+asked for and then kept on the item:
+
+    stat         os.stat result
+    data         raw bytes (the only facet that reads the file)
+    md5          hex digest of the bytes
+    text         decoded text, newlines normalized as in text-mode reads
+    document     markdown_sections.MarkdownDocument over text
+    frontmatter  raw frontmatter text; metadata() and simple_metadata() parse it
+    title        first level-one heading
+    headings     markdown_sections.Heading spans; sections() slices them
+
+md5, frontmatter, title and headings are also kept in a FacetCache, a
+SQLite table keyed by path and trusted while size, mtime and ctime are
+unchanged (the same rule merkle_digest uses). Each file is read at most
+once per scan, and not at all when the cache already holds every facet
+a pipeline asks for.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from markdown_sections import Heading, MarkdownDocument, SectionMap, parse_metadata, simple_metadata
+
+# Bump when facet contents change so cached facets are recomputed
+FACET_VERSION = 1
+
+DEFAULT_CACHE_PATH = os.path.join('.project', '.cache', 'content_facets.db')
+
+_MISSING = object()
+
+def _stat_key(stat) -> List[int]:
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]
+
+class FacetCache:
+    """Per-file facets in SQLite, valid while the file's stat is unchanged"""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("PRAGMA synchronous = NORMAL;")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS facets (
+            path TEXT PRIMARY KEY,
+            stat TEXT NOT NULL,
+            version INTEGER NOT NULL,
+            facets TEXT NOT NULL
+        ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    def get(self, path: str, stat) -> Dict:
+        """Stored facets for path, or {} if absent or the file has changed"""
+        row = self.conn.execute("SELECT stat, version, facets FROM facets WHERE path = ?;", (path,)).fetchone()
+        if row is None or row[1] != FACET_VERSION or json.loads(row[0]) != _stat_key(stat):
+            return {}
+        return json.loads(row[2])
+
+    def put(self, path: str, stat, facets: Dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO facets (path, stat, version, facets) VALUES (?, ?, ?, ?);",
+            (path, json.dumps(_stat_key(stat)), FACET_VERSION, json.dumps(facets))
+        )
+
+    def lookup(self, path, stat=None) -> Optional[str]:
+        """Stored md5 for an unchanged file, else None; usable as a merkle_digest hash_cache"""
+        path = os.path.abspath(str(path))
+        try:
+            stat = stat or os.stat(path)
+        except OSError:
+            return None
+        return self.get(path, stat).get('md5')
+
+    __call__ = lookup
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+class ContentItem:
+    """A file found by ContentScanner; facets are computed on first access and kept"""
+
+    def __init__(self, scanner: 'ContentScanner', path: str, rel_path: str):
+        self.path = path
+        self.rel_path = rel_path
+        self._scanner = scanner
+        self._stat = None
+        self._data = None
+        self._text = None
+        self._encoding = None
+        self._document = None
+        self._facets = None
+        # md5 taken from the scanner's hash_cache; kept on the item but not in the FacetCache
+        self._cached_md5 = None
+
+    def __repr__(self):
+        return f"ContentItem({self.rel_path!r})"
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path)
+
+    @property
+    def stat(self):
+        if self._stat is None:
+            self._stat = os.stat(self.path)
+        return self._stat
+
+    def _cached(self, facet):
+        if self._facets is None:
+            cache = self._scanner.cache
+            self._facets = cache.get(os.path.abspath(self.path), self.stat) if cache else {}
+        return self._facets.get(facet, _MISSING)
+
+    def _store(self, **facets):
+        self._cached('md5')
+        self._facets.update(facets)
+        if self._scanner.cache:
+            self._scanner.cache.put(os.path.abspath(self.path), self.stat, self._facets)
+
+    @property
+    def data(self) -> bytes:
+        if self._data is None:
+            with open(self.path, 'rb') as f:
+                self._data = f.read()
+            self._scanner.reads += 1
+        return self._data
+
+    @property
+    def md5(self) -> str:
+        md5 = self._cached('md5')
+        if md5 is not _MISSING:
+            return md5
+        hash_cache = self._scanner.hash_cache
+        if self._cached_md5 is None and hash_cache and self._data is None:
+            self._cached_md5 = hash_cache(self.path, self.stat)
+        if self._cached_md5 is not None:
+            return self._cached_md5
+        # Only hashes computed from the bytes read here are stored under the current stat
+        md5 = hashlib.md5(self.data).hexdigest()
+        if hasattr(hash_cache, 'record'):
+            hash_cache.record(self.path, self.stat, md5)
+        self._store(md5=md5)
+        return md5
+
+    @property
+    def text(self) -> str:
+        """Decoded contents; raises UnicodeDecodeError when not UTF-8 and no fallback is set"""
+        if self._text is None:
+            try:
+                text = self.data.decode('utf-8')
+                self._encoding = 'utf-8'
+            except UnicodeDecodeError:
+                if not self._scanner.fallback_encoding:
+                    raise
+                text = self.data.decode(self._scanner.fallback_encoding)
+                self._encoding = self._scanner.fallback_encoding
+            self._text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return self._text
+
+    @property
+    def document(self) -> MarkdownDocument:
+        if self._document is None:
+            self._document = MarkdownDocument(self.text)
+        return self._document
+
+    def _text_facet(self, facet):
+        value = self._cached(facet)
+        # Facets decoded with a fallback this scanner does not allow are not reused
+        if value is _MISSING or self._cached('encoding') not in ('utf-8', self._scanner.fallback_encoding):
+            document = self.document
+            self._store(
+                encoding=self._encoding,
+                frontmatter=document.frontmatter,
+                title=document.title(),
+                headings=[list(heading) for heading in document.headings]
+            )
+            value = self._facets[facet]
+        return value
+
+    @property
+    def frontmatter(self) -> Optional[str]:
+        return self._text_facet('frontmatter')
+
+    @property
+    def title(self) -> Optional[str]:
+        return self._text_facet('title')
+
+    @property
+    def headings(self) -> List[Heading]:
+        return [Heading(*heading) for heading in self._text_facet('headings')]
+
+    def metadata(self) -> Dict:
+        """Frontmatter parsed as YAML; {} when absent. Raises yaml.YAMLError on bad YAML."""
+        return parse_metadata(self.frontmatter)
+
+    def simple_metadata(self) -> Dict[str, str]:
+        return simple_metadata(self.frontmatter)
+
+    def sections(self, level: int = 2) -> SectionMap:
+        return self.document.sections(level)
+
+class ContentScanner:
+    """
+    Lazily yield ContentItems for the files under folders of base_dir.
+
+    Hidden files and exclude_files names are skipped, as are directories
+    named in exclude_dirs; suffixes limits the walk to those extensions and
+    skip(path) can veto individual files. extra_paths (relative to base_dir)
+    are yielded after the walk unless already seen, e.g. ported files that
+    live outside the scanned folders. hash_cache (path, stat) -> md5 or None
+    is consulted before reading a file just to hash it; md5s it supplies are
+    used for the scan but only md5s computed from the file are cached.
+    """
+
+    def __init__(self, base_dir, folders: Iterable[str] = ('.',), exclude_files: Iterable[str] = (),
+                 exclude_dirs: Iterable[str] = (), suffixes: Optional[Iterable[str]] = None,
+                 skip: Optional[Callable[[str], bool]] = None, extra_paths: Iterable[str] = (),
+                 cache_path=None, hash_cache=None, fallback_encoding: Optional[str] = 'latin-1'):
+        self.base_dir = str(base_dir)
+        self.folders = list(folders)
+        self.exclude_files = set(exclude_files)
+        self.exclude_dirs = set(exclude_dirs)
+        self.suffixes = tuple(suffixes) if suffixes else None
+        self.skip = skip
+        self.extra_paths = extra_paths
+        self.cache = FacetCache(cache_path) if cache_path else None
+        self.hash_cache = hash_cache
+        self.fallback_encoding = fallback_encoding
+        self.reads = 0
+
+    def _wanted(self, filename: str) -> bool:
+        if filename.startswith('.') or filename in self.exclude_files:
+            return False
+        return self.suffixes is None or filename.endswith(self.suffixes)
+
+    def paths(self) -> Iterator[str]:
+        """Absolute paths of the files to scan, in walk order"""
+        seen = set()
+        for folder in self.folders:
+            top = self.base_dir if folder in ('.', '') else os.path.join(self.base_dir, folder)
+            for root, dirnames, filenames in os.walk(top):
+                dirnames[:] = [name for name in dirnames if name not in self.exclude_dirs]
+                for filename in filenames:
+                    filepath = os.path.join(root, filename)
+                    if not self._wanted(filename) or (self.skip and self.skip(filepath)):
+                        continue
+                    seen.add(os.path.normpath(filepath))
+                    yield filepath
+
+        for rel_path in sorted(self.extra_paths):
+            filepath = os.path.join(self.base_dir, rel_path)
+            if (os.path.normpath(filepath) in seen or not self._wanted(os.path.basename(rel_path))
+                    or not os.path.isfile(filepath)):
+                continue
+            yield filepath
+
+    def __iter__(self) -> Iterator[ContentItem]:
+        try:
+            for filepath in self.paths():
+                yield self.item(filepath)
+        finally:
+            if self.cache:
+                self.cache.commit()
+
+    def item(self, path) -> ContentItem:
+        """ContentItem for a single path, e.g. one outside the scanned folders"""
+        path = str(path)
+        return ContentItem(self, path, os.path.relpath(path, self.base_dir).replace(os.sep, '/'))
+
+    def hash_lookup(self, path, stat=None) -> Optional[str]:
+        """Cached or hash_cache md5 without reading the file, for merkle_digest.build_tree"""
+        md5 = self.cache.lookup(path, stat) if self.cache else None
+        if md5 is None and self.hash_cache:
+            md5 = self.hash_cache(path, stat)
+        return md5
+
+    def close(self):
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def persona_scanner(personas_dir, cache_path=None) -> ContentScanner:
+    """Persona markdown files (not the consistency framework), decoded strictly as UTF-8"""
+    return ContentScanner(
+        personas_dir, suffixes=('.md',),
+        skip=lambda path: 'psychological-consistency-framework' in os.path.basename(path),
+        cache_path=cache_path, fallback_encoding=None
+    )
+
+def default_cache_path(repo_dir) -> Path:
+    """The shared facet cache of a repository checkout"""
+    return Path(repo_dir) / DEFAULT_CACHE_PATH
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Budget-aware context packs of instruction and persona sections
+
+A ContextIndex keeps BM25 postings for every level-two section of the
+registry's instructions and personas (a file without level-two headings is
+one unit) in SQLite under .project/.cache. Like the chunk index it reuses,
+it is keyed by path and md5sum, so only changed items are re-read.
+
+build_pack() ranks units by BM25 against the task, boosted by how well the
+item's title, description and keywords match and by its summaryScore, then
+fills the token budget greedily by value per token (the classic knapsack
+heuristic, checked against the best single unit) and assembles the chosen
+sections as one markdown document, reading each one by its byte range.
+"""
+import argparse
+import hashlib
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+from chunk_reader import ChunkReader, StaleChunkError
+from markdown_sections import MarkdownDocument
+from registry_db import connect
+from token_counts import Chunk, chunk_document, get_tokenizer
+
+# Bump when tokenization or unit boundaries change so the index is rebuilt
+INDEX_VERSION = 2
+
+DEFAULT_INDEX_PATH = os.path.join('.project', '.cache', 'context_index.db')
+DEFAULT_BUDGET = 8000
+PACK_TYPES = ('personas', 'instructions')
+
+# An agent takes on one persona; further persona sections are skipped
+MAX_PERSONAS = 1
+
+# BM25 parameters, and the weight of a match on the item's own metadata
+BM25_K1 = 1.2
+BM25_B = 0.75
+META_WEIGHT = 0.5
+
+# Units scoring below this fraction of the best unit are left out, and
+# value per token is computed as if a unit had at least MIN_UNIT_TOKENS,
+# so a pack is not filled with short, barely relevant fragments
+MIN_RELATIVE_VALUE = 0.3
+MIN_UNIT_TOKENS = 150
+
+# Position of the per-item metadata pseudo-unit; it is scored but never packed
+META_POSITION = -1
+
+_TERM = re.compile(r'[a-z0-9]+[+#]*')
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have how i if in into is it its of on or our should that the
+their then there these this to use using was we what when where which while who will with you your
+""".split())
+
+def terms(text: str) -> List[str]:
+    """Lowercased index terms of text, stopwords dropped and plurals folded"""
+    found = []
+    for term in _TERM.findall(text.lower()):
+        if term in STOPWORDS:
+            continue
+        if len(term) > 4 and term.endswith('ies'):
+            term = term[:-3] + 'y'
+        elif len(term) > 3 and term.endswith('s') and not term.endswith('ss'):
+            term = term[:-1]
+        found.append(term)
+    return found
+
+class Unit(NamedTuple):
+    """A packable section (or whole file) of a registry item"""
+    id: int
+    path: str
+    type: str
+    item_title: str
+    position: int
+    title: str
+    tokens: int
+    summary_score: float
+    byte_offset: int
+    byte_length: int
+    md5sum: str
+
+    def chunk(self) -> Chunk:
+        return Chunk(self.position, 2, self.title, self.byte_offset, self.byte_length, self.md5sum, self.tokens)
+
+class ContextIndex:
+    """BM25 postings over registry sections, refreshed by md5sum"""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._has_counts = None
+        os.makedirs(os.path.dirname(self.db_path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("PRAGMA synchronous = NORMAL;")
+        version = self.conn.execute("PRAGMA user_version;").fetchone()[0]
+        if version != INDEX_VERSION:
+            for table in ('units', 'unit_terms', 'indexed'):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table};")
+            self.conn.execute(f"PRAGMA user_version = {INDEX_VERSION};")
+        self.conn.executescript("""
+        CREATE TABLE IF NOT EXISTS units (
+            id INTEGER PRIMARY KEY,
+            path TEXT NOT NULL,
+            type TEXT NOT NULL,
+            item_title TEXT,
+            position INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            tokens INTEGER NOT NULL,
+            length INTEGER NOT NULL,
+            summary_score REAL,
+            byte_offset INTEGER NOT NULL,
+            byte_length INTEGER NOT NULL,
+            md5sum TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_units_path ON units(path);
+        CREATE TABLE IF NOT EXISTS unit_terms (
+            term TEXT NOT NULL,
+            unit_id INTEGER NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, unit_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_unit_terms_unit ON unit_terms(unit_id);
+        CREATE TABLE IF NOT EXISTS indexed (
+            path TEXT PRIMARY KEY,
+            md5sum TEXT
+        ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _remove(self, path: str):
+        self.conn.execute(
+            "DELETE FROM unit_terms WHERE unit_id IN (SELECT id FROM units WHERE path = ?);", (path,)
+        )
+        self.conn.execute("DELETE FROM units WHERE path = ?;", (path,))
+        self.conn.execute("DELETE FROM indexed WHERE path = ?;", (path,))
+
+    def _add_unit(self, path, item_type, item_title, position, title, tokens, text, summary_score,
+                  chunk=(0, 0, '')):
+        unit_terms = Counter(terms(text))
+        cursor = self.conn.execute(
+            "INSERT INTO units (path, type, item_title, position, title, tokens, length, summary_score, "
+            "byte_offset, byte_length, md5sum) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);",
+            (path, item_type, item_title, position, title, tokens, sum(unit_terms.values()), summary_score, *chunk)
+        )
+        self.conn.executemany(
+            "INSERT INTO unit_terms (term, unit_id, tf) VALUES (?, ?, ?);",
+            [(term, cursor.lastrowid, tf) for term, tf in unit_terms.items()]
+        )
+
+    def _registry_counts(self, registry) -> bool:
+        """Whether registry.db has the token and chunk tables (older databases do not)"""
+        if self._has_counts is None:
+            self._has_counts = registry.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'item_tokens';"
+            ).fetchone() is not None
+        return self._has_counts
+
+    def index_item(self, registry, base_path, row) -> bool:
+        """(Re)index one registry row; False if the file could not be read"""
+        path, item_type, md5sum, title, description, keywords, summary_score = row
+        try:
+            with open(os.path.join(base_path, path), 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Could not read {path} for the context index: {e}", file=sys.stderr)
+            return False
+        self._remove(path)
+
+        # Chunks come from the registry's chunk index when it is current for the file on disk
+        counted = registry.execute(
+            "SELECT md5sum, body_tokens FROM item_tokens WHERE path = ?;", (path,)
+        ).fetchone() if self._registry_counts(registry) else None
+        if counted and counted[0] == md5sum == hashlib.md5(data).hexdigest():
+            chunks = [Chunk(*chunk) for chunk in registry.execute(
+                "SELECT position, level, title, byte_offset, byte_length, md5sum, tokens FROM item_chunks "
+                "WHERE path = ? ORDER BY position;", (path,)
+            )]
+        else:
+            chunks = chunk_document(data, get_tokenizer()).chunks
+
+        def chunk_text(chunk):
+            return data[chunk.byte_offset:chunk.byte_offset + chunk.byte_length].decode('utf-8', errors='replace')
+
+        if not title:
+            first = next((chunk for chunk in chunks if chunk.level == 1), None)
+            title = first and MarkdownDocument(chunk_text(first)).title()
+        item_title = title or path
+        score = summary_score if summary_score is not None else 3.0
+        meta = ' '.join(str(part) for part in (item_title, description, keywords, Path(path).stem) if part)
+        self._add_unit(path, item_type, item_title, META_POSITION, '', 0, meta, score)
+
+        sections = [chunk for chunk in chunks if chunk.level == 2]
+        if not sections:
+            document = chunk_document(data, get_tokenizer())
+            body = data[document.body_offset:]
+            self._add_unit(path, item_type, item_title, len(chunks), item_title, document.body_tokens,
+                           body.decode('utf-8', errors='replace'), score,
+                           (document.body_offset, len(body), hashlib.md5(body).hexdigest()))
+        for chunk in sections:
+            self._add_unit(path, item_type, item_title, chunk.position, chunk.title, chunk.tokens,
+                           chunk_text(chunk), score, (chunk.byte_offset, chunk.byte_length, chunk.md5sum))
+
+        self.conn.execute("INSERT OR REPLACE INTO indexed (path, md5sum) VALUES (?, ?);", (path, md5sum))
+        return True
+
+    def refresh(self, registry, base_path, types: Iterable[str] = PACK_TYPES) -> int:
+        """Re-index registry items whose md5sum changed and drop removed ones; returns the number re-indexed"""
+        types = tuple(types)
+        rows = registry.execute(
+            f"SELECT path, type, md5sum, title, description, keywords, summary_score FROM registry_items "
+            f"WHERE type IN ({', '.join('?' for _ in types)});", types
+        ).fetchall()
+        stored = dict(self.conn.execute("SELECT path, md5sum FROM indexed;"))
+        changed = 0
+        for row in rows:
+            previous = stored.pop(row[0], None)
+            if row[2] is not None and previous == row[2]:
+                continue
+            changed += self.index_item(registry, base_path, row)
+        for path in stored:
+            self._remove(path)
+        if changed or stored:
+            self.conn.commit()
+        return changed + len(stored)
+
+    def score(self, query: str) -> Tuple[Dict[int, float], Dict[int, Unit]]:
+        """BM25 scores of units (metadata pseudo-units included) for a query, with those units"""
+        query_terms = sorted(set(terms(query)))
+        if not query_terms:
+            return {}, {}
+        count, average = self.conn.execute("SELECT COUNT(*), AVG(length) FROM units;").fetchone()
+        if not count:
+            return {}, {}
+
+        placeholders = ', '.join('?' for _ in query_terms)
+        postings = self.conn.execute(
+            f"SELECT t.term, t.unit_id, t.tf, u.length FROM unit_terms t JOIN units u ON u.id = t.unit_id "
+            f"WHERE t.term IN ({placeholders});", query_terms
+        ).fetchall()
+        frequency = Counter(term for term, _, _, _ in postings)
+
+        scores = {}
+        for term, unit_id, tf, length in postings:
+            idf = math.log(1 + (count - frequency[term] + 0.5) / (frequency[term] + 0.5))
+            norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / (average or 1))
+            scores[unit_id] = scores.get(unit_id, 0.0) + idf * tf * (BM25_K1 + 1) / norm
+        if not scores:
+            return {}, {}
+
+        units = {}
+        for row in self.conn.execute(
+            f"SELECT u.id, u.path, u.type, u.item_title, u.position, u.title, u.tokens, u.summary_score, "
+            f"u.byte_offset, u.byte_length, u.md5sum FROM units u "
+            f"WHERE u.id IN ({', '.join('?' for _ in scores)});", list(scores)
+        ):
+            units[row[0]] = Unit(*row)
+        return scores, units
+
+def rank_units(scores: Dict[int, float], units: Dict[int, Unit]) -> List[Tuple[float, Unit]]:
+    """
+    (value, unit) for units that match the task themselves: section BM25
+    plus the item's metadata match, scaled by summaryScore
+    """
+    meta = {unit.path: scores[unit.id] for unit in units.values() if unit.position == META_POSITION}
+    ranked = []
+    for unit in units.values():
+        if unit.position == META_POSITION:
+            continue
+        relevance = scores[unit.id] + META_WEIGHT * meta.get(unit.path, 0.0)
+        quality = 0.75 + (unit.summary_score if unit.summary_score is not None else 3.0) / 10
+        ranked.append((relevance * quality, unit))
+    ranked.sort(key=lambda entry: (-entry[0], entry[1].path, entry[1].position))
+    if ranked:
+        floor = ranked[0][0] * MIN_RELATIVE_VALUE
+        ranked = [entry for entry in ranked if entry[0] >= floor]
+    return ranked
+
+def _density(entry: Tuple[float, Unit]) -> float:
+    value, unit = entry
+    return value / max(unit.tokens, MIN_UNIT_TOKENS)
+
+def pack_preamble(task: str) -> str:
+    return f"<!-- ai-ley context pack: {task} -->\n\n"
+
+def item_header(unit: Unit) -> str:
+    return f"# {unit.type[:-1].title()}: {unit.item_title}\n\n<!-- source: {unit.path} -->\n\n"
+
+def select_units(ranked: List[Tuple[float, Unit]], budget: int, count=None,
+                 max_personas: int = MAX_PERSONAS) -> List[Tuple[float, Unit]]:
+    """
+    Choose units within budget tokens, counting each item's header once.
+
+    Greedy by value per token, then compared with the single most valuable
+    unit that fits, which bounds the greedy result at half the optimum.
+    Only the max_personas personas with the most total value are eligible.
+    """
+    count = count or get_tokenizer()
+    persona_values = {}
+    for value, unit in ranked:
+        if unit.type == 'personas':
+            persona_values[unit.path] = persona_values.get(unit.path, 0.0) + value
+    allowed_personas = set(sorted(persona_values, key=lambda path: (-persona_values[path], path))[:max_personas])
+    header_cost = {}
+    candidates = []
+    for value, unit in ranked:
+        if unit.type == 'personas' and unit.path not in allowed_personas:
+            continue
+        if unit.path not in header_cost:
+            header_cost[unit.path] = count(item_header(unit))
+        candidates.append((value, unit))
+
+    chosen = []
+    used = 0
+    opened = set()
+    for value, unit in sorted(candidates, key=_density, reverse=True):
+        # One more token for the blank line that separates sections in the pack
+        cost = unit.tokens + 1 + (0 if unit.path in opened else header_cost[unit.path])
+        if used + cost <= budget:
+            chosen.append((value, unit))
+            used += cost
+            opened.add(unit.path)
+
+    best_single = max(
+        ((value, unit) for value, unit in candidates if unit.tokens + 1 + header_cost[unit.path] <= budget),
+        key=lambda entry: entry[0], default=None
+    )
+    if best_single and best_single[0] > sum(value for value, _ in chosen):
+        return [best_single]
+    return chosen
+
+def assemble(reader: ChunkReader, task: str, chosen: List[Tuple[float, Unit]]) -> str:
+    """Markdown pack: the persona first, then items by relevance, sections in document order"""
+    by_item = {}
+    for value, unit in chosen:
+        entry = by_item.setdefault(unit.path, [0.0, []])
+        entry[0] += value
+        entry[1].append(unit)
+    order = sorted(by_item, key=lambda path: (by_item[path][1][0].type != 'personas', -by_item[path][0], path))
+
+    parts = [pack_preamble(task)]
+    for path in order:
+        units = sorted(by_item[path][1], key=lambda unit: unit.position)
+        parts.append(item_header(units[0]))
+        parts.extend(section + '\n\n' for section in read_sections(reader, units))
+    return ''.join(parts).rstrip('\n') + '\n'
+
+def read_sections(reader: ChunkReader, units: List[Unit]) -> List[str]:
+    """Text of units from one file by byte range, re-parsed by title if the file changed since indexing"""
+    try:
+        return [reader.read(unit.path, unit.chunk()).strip('\n') for unit in units]
+    except StaleChunkError:
+        pass
+
+    with open(os.path.join(reader.base_path, units[0].path), 'rb') as f:
+        text = f.read().decode('utf-8', errors='replace').replace('\r\n', '\n').replace('\r', '\n')
+    document = MarkdownDocument(text)
+    headings = {heading.title: heading for heading in document.headings if heading.level == 2}
+    found = []
+    for unit in units:
+        if unit.title in headings:
+            heading = headings[unit.title]
+            found.append(text[heading.start:heading.end].strip('\n'))
+        elif unit.title == unit.item_title:
+            found.append(document.body.strip('\n'))
+    return found
+
+def build_pack(registry_path, base_path, task: str, budget: int = DEFAULT_BUDGET,
+               index_path=None, types: Iterable[str] = PACK_TYPES) -> Tuple[str, Dict]:
+    """(markdown pack, stats) for a task within budget tokens"""
+    started = time.perf_counter()
+    index_path = index_path or os.path.join(base_path, DEFAULT_INDEX_PATH)
+    registry = connect(registry_path, readonly=True)
+    try:
+        with ContextIndex(index_path) as index:
+            reindexed = index.refresh(registry, base_path, types)
+            scores, units = index.score(task)
+
+        count = get_tokenizer()
+        chosen = select_units(rank_units(scores, units), budget - count(pack_preamble(task)), count)
+        with ChunkReader(registry, base_path) as reader:
+            pack = assemble(reader, task, chosen)
+            tokens = count(pack)
+            # Joining sections can shift a few tokens; drop the least valuable per token until it fits
+            while tokens > budget and chosen:
+                chosen.remove(min(chosen, key=_density))
+                pack = assemble(reader, task, chosen)
+                tokens = count(pack)
+    finally:
+        registry.close()
+    stats = {
+        'sections': len(chosen),
+        'items': len({unit.path for _, unit in chosen}),
+        'tokens': tokens,
+        'budget': budget,
+        'reindexed': reindexed,
+        'elapsed_ms': (time.perf_counter() - started) * 1000,
+    }
+    return pack, stats
+
+def main():
+    """Print a context pack for a task"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    base_path = os.path.normpath(os.path.join(script_dir, '..'))
+
+    parser = argparse.ArgumentParser(description="Assemble a budget-aware context pack for a task")
+    parser.add_argument('task', help='Task description to rank sections against')
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET,
+                        help=f'Token budget (default: {DEFAULT_BUDGET})')
+    parser.add_argument('--db', default=os.path.join(base_path, '.ai-ley', 'shared', 'variables', 'registry.db'),
+                        help='Registry database (default: .ai-ley/shared/variables/registry.db)')
+    args = parser.parse_args()
+
+    pack, stats = build_pack(args.db, base_path, args.task, args.budget)
+    sys.stdout.write(pack)
+    print(f"Packed {stats['sections']} sections from {stats['items']} items: {stats['tokens']}/{stats['budget']} "
+          f"tokens in {stats['elapsed_ms']:.0f}ms ({stats['reindexed']} items re-indexed)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
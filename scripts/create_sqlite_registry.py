@@ -1,46 +1,14 @@
 #!/usr/bin/env python3
 """
-Create SQLite registry database and migrate from JSON
+Create SQLite registry database and migrate from JSON or JSONL
 """
 import os
 import json
 import sqlite3
 from datetime import datetime
 
-def create_schema(cursor):
-    """Create the registry database schema"""
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS registry_items (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        type TEXT NOT NULL,
-        name TEXT NOT NULL,
-        path TEXT UNIQUE NOT NULL,
-        title TEXT,
-        description TEXT,
-        version TEXT,
-        author TEXT,
-        last_updated DATETIME,
-        md5sum TEXT,
-        summary_score REAL,
-        apply_to TEXT, -- JSON array as string
-        keywords TEXT, -- JSON array as string  
-        extensions TEXT, -- JSON array as string
-        agent_mode TEXT,
-        instruction_type TEXT,
-        guidelines TEXT,
-        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
-    );
-    """)
-    
-    # Create indexes for better query performance
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_type ON registry_items(type);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_path ON registry_items(path);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_title ON registry_items(title);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_score ON registry_items(summary_score);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_mode ON registry_items(agent_mode);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_instruction_type ON registry_items(instruction_type);")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_last_updated ON registry_items(last_updated);")
+from registry_db import clear_registry, connect, create_schema, migrate_schema, optimize, parse_last_updated, upsert_item
+from registry_jsonl import migrate_from_jsonl
 
 def migrate_from_json(cursor, json_path):
     """Migrate data from JSON registry to SQLite"""
@@ -52,7 +20,7 @@ def migrate_from_json(cursor, json_path):
         data = json.load(f)
     
     # Clear existing data
-    cursor.execute("DELETE FROM registry_items;")
+    clear_registry(cursor)
     
     total_migrated = 0
     
@@ -65,46 +33,8 @@ def migrate_from_json(cursor, json_path):
                 continue
                 
             # Parse last_updated to proper datetime format
-            last_updated = metadata.get('lastUpdated')
-            if last_updated and isinstance(last_updated, str):
-                try:
-                    # Handle ISO format with 'T' separator
-                    if 'T' in last_updated:
-                        last_updated = datetime.fromisoformat(last_updated.replace('Z', '+00:00'))
-                    else:
-                        last_updated = datetime.fromisoformat(last_updated)
-                except ValueError:
-                    last_updated = None
-            
-            # Convert arrays to JSON strings
-            keywords = json.dumps(metadata.get('keywords', [])) if metadata.get('keywords') else None
-            extensions = json.dumps(metadata.get('extensions', [])) if metadata.get('extensions') else None
-            apply_to = json.dumps(metadata.get('applyTo', [])) if metadata.get('applyTo') else None
-            
-            cursor.execute("""
-            INSERT OR REPLACE INTO registry_items (
-                type, name, path, title, description, version, author,
-                last_updated, md5sum, summary_score, apply_to, keywords,
-                extensions, agent_mode, instruction_type, guidelines
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                item_type,
-                name,
-                metadata.get('path'),
-                metadata.get('title'),
-                metadata.get('description'),
-                metadata.get('version'),
-                metadata.get('author'),
-                last_updated,
-                metadata.get('md5sum'),
-                metadata.get('summaryScore'),
-                apply_to,
-                keywords,
-                extensions,
-                metadata.get('agentMode'),
-                metadata.get('instructionType'),
-                metadata.get('guidelines')
-            ))
+            last_updated = parse_last_updated(metadata.get('lastUpdated'))
+            upsert_item(cursor, item_type, name, metadata, last_updated)
             total_migrated += 1
     
     print(f"Migrated {total_migrated} items from JSON to SQLite")
@@ -112,26 +42,33 @@ def migrate_from_json(cursor, json_path):
 def main():
     base_path = "/Users/blainemcdonnell/git/ai-ley"
     json_registry_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.json")
+    jsonl_registry_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.jsonl")
     sqlite_registry_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.db")
     
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(sqlite_registry_path), exist_ok=True)
     
     # Connect to SQLite database
-    conn = sqlite3.connect(sqlite_registry_path)
+    conn = connect(sqlite_registry_path)
     cursor = conn.cursor()
     
     try:
         # Create schema
         print("Creating SQLite schema...")
         create_schema(cursor)
+        migrate_schema(conn)
         
-        # Migrate from JSON
-        print("Migrating data from JSON...")
-        migrate_from_json(cursor, json_registry_path)
+        # Prefer the streaming JSONL registry, which is imported line by line in one transaction
+        if os.path.exists(jsonl_registry_path):
+            print("Migrating data from JSONL...")
+            migrate_from_jsonl(conn, jsonl_registry_path)
+        else:
+            print("Migrating data from JSON...")
+            migrate_from_json(cursor, json_registry_path)
         
         # Commit changes
         conn.commit()
+        optimize(conn)
         
         # Get statistics
         cursor.execute("SELECT type, COUNT(*) FROM registry_items GROUP BY type ORDER BY type;")
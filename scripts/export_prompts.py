@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Export shared prompts into agent command folders
+
+Each target (.github/prompts, .claude/commands, .opencode/commands) has an
+adapter that turns a shared prompt into that tool's command file. Exports
+are incremental: a (target, prompt) pair is skipped when the source MD5
+and adapter version match the last export and the output is untouched.
+Outputs from earlier exports whose prompt no longer exists are pruned.
+"""
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+STATE_VERSION = 1
+
+def _frontmatter(text):
+    """Parse leading YAML frontmatter into a dict"""
+    if not text.startswith('---'):
+        return {}
+    end = text.find('\n---', 3)
+    if end == -1:
+        return {}
+    try:
+        data = yaml.safe_load(text[3:end])
+    except yaml.YAMLError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def _yaml_string(value):
+    """Quote a value for a single-line YAML scalar"""
+    return json.dumps(' '.join(str(value).split()), ensure_ascii=False)
+
+class PromptSource:
+    """A shared prompt and the fields adapters need"""
+
+    def __init__(self, name, path, relative_path, text):
+        self.name = name
+        self.path = path
+        self.relative_path = relative_path
+        self.md5 = hashlib.md5(text.encode('utf-8')).hexdigest()
+        metadata = _frontmatter(text)
+        self.title = metadata.get('title') or name.replace('-', ' ').title()
+        self.description = metadata.get('description') or ''
+
+class PromptAdapter:
+    """Base adapter: a pointer command that defers to the shared prompt"""
+
+    key = None
+    directory = None
+    suffix = '.md'
+    version = 1
+
+    def output_name(self, prompt):
+        return f"{prompt.name}{self.suffix}"
+
+    def frontmatter(self, prompt):
+        return {}
+
+    def body(self, prompt):
+        return (
+            f"# Command: {prompt.title}\n\n"
+            "## Your Task\n\n"
+            f"- Follow the prompt instructions found in `{prompt.relative_path}`\n"
+        )
+
+    def render(self, prompt):
+        fields = {key: value for key, value in self.frontmatter(prompt).items() if value}
+        header = ''
+        if fields:
+            header = '---\n' + ''.join(f"{key}: {_yaml_string(value)}\n" for key, value in fields.items()) + '---\n\n'
+        return header + self.body(prompt)
+
+class GithubPromptAdapter(PromptAdapter):
+    """VS Code / Copilot prompt files"""
+
+    key = 'github'
+    directory = '.github/prompts'
+    suffix = '.prompt.md'
+    version = 1
+
+    def frontmatter(self, prompt):
+        return {'mode': 'agent', 'description': prompt.description}
+
+class ClaudeCommandAdapter(PromptAdapter):
+    """Claude slash commands"""
+
+    key = 'claude'
+    directory = '.claude/commands'
+    version = 1
+
+    def frontmatter(self, prompt):
+        return {'description': prompt.description}
+
+    def body(self, prompt):
+        return super().body(prompt) + "\n## Input\n\n$ARGUMENTS\n"
+
+class OpencodeCommandAdapter(PromptAdapter):
+    """opencode commands"""
+
+    key = 'opencode'
+    directory = '.opencode/commands'
+    version = 1
+
+    def frontmatter(self, prompt):
+        return {'description': prompt.description}
+
+    def body(self, prompt):
+        return super().body(prompt) + "\n## Input\n\n$ARGUMENTS\n"
+
+ADAPTERS = {adapter.key: adapter for adapter in (
+    GithubPromptAdapter(), ClaudeCommandAdapter(), OpencodeCommandAdapter()
+)}
+
+def load_prompts(base_dir, prompts_dir='.ai-ley/shared/prompts'):
+    """Shared prompts by name (top-level *.md files, README excluded)"""
+    prompts = {}
+    folder = os.path.join(base_dir, prompts_dir)
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith('.md') or filename in ('README.md', 'CHANGES.md'):
+            continue
+        path = os.path.join(folder, filename)
+        if not os.path.isfile(path):
+            continue
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        name = filename[:-3]
+        prompts[name] = PromptSource(name, path, f"{prompts_dir}/{filename}", text)
+    return prompts
+
+def _file_md5(path):
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.md5(f.read()).hexdigest()
+    except OSError:
+        return None
+
+def load_state(state_path):
+    """Previous export state: {target: {prompt: [source md5, adapter version, output path, output md5]}}"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data.get('targets', {}) if data.get('version') == STATE_VERSION else {}
+
+def save_state(state, state_path):
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': STATE_VERSION, 'targets': state}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return hashlib.md5(content.encode('utf-8')).hexdigest()
+
+def export_prompts(base_dir, state_path, targets=None, jobs=8, force=False):
+    """
+    Export every shared prompt to every target.
+
+    Returns {'written': [...], 'skipped': n, 'pruned': [...]} with paths
+    relative to base_dir.
+    """
+    prompts = load_prompts(base_dir)
+    state = load_state(state_path)
+    adapters = [ADAPTERS[key] for key in (targets or ADAPTERS)]
+
+    pending = []
+    skipped = 0
+    new_state = {}
+    for adapter in adapters:
+        previous = state.get(adapter.key, {})
+        current = new_state[adapter.key] = {}
+        for name, prompt in prompts.items():
+            output = f"{adapter.directory}/{adapter.output_name(prompt)}"
+            entry = previous.get(name)
+            if (not force and entry and entry[:3] == [prompt.md5, adapter.version, output]
+                    and _file_md5(os.path.join(base_dir, output)) == entry[3]):
+                current[name] = entry
+                skipped += 1
+                continue
+            pending.append((adapter, prompt, output))
+
+    written = []
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        results = executor.map(
+            lambda job: _write(os.path.join(base_dir, job[2]), job[0].render(job[1])),
+            pending
+        )
+        for (adapter, prompt, output), output_md5 in zip(pending, results):
+            new_state[adapter.key][prompt.name] = [prompt.md5, adapter.version, output, output_md5]
+            written.append(output)
+
+    # Prune outputs of prompts (or output names) that are gone
+    pruned = []
+    for adapter in adapters:
+        live = {entry[2] for entry in new_state[adapter.key].values()}
+        for entry in state.get(adapter.key, {}).values():
+            output = entry[2]
+            if output not in live and os.path.exists(os.path.join(base_dir, output)):
+                os.remove(os.path.join(base_dir, output))
+                pruned.append(output)
+
+    # Keep state for targets not exported this run
+    for key, entries in state.items():
+        new_state.setdefault(key, entries)
+    save_state(new_state, state_path)
+
+    return {'written': sorted(written), 'skipped': skipped, 'pruned': sorted(pruned)}
+
+def main():
+    """Export shared prompts to .github/prompts, .claude/commands and .opencode/commands"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    base_dir = os.path.normpath(os.path.join(script_dir, '..'))
+
+    parser = argparse.ArgumentParser(description="Export shared prompts to agent command folders")
+    parser.add_argument('--base', default=base_dir, help='Project root (default: repository root)')
+    parser.add_argument('--target', choices=sorted(ADAPTERS), action='append',
+                        help='Target to export (repeatable; default: all)')
+    parser.add_argument('--jobs', type=int, default=8, help='Parallel writers (default: 8)')
+    parser.add_argument('--force', action='store_true', help='Rewrite every output')
+    args = parser.parse_args()
+
+    state_path = os.path.join(args.base, '.ai-ley', 'external', '.exports.json')
+    result = export_prompts(args.base, state_path, args.target, args.jobs, args.force)
+    for path in result['written']:
+        print(f"  wrote: {path}")
+    for path in result['pruned']:
+        print(f" pruned: {path}")
+    print(f"Exported {len(result['written'])} files, {result['skipped']} unchanged, {len(result['pruned'])} pruned")
+
+if __name__ == "__main__":
+    main()
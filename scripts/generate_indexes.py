@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Generate indexes/personas.md and indexes/instructions.md from registry.db
+
+Entries are grouped by category directory. Each category is wrapped in
+marker comments carrying a hash of its members' paths and md5sums; on
+regeneration a section whose hash is unchanged is copied from the existing
+index byte for byte, and only changed sections are re-rendered. Text after
+the end marker is hand-maintained and kept as is.
+
+Where the registry only has the defaults build_registry_phase2 fills in
+(title from the file name, "Awaiting summary.", score 3.0), the title,
+description and score already written in the index are kept instead. An
+index without markers is hand-maintained and left alone unless adopted
+with --adopt, which carries its entries over and keeps its prose sections
+after the end marker.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+
+from registry_db import connect
+
+# Bump when the rendered layout changes so every section is re-rendered
+RENDERER_VERSION = 2
+
+INDEX_TYPES = ('personas', 'instructions')
+
+INDEX_TITLES = {
+    'personas': 'Personas Index',
+    'instructions': 'Instructions Index',
+}
+
+# Display names for category directories that do not title-case cleanly
+CATEGORY_NAMES = {
+    'ai': 'AI & Machine Learning',
+    'c-suite': 'C-Suite Executives',
+    'devops': 'DevOps',
+    'seo': 'SEO',
+    'sap': 'SAP',
+    'api': 'API',
+    'nodejs-typescript': 'Node.js / TypeScript',
+    'cobra-cli-go': 'Cobra CLI (Go)',
+}
+
+END_MARKER = '<!-- index:end -->'
+
+# Registry values build_registry_phase2 fills in for missing frontmatter
+PLACEHOLDER_DESCRIPTIONS = ('', 'Awaiting summary.')
+DEFAULT_SCORE = 3.0
+
+# Curated entries in existing indexes: table rows linking to an item, and the
+# instruction index's "File Name" blocks
+_ROW = re.compile(r'^\|\s*\[(?P<title>[^\]\n]+)\]\((?P<link>[^)\s]+)\)\s*\|(?P<cells>.*)\|[ \t]*$', re.MULTILINE)
+_FILE_BLOCK = re.compile(r'^#### \*\*File Name:\*\*\s*(?P<path>\S+)[ \t]*\n(?P<body>.*?)(?=^#|\Z)',
+                         re.MULTILINE | re.DOTALL)
+_SCORE = re.compile(r'^\*\*Score:\*\*\s*(?P<score>\d+(?:\.\d+)?)', re.MULTILINE)
+_SUMMARY = re.compile(r'^\*\*Summary:\*\*[ \t]*(?P<summary>\S.*)$', re.MULTILINE)
+_LEVEL_TWO = re.compile(r'^## (?P<title>.+)$', re.MULTILINE)
+
+_SECTION = re.compile(
+    r'^<!-- section: (?P<category>\S+) (?P<hash>[0-9a-f]{32}) -->\n.*?^<!-- /section -->\n',
+    re.MULTILINE | re.DOTALL,
+)
+
+def load_entries(conn, item_type):
+    """Registry rows of one type as dicts, in path order"""
+    cursor = conn.execute(
+        "SELECT path, title, description, md5sum, summary_score FROM registry_items "
+        "WHERE type = ? ORDER BY path",
+        (item_type,)
+    )
+    columns = [c[0] for c in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor]
+
+def default_title(path):
+    """The title build_registry_phase2 derives from a file name"""
+    return os.path.splitext(os.path.basename(path))[0].replace('-', ' ').title()
+
+def _unescape(cell):
+    return cell.replace('\\|', '|').strip()
+
+def _score(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_curated(item_type, text):
+    """
+    {path: {'title', 'description', 'score'}} written in an existing index.
+
+    Reads table rows (generated or hand-written) and File Name blocks; links
+    are relative to the index directory or, in older indexes, to the type folder.
+    """
+    curated = {}
+    for match in _ROW.finditer(text):
+        link = match.group('link').split('#', 1)[0]
+        if not link.endswith('.md'):
+            continue
+        path = '.ai-ley/shared/' + (link[3:] if link.startswith('../') else f"{item_type}/{link}")
+        cells = [_unescape(cell) for cell in re.split(r'(?<!\\)\|', match.group('cells'))]
+        entry = curated.setdefault(path, {})
+        entry['title'] = _unescape(match.group('title'))
+        if cells and cells[-1] not in PLACEHOLDER_DESCRIPTIONS:
+            entry['description'] = cells[-1]
+        if len(cells) > 1 and _score(cells[-2]) is not None:
+            entry['score'] = _score(cells[-2])
+
+    for match in _FILE_BLOCK.finditer(text):
+        entry = curated.setdefault(f".ai-ley/shared/{item_type}/{match.group('path')}", {})
+        score = _SCORE.search(match.group('body'))
+        summary = _SUMMARY.search(match.group('body'))
+        if score:
+            entry['score'] = float(score.group('score'))
+        if summary and summary.group('summary').strip() not in PLACEHOLDER_DESCRIPTIONS:
+            entry['description'] = summary.group('summary').strip()
+    return curated
+
+def merge_curated(entry, curated):
+    """entry with curated values in place of registry defaults"""
+    known = curated.get(entry['path'])
+    if not known:
+        return entry
+    merged = dict(entry)
+    if known.get('title') and (not entry['title'] or entry['title'] == default_title(entry['path'])):
+        merged['title'] = known['title']
+    if known.get('description') and (entry['description'] or '').strip() in PLACEHOLDER_DESCRIPTIONS:
+        merged['description'] = known['description']
+    if known.get('score') is not None and entry['summary_score'] in (None, DEFAULT_SCORE):
+        merged['summary_score'] = known['score']
+    return merged
+
+def legacy_footer(text):
+    """Level-two sections of a hand-maintained index that list no entries"""
+    matches = list(_LEVEL_TWO.finditer(text))
+    blocks = []
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(text)
+        block = text[match.start():end].strip('\n')
+        if match.group('title').strip() == 'Table of Contents' or _ROW.search(block) or _FILE_BLOCK.search(block):
+            continue
+        blocks.append(block)
+    return ''.join(f"\n\n{block}" for block in blocks) + '\n'
+
+def category_of(item_type, path):
+    """Category directory of an item relative to its type folder ('' for top-level files)"""
+    prefix = f".ai-ley/shared/{item_type}/"
+    relative = path[len(prefix):] if path.startswith(prefix) else path
+    return os.path.dirname(relative)
+
+def group_by_category(item_type, entries):
+    """{category: entries} in category order"""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(category_of(item_type, entry['path']), []).append(entry)
+    return dict(sorted(groups.items()))
+
+def category_title(category):
+    """Human-readable heading for a category directory"""
+    if not category:
+        return 'General'
+    parts = [CATEGORY_NAMES.get(part, part.replace('-', ' ').title()) for part in category.split('/')]
+    return ' / '.join(parts)
+
+def section_hash(entries):
+    """Hash of a section's members, their md5sums, rendered values and the renderer version"""
+    hash_md5 = hashlib.md5(f"v{RENDERER_VERSION}\n".encode('utf-8'))
+    for entry in entries:
+        hash_md5.update(
+            f"{entry['path']} {entry['md5sum']} {_title(entry)}\t{_description(entry)}\t{entry['summary_score']}\n"
+            .encode('utf-8')
+        )
+    return hash_md5.hexdigest()
+
+def _cell(value):
+    """Flatten a value for a markdown table cell"""
+    text = ' '.join(str(value or '').split())
+    return text.replace('|', '\\|')
+
+def _title(entry):
+    """Registry title, falling back to the file name without its extensions"""
+    if entry['title'] and entry['title'] != default_title(entry['path']):
+        return entry['title']
+    name = os.path.basename(entry['path']).split('.', 1)[0]
+    return name.replace('-', ' ').title()
+
+def _description(entry):
+    """Description, left blank while it is still the registry placeholder"""
+    description = (entry['description'] or '').strip()
+    return '' if description in PLACEHOLDER_DESCRIPTIONS else description
+
+def _anchor(title):
+    """GitHub-style heading anchor"""
+    anchor = re.sub(r'[^\w\- ]', '', title.lower())
+    return anchor.replace(' ', '-')
+
+def render_section(item_type, category, entries):
+    """Render one category section including its markers"""
+    rows = sorted(entries, key=lambda entry: (_title(entry).lower(), entry['path']))
+    lines = [
+        f"<!-- section: {category or '.'} {section_hash(entries)} -->",
+        f"## {category_title(category)}",
+        '',
+    ]
+    if item_type == 'instructions':
+        lines += ['| Instruction | Score | Description |', '| --- | --- | --- |']
+    else:
+        lines += ['| Persona | Description |', '| --- | --- |']
+
+    for entry in rows:
+        link = f"[{_cell(_title(entry))}](../{entry['path'][len('.ai-ley/shared/'):]})"
+        if item_type == 'instructions':
+            score = entry['summary_score']
+            score = f"{score:.1f}" if isinstance(score, (int, float)) else ''
+            lines.append(f"| {link} | {score} | {_cell(_description(entry))} |")
+        else:
+            lines.append(f"| {link} | {_cell(_description(entry))} |")
+
+    lines += ['', '<!-- /section -->', '']
+    return '\n'.join(lines)
+
+def render_header(item_type, groups):
+    """Title, stats and table of contents"""
+    total = sum(len(entries) for entries in groups.values())
+    lines = [
+        f"# {INDEX_TITLES[item_type]}",
+        '',
+        '<!-- Generated from registry.db by scripts/generate_indexes.py; only text after the index:end marker is kept. -->',
+        '',
+        f"- **Total {item_type.title()}**: {total}",
+        f"- **Categories**: {len(groups)}",
+        '',
+        '## Table of Contents',
+        '',
+    ]
+    for category, entries in groups.items():
+        title = category_title(category)
+        lines.append(f"- [{title}](#{_anchor(title)}) ({len(entries)})")
+    lines.append('')
+    return '\n'.join(lines) + '\n'
+
+def parse_sections(text):
+    """{category: section text} for every marked section in an existing index"""
+    return {
+        ('' if match.group('category') == '.' else match.group('category')): match.group(0)
+        for match in _SECTION.finditer(text)
+    }
+
+def render_index(item_type, entries, existing_text=''):
+    """
+    Render a full index, reusing unchanged sections from existing_text.
+
+    Curated values in existing_text replace registry defaults; prose from an
+    index without an end marker is kept after it. Returns (text, re-rendered
+    categories).
+    """
+    curated = parse_curated(item_type, existing_text)
+    groups = group_by_category(item_type, [merge_curated(entry, curated) for entry in entries])
+    existing_sections = parse_sections(existing_text)
+
+    if END_MARKER in existing_text:
+        footer = existing_text.split(END_MARKER, 1)[1]
+    else:
+        footer = legacy_footer(existing_text)
+
+    parts = [render_header(item_type, groups)]
+    rerendered = []
+    for category, members in groups.items():
+        previous = existing_sections.get(category)
+        if previous is not None and f" {section_hash(members)} -->" in previous.split('\n', 1)[0]:
+            parts.append(previous)
+        else:
+            parts.append(render_section(item_type, category, members))
+            rerendered.append(category or '.')
+    parts.append(END_MARKER + (footer or '\n'))
+    return '\n'.join(parts), rerendered
+
+def update_indexes(db_path, indexes_dir, item_types=INDEX_TYPES, adopt=False):
+    """
+    Regenerate index files whose sections changed.
+
+    Hand-maintained indexes (no end marker) are skipped unless adopt is set.
+    Returns {item_type: re-rendered categories} for indexes that were rewritten.
+    """
+    conn = connect(db_path, readonly=True)
+    updated = {}
+    try:
+        for item_type in item_types:
+            index_path = os.path.join(indexes_dir, f"{item_type}.md")
+            try:
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    existing_text = f.read()
+            except OSError:
+                existing_text = ''
+            if existing_text and END_MARKER not in existing_text and not adopt:
+                print(f"{index_path} is hand-maintained; adopt it with scripts/generate_indexes.py --adopt")
+                continue
+
+            text, rerendered = render_index(item_type, load_entries(conn, item_type), existing_text)
+            if text != existing_text:
+                os.makedirs(indexes_dir, exist_ok=True)
+                with open(index_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                updated[item_type] = rerendered
+    finally:
+        conn.close()
+    return updated
+
+def main():
+    """Regenerate the persona and instruction indexes"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    shared_dir = os.path.normpath(os.path.join(script_dir, '..', '.ai-ley', 'shared'))
+
+    parser = argparse.ArgumentParser(description="Generate indexes from registry.db")
+    parser.add_argument('--db', default=os.path.join(shared_dir, 'variables', 'registry.db'),
+                        help='Registry database (default: .ai-ley/shared/variables/registry.db)')
+    parser.add_argument('--indexes', default=os.path.join(shared_dir, 'indexes'),
+                        help='Index directory (default: .ai-ley/shared/indexes)')
+    parser.add_argument('--type', choices=INDEX_TYPES, action='append',
+                        help='Index to generate (repeatable; default: all)')
+    parser.add_argument('--adopt', action='store_true',
+                        help='Also convert hand-maintained indexes, keeping their entries and prose')
+    args = parser.parse_args()
+
+    try:
+        updated = update_indexes(args.db, args.indexes, tuple(args.type or INDEX_TYPES), args.adopt)
+    except sqlite3.Error as e:
+        print(f"Could not read {args.db} ({e}). Rebuild it with scripts/build_registry_phase3_sqlite.py")
+        sys.exit(1)
+    if not updated:
+        print("Indexes up to date")
+    for item_type, categories in updated.items():
+        print(f"{item_type}.md: re-rendered {len(categories)} section(s)")
+        for category in categories:
+            print(f"  {category}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Single-pass markdown tokenizer shared by the persona scripts and registry builders
+
+A document is scanned once for its frontmatter block and ATX headings and
+kept as offsets into the original text. Section bodies are only sliced out
+when they are read, so callers that look at two sections of a persona do
+not pay for splitting and re-joining every line of the file.
+"""
+import re
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+import yaml
+
+_FRONTMATTER_END = re.compile(r'^-{3,}[ \t]*\r?$', re.MULTILINE)
+# Headings, plus fence lines so headings inside fenced code can be skipped
+_HEADING = re.compile(r'^(?:(#{1,6})[ \t]+([^\n]*)|[ ]{0,3}(```|~~~)[^\n]*)$', re.MULTILINE)
+_CLOSING_HASHES = re.compile(r'(?:^|[ \t]+)#+[ \t]*$')
+
+class Heading(NamedTuple):
+    """An ATX heading; body_start..end is the section under it"""
+    level: int
+    title: str
+    start: int
+    body_start: int
+    end: int
+
+class SectionMap(Mapping):
+    """{heading title: section body} for one heading level, sliced on access"""
+
+    def __init__(self, text: str, headings: List[Heading]):
+        self._text = text
+        # Later duplicates win, as with a dict built in document order
+        self._spans = {heading.title: (heading.body_start, heading.end) for heading in headings}
+        self._cache = {}
+
+    def __getitem__(self, title: str) -> str:
+        body = self._cache.get(title)
+        if body is None:
+            start, end = self._spans[title]
+            body = self._cache[title] = self._text[start:end]
+        return body
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def span(self, title: str):
+        """(start, end) offsets of a section body"""
+        return self._spans[title]
+
+class MarkdownDocument:
+    """Frontmatter and heading spans of a markdown text"""
+
+    __slots__ = ('text', 'frontmatter_span', 'body_start', 'headings', '_sections')
+
+    def __init__(self, text: str):
+        self.text = text
+        self.frontmatter_span = None
+        self.body_start = 0
+        self._sections = {}
+
+        offset = 1 if text.startswith('\ufeff') else 0
+        if text.startswith('---', offset):
+            first_line_end = text.find('\n', offset)
+            if first_line_end != -1 and not text[offset + 3:first_line_end].strip('-').strip():
+                match = _FRONTMATTER_END.search(text, first_line_end + 1)
+                if match:
+                    self.frontmatter_span = (first_line_end + 1, match.start())
+                    self.body_start = match.end() + 1 if match.end() < len(text) else match.end()
+
+        found = []
+        fence = None
+        for match in _HEADING.finditer(text, self.body_start):
+            marker = match.group(3)
+            if marker:
+                if fence is None:
+                    fence = marker
+                elif marker == fence:
+                    fence = None
+            elif fence is None:
+                found.append((len(match.group(1)), match.group(2).strip(), match.start(), match.end()))
+
+        # Each heading's section runs to the next heading of the same or a
+        # higher level (or the end of the text)
+        headings = [None] * len(found)
+        next_start = [len(text) + 1] * 7  # next heading start seen so far, per level
+        for index in range(len(found) - 1, -1, -1):
+            level, title, start, line_end = found[index]
+            end = min(next_start[1:level + 1]) - 1
+            body_start = min(line_end + 1, len(text))
+            headings[index] = Heading(level, title, start, body_start, max(end, body_start))
+            next_start[level] = start
+        self.headings = headings
+
+    @property
+    def frontmatter(self) -> Optional[str]:
+        """Raw frontmatter text, or None if the document has none"""
+        if self.frontmatter_span is None:
+            return None
+        start, end = self.frontmatter_span
+        return self.text[start:end]
+
+    @property
+    def body(self) -> str:
+        """Text after the frontmatter"""
+        return self.text[self.body_start:]
+
+    def sections(self, level: int = 2) -> SectionMap:
+        """Section bodies under headings of the given level, by heading title"""
+        sections = self._sections.get(level)
+        if sections is None:
+            sections = self._sections[level] = SectionMap(
+                self.text, [heading for heading in self.headings if heading.level == level]
+            )
+        return sections
+
+    def title(self) -> Optional[str]:
+        """Text of the first level-one heading, without closing hashes"""
+        for heading in self.headings:
+            if heading.level == 1:
+                return _CLOSING_HASHES.sub('', heading.title) or heading.title
+        return None
+
+    def simple_metadata(self) -> Dict[str, str]:
+        """Frontmatter as flat `key: value` strings, without YAML parsing"""
+        return simple_metadata(self.frontmatter)
+
+    def metadata(self) -> Dict:
+        """Frontmatter parsed as YAML; {} when absent. Raises yaml.YAMLError on bad YAML."""
+        return parse_metadata(self.frontmatter)
+
+def simple_metadata(frontmatter: Optional[str]) -> Dict[str, str]:
+    """Raw frontmatter as flat `key: value` strings, without YAML parsing"""
+    metadata = {}
+    if frontmatter:
+        for line in frontmatter.split('\n'):
+            if ':' in line:
+                key, value = line.split(':', 1)
+                metadata[key.strip()] = value.strip().strip('"\'')
+    return metadata
+
+def parse_metadata(frontmatter: Optional[str]) -> Dict:
+    """Raw frontmatter parsed as YAML; {} when absent. Raises yaml.YAMLError on bad YAML."""
+    if not frontmatter:
+        return {}
+    data = yaml.safe_load(frontmatter)
+    return data if isinstance(data, dict) else {}
+
+def read_document(path, encoding: str = 'utf-8') -> MarkdownDocument:
+    """Tokenize a markdown file"""
+    with open(path, 'r', encoding=encoding) as f:
+        return MarkdownDocument(f.read())
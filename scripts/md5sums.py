@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Reader/writer for .ai-ley/shared/md5sums manifests
+
+Both BSD (``MD5 (path) = hash``) and GNU (``hash  path``) lines are read;
+manifests are always written in GNU format with paths relative to
+.ai-ley/shared, so ``md5sum -c`` works from that directory.
+
+Each manifest has a committed ``<section>.sizes`` sidecar in the same
+layout (``size  path``) holding the byte size of every entry, a validator
+that does not depend on when the file was checked out.
+
+Manifests double as a pre-seeded hash cache. Once this checkout has hashed
+a file, its entry is trusted without rehashing only while the file's size,
+mtime and ctime exactly match those recorded then (kept in an uncommitted
+stats file under .project/.cache); copies that preserve an older mtime,
+such as shutil.copy2, still change ctime and are rehashed. A file this
+checkout has never hashed, as on a fresh clone, is trusted when its size
+matches the committed size, so a clone skips the first full rehash. An
+edit that keeps the size before the first build goes unnoticed until the
+file's stats are recorded; run with --check to verify every entry against
+the files on disk.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+# Manifests regenerated from the registry build
+MANIFEST_SECTIONS = ('personas', 'instructions', 'prompts')
+
+SHARED_PREFIX = '.ai-ley/shared/'
+
+# Stats of verified files, relative to the repository root
+DEFAULT_STATS_PATH = os.path.join('.project', '.cache', 'manifest_stats.json')
+
+_BSD_LINE = re.compile(r'^MD5 \((?P<path>.+)\) = (?P<hash>[0-9a-fA-F]{32})$')
+_GNU_LINE = re.compile(r'^(?P<hash>[0-9a-fA-F]{32}) [ *](?P<path>.+)$')
+
+def normalize_path(path):
+    """Normalize a manifest path to be relative to .ai-ley/shared"""
+    path = path.replace('\\', '/')
+    while path.startswith('./'):
+        path = path[2:]
+    if path.startswith(SHARED_PREFIX):
+        path = path[len(SHARED_PREFIX):]
+    return path
+
+def parse_manifest_line(line):
+    """Parse one BSD or GNU md5 line into (path, hash), or None"""
+    line = line.rstrip('\r\n')
+    match = _BSD_LINE.match(line) or _GNU_LINE.match(line)
+    if not match:
+        return None
+    return normalize_path(match.group('path')), match.group('hash').lower()
+
+def read_manifest(manifest_path):
+    """Read a manifest into {path relative to .ai-ley/shared: md5}"""
+    entries = {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parsed = parse_manifest_line(line)
+                if parsed:
+                    entries[parsed[0]] = parsed[1]
+    except OSError:
+        pass
+    return entries
+
+def sizes_path(manifest_path):
+    """The .sizes sidecar of a manifest"""
+    return f"{os.path.splitext(str(manifest_path))[0]}.sizes"
+
+def read_sizes(path):
+    """Read a .sizes sidecar into {path relative to .ai-ley/shared: byte size}"""
+    sizes = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                size, sep, entry = line.rstrip('\r\n').partition('  ')
+                if sep and size.isdigit():
+                    sizes[normalize_path(entry)] = int(size)
+    except OSError:
+        pass
+    return sizes
+
+def render_manifest(entries):
+    """Render {path: md5} as sorted GNU md5sum lines"""
+    return ''.join(f"{md5}  {path}\n" for path, md5 in sorted(entries.items()))
+
+def render_sizes(sizes):
+    """Render {path: size} as sorted sidecar lines"""
+    return ''.join(f"{size}  {path}\n" for path, size in sorted(sizes.items()))
+
+def _write_if_changed(path, content):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+
+    os.makedirs(os.path.dirname(str(path)) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+def write_manifest(manifest_path, entries, sizes=None):
+    """
+    Write a manifest, and its .sizes sidecar when sizes is given, if their
+    content changed; returns True when either file was rewritten.
+    """
+    rewritten = _write_if_changed(manifest_path, render_manifest(entries))
+    if sizes is not None:
+        rewritten = _write_if_changed(sizes_path(manifest_path), render_sizes(sizes)) or rewritten
+    return rewritten
+
+def update_manifests(md5sums_dir, items, sections=MANIFEST_SECTIONS):
+    """
+    Regenerate section manifests from (section, path, md5) items.
+
+    Paths may be relative to the repository or to .ai-ley/shared. Each
+    manifest's .sizes sidecar is refreshed from the files on disk. Only
+    manifests whose content changed are rewritten; returns their names.
+    """
+    shared_dir = os.path.dirname(os.path.abspath(str(md5sums_dir)))
+    manifests = {section: {} for section in sections}
+    sizes = {section: {} for section in sections}
+    for section, path, md5 in items:
+        if section in manifests and md5:
+            relative = normalize_path(path)
+            manifests[section][relative] = md5
+            try:
+                sizes[section][relative] = os.stat(os.path.join(shared_dir, relative)).st_size
+            except OSError:
+                pass
+
+    rewritten = []
+    for section, entries in manifests.items():
+        if write_manifest(os.path.join(md5sums_dir, f"{section}.md5"), entries, sizes[section]):
+            rewritten.append(section)
+    return rewritten
+
+def _stat_key(stat):
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]
+
+class ManifestHashCache:
+    """
+    Hash lookups pre-seeded from every manifest in an md5sums directory.
+
+    An entry is returned for a file whose stat matches the one recorded
+    with record() when the same hash was computed from its bytes; save()
+    (or leaving the context) persists those stats for the next run. Files
+    with no recorded stats fall back to the committed .sizes sidecar.
+    """
+
+    def __init__(self, shared_dir, md5sums_dir=None, stats_path=None):
+        self.shared_dir = os.path.abspath(str(shared_dir))
+        self.md5sums_dir = str(md5sums_dir or os.path.join(self.shared_dir, 'md5sums'))
+        self.stats_path = str(stats_path or os.path.join(
+            os.path.dirname(os.path.dirname(self.shared_dir)), DEFAULT_STATS_PATH
+        ))
+        self._entries = None
+        self._sizes = None
+        self._stats = None
+        self._dirty = False
+
+    def _load(self):
+        self._entries = {}
+        self._sizes = {}
+        try:
+            names = sorted(n for n in os.listdir(self.md5sums_dir) if n.endswith('.md5'))
+        except OSError:
+            names = []
+        for name in names:
+            manifest_path = os.path.join(self.md5sums_dir, name)
+            self._entries.update(read_manifest(manifest_path))
+            self._sizes.update(read_sizes(sizes_path(manifest_path)))
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                self._stats = json.load(f)
+        except (OSError, ValueError):
+            self._stats = {}
+        if not isinstance(self._stats, dict):
+            self._stats = {}
+
+    def _relative(self, file_path):
+        """Path relative to the shared directory, or None for files outside it"""
+        absolute = os.path.abspath(str(file_path))
+        if not absolute.startswith(self.shared_dir + os.sep):
+            return None
+        return os.path.relpath(absolute, self.shared_dir).replace(os.sep, '/')
+
+    def __len__(self):
+        if self._entries is None:
+            self._load()
+        return len(self._entries)
+
+    def lookup(self, file_path, stat=None):
+        """
+        Return the manifest md5 for file_path, else None.
+
+        A file this checkout has hashed must have exactly the verified stat;
+        one it never has (e.g. on a fresh clone) must have the committed size.
+        """
+        if self._entries is None:
+            self._load()
+
+        relative = self._relative(file_path)
+        md5 = self._entries.get(relative) if relative else None
+        if md5 is None:
+            return None
+
+        try:
+            stat = stat or os.stat(file_path)
+        except OSError:
+            return None
+        recorded = self._stats.get(relative)
+        if recorded is not None:
+            return md5 if recorded == [md5, *_stat_key(stat)] else None
+        if self._sizes.get(relative) != stat.st_size:
+            return None
+        # From here on this checkout holds the file to its exact stat
+        self._stats[relative] = [md5, *_stat_key(stat)]
+        self._dirty = True
+        return md5
+
+    __call__ = lookup
+
+    def record(self, file_path, stat, md5):
+        """Note that md5 was computed from file_path's bytes while it had this stat"""
+        if self._entries is None:
+            self._load()
+        relative = self._relative(file_path)
+        if relative is None:
+            return
+        key = [md5, *_stat_key(stat)]
+        if self._stats.get(relative) != key:
+            self._stats[relative] = key
+            self._dirty = True
+
+    def save(self):
+        """Persist recorded stats, dropping files that no longer exist"""
+        if not self._dirty:
+            return
+        stats = {
+            path: key for path, key in sorted(self._stats.items())
+            if os.path.exists(os.path.join(self.shared_dir, path))
+        }
+        os.makedirs(os.path.dirname(self.stats_path) or '.', exist_ok=True)
+        tmp_path = f"{self.stats_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, separators=(',', ':'))
+        os.replace(tmp_path, self.stats_path)
+        self._dirty = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.save()
+
+def verify_manifest(manifest_path, shared_dir):
+    """Yield (path, status) for entries that are 'missing' or 'FAILED' on disk"""
+    for path, md5 in read_manifest(manifest_path).items():
+        hash_md5 = hashlib.md5()
+        try:
+            with open(os.path.join(shared_dir, path), 'rb') as f:
+                for chunk in iter(lambda: f.read(65536), b""):
+                    hash_md5.update(chunk)
+        except OSError:
+            yield path, 'missing'
+            continue
+        if hash_md5.hexdigest() != md5:
+            yield path, 'FAILED'
+
+def main():
+    """Verify the md5sums manifests against .ai-ley/shared"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    shared_dir = os.path.normpath(os.path.join(script_dir, '..', '.ai-ley', 'shared'))
+
+    parser = argparse.ArgumentParser(description="Verify .ai-ley/shared/md5sums manifests")
+    parser.add_argument('--shared', default=shared_dir, help='Shared directory (default: .ai-ley/shared)')
+    parser.add_argument('--check', action='store_true', help='Exit 1 if any manifest entry is stale')
+    args = parser.parse_args()
+
+    md5sums_dir = os.path.join(args.shared, 'md5sums')
+    stale = 0
+    for name in sorted(n for n in os.listdir(md5sums_dir) if n.endswith('.md5')):
+        problems = list(verify_manifest(os.path.join(md5sums_dir, name), args.shared))
+        for path, status in problems:
+            print(f"{path}: {status}")
+        print(f"{name}: {len(problems)} stale entries")
+        stale += len(problems)
+
+    if args.check and stale:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Merkle-tree content digests for "did anything change?" checks
+
+Every directory node carries a digest over its children's names and
+digests, so two trees are identical when their root digests match, and a
+diff only descends into subtrees whose digests differ. File hashes are
+reused from the previous tree whenever size, mtime and ctime are unchanged,
+so refreshing a stored digest only reads files that were actually touched.
+An optional hash cache (such as the md5sums manifests) seeds hashes for
+files the previous tree does not know about yet.
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from md5sums import ManifestHashCache
+
+DIGEST_VERSION = 1
+
+# Generated files that live under .ai-ley/shared but describe it
+DEFAULT_EXCLUDE_DIRS = ('variables',)
+
+def _empty_node():
+    return {'digest': None, 'dirs': {}, 'files': {}}
+
+def _file_md5(path):
+    """MD5 of a file's contents, or None if it cannot be read"""
+    hash_md5 = hashlib.md5()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(65536), b""):
+                hash_md5.update(chunk)
+        return hash_md5.hexdigest()
+    except OSError as e:
+        print(f"Could not read file {path} for MD5 calculation: {e}")
+        return None
+
+def _node_digest(node):
+    """Digest of a directory node from its sorted children"""
+    hash_md5 = hashlib.md5()
+    for name in sorted(node['dirs']):
+        hash_md5.update(f"D {name} {node['dirs'][name]['digest']}\n".encode('utf-8'))
+    for name in sorted(node['files']):
+        hash_md5.update(f"F {name} {node['files'][name][0]}\n".encode('utf-8'))
+    return hash_md5.hexdigest()
+
+def build_tree(root, skip=None, previous=None, exclude_dirs=(), hash_cache=None, _relative=''):
+    """
+    Build a Merkle tree for root.
+
+    skip is an optional predicate called with each file path; exclude_dirs
+    names top-level directories to leave out. previous is an earlier tree
+    for the same root whose file hashes are reused when stat is unchanged.
+    hash_cache is an optional callable (path, stat) -> md5 or None consulted
+    before reading a file the previous tree cannot vouch for; if it has a
+    record(path, stat, md5) method, hashes read from disk are passed back.
+    """
+    node = _empty_node()
+    previous = previous or _empty_node()
+
+    try:
+        entries = sorted(os.scandir(root), key=lambda entry: entry.name)
+    except OSError:
+        entries = []
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if not _relative and entry.name in exclude_dirs:
+                continue
+            child = build_tree(
+                entry.path,
+                skip,
+                previous['dirs'].get(entry.name),
+                exclude_dirs,
+                hash_cache,
+                f"{_relative}{entry.name}/",
+            )
+            if child['dirs'] or child['files']:
+                node['dirs'][entry.name] = child
+        elif entry.is_file(follow_symlinks=False):
+            if skip and skip(entry.path):
+                continue
+            stat = entry.stat()
+            cached = previous['files'].get(entry.name)
+            if cached and cached[1:] == [stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]:
+                file_hash = cached[0]
+            else:
+                file_hash = hash_cache(entry.path, stat) if hash_cache else None
+                if file_hash is None:
+                    file_hash = _file_md5(entry.path)
+                    if file_hash is not None and hasattr(hash_cache, 'record'):
+                        hash_cache.record(entry.path, stat, file_hash)
+                if file_hash is None:
+                    continue
+            node['files'][entry.name] = [file_hash, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns]
+
+    node['digest'] = _node_digest(node)
+    return node
+
+def find_node(tree, relative_dir):
+    """Return the node for a relative directory path, or None"""
+    node = tree
+    for part in [p for p in relative_dir.replace('\\', '/').split('/') if p]:
+        node = node['dirs'].get(part)
+        if node is None:
+            return None
+    return node
+
+def iter_files(tree, prefix=''):
+    """Yield (relative path, md5) for every file in a tree"""
+    for name, entry in tree['files'].items():
+        yield f"{prefix}{name}", entry[0]
+    for name, child in tree['dirs'].items():
+        yield from iter_files(child, f"{prefix}{name}/")
+
+def diff_trees(old, new, prefix=''):
+    """
+    Yield (status, relative path) for files that differ between two trees.
+
+    status is 'added', 'modified' or 'removed'. Subtrees with equal digests
+    are skipped without being visited.
+    """
+    old = old or _empty_node()
+    new = new or _empty_node()
+    if old['digest'] is not None and old['digest'] == new['digest']:
+        return
+
+    for name, entry in new['files'].items():
+        previous = old['files'].get(name)
+        if previous is None:
+            yield 'added', f"{prefix}{name}"
+        elif previous[0] != entry[0]:
+            yield 'modified', f"{prefix}{name}"
+    for name in old['files'].keys() - new['files'].keys():
+        yield 'removed', f"{prefix}{name}"
+
+    for name in old['dirs'].keys() | new['dirs'].keys():
+        yield from diff_trees(old['dirs'].get(name), new['dirs'].get(name), f"{prefix}{name}/")
+
+def changed_subtrees(old, new, prefix='', depth=1):
+    """Relative directories (down to depth levels) whose digests differ"""
+    old = old or _empty_node()
+    new = new or _empty_node()
+    if old['digest'] == new['digest']:
+        return []
+    if depth == 0:
+        return [prefix or '.']
+
+    changed = []
+    for name in sorted(old['dirs'].keys() | new['dirs'].keys()):
+        changed.extend(changed_subtrees(old['dirs'].get(name), new['dirs'].get(name), f"{prefix}{name}/", depth - 1))
+    if old['files'].keys() != new['files'].keys() or any(
+        old['files'][name][0] != entry[0] for name, entry in new['files'].items() if name in old['files']
+    ):
+        changed.append(prefix or '.')
+    return changed
+
+def load_digest(digest_path):
+    """Load a stored tree, or None if missing, unreadable or from another version"""
+    try:
+        with open(digest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get('version') != DIGEST_VERSION:
+        return None
+    return data.get('tree')
+
+def save_digest(tree, digest_path):
+    """Store a tree atomically"""
+    os.makedirs(os.path.dirname(str(digest_path)) or '.', exist_ok=True)
+    tmp_path = f"{digest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': DIGEST_VERSION, 'root': tree['digest'], 'tree': tree}, f, separators=(',', ':'))
+    os.replace(tmp_path, digest_path)
+
+def update_digest(root, digest_path, skip=None, exclude_dirs=DEFAULT_EXCLUDE_DIRS, hash_cache=None):
+    """
+    Refresh a stored digest incrementally.
+
+    Returns (previous tree or None, new tree).
+    """
+    previous = load_digest(digest_path)
+    tree = build_tree(root, skip, previous, exclude_dirs, hash_cache)
+    if previous != tree:
+        save_digest(tree, digest_path)
+    return previous, tree
+
+def main():
+    """Check or update the stored digest of .ai-ley/shared"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    shared_dir = os.path.normpath(os.path.join(script_dir, '..', '.ai-ley', 'shared'))
+
+    parser = argparse.ArgumentParser(description="Merkle digest of .ai-ley/shared")
+    parser.add_argument('--root', default=shared_dir, help='Directory to digest (default: .ai-ley/shared)')
+    parser.add_argument('--digest', help='Stored digest file (default: <root>/variables/digest.json)')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit 1 if the tree differs from the stored digest, without updating it')
+    args = parser.parse_args()
+
+    digest_path = args.digest or os.path.join(args.root, 'variables', 'digest.json')
+
+    if args.check:
+        previous = load_digest(digest_path)
+        with ManifestHashCache(args.root) as hash_cache:
+            tree = build_tree(args.root, previous=previous, exclude_dirs=DEFAULT_EXCLUDE_DIRS,
+                              hash_cache=hash_cache)
+        if previous is not None and previous['digest'] == tree['digest']:
+            print(f"Unchanged: {tree['digest']}")
+            return
+        print(f"Changed: {previous['digest'] if previous else 'none'} -> {tree['digest']}")
+        for subtree in changed_subtrees(previous, tree, depth=2):
+            print(f"  {subtree}")
+        sys.exit(1)
+
+    with ManifestHashCache(args.root) as hash_cache:
+        previous, tree = update_digest(args.root, digest_path, hash_cache=hash_cache)
+    changes = list(diff_trees(previous, tree))
+    for status, path in sorted(changes, key=lambda change: change[1]):
+        print(f"{status:>8}: {path}")
+    print(f"Digest {tree['digest']} written to {digest_path} ({len(changes)} changed files)")
+
+if __name__ == "__main__":
+    main()
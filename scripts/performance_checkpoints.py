@@ -0,0 +1,92 @@
+"""
+Checkpoint store and response cache for persona performance runs
+
+Every generated response is committed as soon as it arrives, keyed by
+(persona md5, scenario id, provider key), and every evaluation is stored
+under the same key plus a rubric key. A crashed sweep can then be resumed
+without regenerating finished responses, and a rubric change re-scores
+cached responses instead of asking the provider again.
+"""
+import hashlib
+import json
+import sqlite3
+from typing import Dict, Optional, Tuple
+
+PairKey = Tuple[str, str, str]
+
+def config_key(config) -> str:
+    """Stable short hash of a JSON-serializable configuration"""
+    return hashlib.md5(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+
+def scenario_id(category: str, scenario: Dict) -> str:
+    """Identifier of a scenario within the test catalog, including a hash of the fields providers see
+
+    Editing a scenario's prompt changes its id, so --resume generates a new
+    response instead of reusing one written for the old prompt.
+    """
+    visible = config_key({'name': scenario['name'], 'prompt': scenario['prompt']})
+    return f"{category}/{scenario['name']}#{visible[:12]}"
+
+class CheckpointStore:
+    """SQLite-backed responses and evaluations for (persona, scenario, provider) pairs"""
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.execute("PRAGMA journal_mode = WAL;")
+        self.conn.execute("PRAGMA synchronous = NORMAL;")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS responses (
+            persona_md5 TEXT NOT NULL,
+            scenario_id TEXT NOT NULL,
+            provider_key TEXT NOT NULL,
+            response TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (persona_md5, scenario_id, provider_key)
+        ) WITHOUT ROWID;
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS evaluations (
+            persona_md5 TEXT NOT NULL,
+            scenario_id TEXT NOT NULL,
+            provider_key TEXT NOT NULL,
+            rubric_key TEXT NOT NULL,
+            evaluation TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (persona_md5, scenario_id, provider_key, rubric_key)
+        ) WITHOUT ROWID;
+        """)
+        self.conn.commit()
+
+    def get_response(self, key: PairKey) -> Optional[str]:
+        row = self.conn.execute(
+            "SELECT response FROM responses WHERE persona_md5 = ? AND scenario_id = ? AND provider_key = ?;", key
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_response(self, key: PairKey, response: str):
+        """Store a response and commit at once, so it survives a crash"""
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (persona_md5, scenario_id, provider_key, response) VALUES (?, ?, ?, ?);",
+            (*key, response)
+        )
+        self.conn.commit()
+
+    def get_evaluation(self, key: PairKey, rubric_key: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT evaluation FROM evaluations WHERE persona_md5 = ? AND scenario_id = ? AND provider_key = ? "
+            "AND rubric_key = ?;", (*key, rubric_key)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_evaluations(self, rows):
+        """Store (key, rubric key, evaluation) rows in one transaction"""
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO evaluations (persona_md5, scenario_id, provider_key, rubric_key, evaluation) "
+            "VALUES (?, ?, ?, ?, ?);",
+            [(*key, rubric_key, json.dumps(evaluation)) for key, rubric_key, evaluation in rows]
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Rule-based persona lint against the persona templates
+
+Each template in templates/personas is parsed once into a TemplateSchema:
+its numbered level-two sections, their level-three subsections and the
+bracketed placeholders it ships with. A persona is tokenized once and
+checked against the schema it shares the most section titles with; every
+rule runs over that one parse and all hits for the file are reported
+together. Results are cached by persona MD5 and template set, and uncached
+personas can be linted across processes.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import yaml
+
+from content_scanner import default_cache_path, persona_scanner
+from markdown_sections import MarkdownDocument, read_document
+from registry_ingest import EXCLUDE_FILES
+
+# Bump when rules change so cached results are recomputed
+LINT_VERSION = 1
+
+# Schema used when a persona shares no section titles with any template
+DEFAULT_TEMPLATE = 'standard'
+
+SEVERITIES = ('error', 'warning', 'info')
+
+# Placeholder text that is not copied from a template
+PLACEHOLDER_PHRASES = ('Awaiting summary.', 'Lorem ipsum')
+
+# Frontmatter values build_registry_phase2 fills in when a key is missing
+DEFAULT_FRONTMATTER = {
+    'description': 'Awaiting summary.',
+    'keywords': [],
+}
+
+_SECTION_NUMBER = re.compile(r'^(\d+)\.\s*')
+_PLACEHOLDER = re.compile(r'\[([^\[\]\n]{3,})\](?!\()')
+_OUTER_FENCE = re.compile(r'\A(`{3,}|~{3,})[^\n]*\n(.*)\n\1[ \t]*\n?\Z', re.DOTALL)
+
+class Hit(NamedTuple):
+    """One rule violation; line is 1-based, or None for file-level hits"""
+    rule: str
+    severity: str
+    message: str
+    line: Optional[int] = None
+
+class SectionRule(NamedTuple):
+    """A template section personas are expected to carry, in order"""
+    number: Optional[int]
+    title: str
+    subsections: Tuple[str, ...]
+
+def normalize_title(title: str) -> str:
+    """Heading title without its number, compared case- and spacing-insensitively"""
+    return ' '.join(_SECTION_NUMBER.sub('', title).lower().split())
+
+class TemplateSchema:
+    """Section layout and placeholders of one persona template"""
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        # Some templates are wrapped in a markdown fence so they render as source
+        match = _OUTER_FENCE.match(text.strip('\n') + '\n')
+        if match:
+            text = match.group(2) + '\n'
+        document = MarkdownDocument(text)
+
+        sections = []
+        for heading in document.headings:
+            if heading.level == 2:
+                number = _SECTION_NUMBER.match(heading.title)
+                sections.append([int(number.group(1)) if number else None, heading.title, []])
+            elif heading.level == 3 and sections:
+                sections[-1][2].append(heading.title)
+        self.sections = [SectionRule(number, title, tuple(subsections)) for number, title, subsections in sections]
+        self.index = {normalize_title(rule.title): position for position, rule in enumerate(self.sections)}
+        self.placeholders = sorted({match.group(0) for match in _PLACEHOLDER.finditer(text)})
+        self.digest = hashlib.md5(text.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_file(cls, path) -> 'TemplateSchema':
+        path = Path(path)
+        return cls(path.stem, path.read_text(encoding='utf-8'))
+
+    def matches(self, titles) -> int:
+        """How many of the given normalized titles are sections of this template"""
+        return sum(1 for title in titles if title in self.index)
+
+class PersonaLinter:
+    """Lint personas against the schemas of every template in templates_dir"""
+
+    def __init__(self, templates_dir, template: Optional[str] = None):
+        self.templates_dir = Path(templates_dir)
+        self.schemas = {
+            path.stem: TemplateSchema.from_file(path) for path in sorted(self.templates_dir.glob('*.md'))
+        }
+        if not self.schemas:
+            raise FileNotFoundError(f"No persona templates found in {self.templates_dir}")
+        if template and template not in self.schemas:
+            raise ValueError(f"Unknown template '{template}' (available: {', '.join(self.schemas)})")
+        self.template = template
+        self.schema_hash = hashlib.md5(
+            json.dumps([template] + [schema.digest for schema in self.schemas.values()]).encode('utf-8')
+        ).hexdigest()
+
+        # Every template's placeholders, plus the stock phrases, in one pass
+        placeholders = {text for schema in self.schemas.values() for text in schema.placeholders}
+        placeholders.update(PLACEHOLDER_PHRASES)
+        self.placeholder_pattern = re.compile(
+            '|'.join(re.escape(text) for text in sorted(placeholders, key=len, reverse=True))
+        )
+
+    def select_schema(self, titles: List[str]) -> TemplateSchema:
+        """The forced template, else the one sharing most section titles (ties go to the default)"""
+        if self.template:
+            return self.schemas[self.template]
+        default = self.schemas.get(DEFAULT_TEMPLATE) or next(iter(self.schemas.values()))
+        best = max(self.schemas.values(), key=lambda schema: (schema.matches(titles), schema is default))
+        return best if best.matches(titles) else default
+
+    def lint_file(self, filepath, document: Optional[MarkdownDocument] = None) -> Dict:
+        """Lint one persona, reading it unless a tokenized document is given"""
+        try:
+            document = document or read_document(filepath)
+        except UnicodeDecodeError as e:
+            return self._result(filepath, None, [Hit('encoding', 'error', f"Not valid UTF-8: {e}")])
+        return self.lint_document(filepath, document)
+
+    def lint_item(self, item) -> Dict:
+        """Lint a content_scanner.ContentItem, reusing its tokenized document"""
+        try:
+            document = item.document
+        except UnicodeDecodeError as e:
+            return self._result(item.path, None, [Hit('encoding', 'error', f"Not valid UTF-8: {e}")])
+        return self.lint_document(item.path, document)
+
+    def lint_document(self, filepath, document: MarkdownDocument) -> Dict:
+        """Run every rule over one tokenized persona"""
+        text = document.text
+        hits = []
+
+        def line_of(offset: int) -> int:
+            return text.count('\n', 0, offset) + 1
+
+        # Frontmatter
+        if document.frontmatter is None:
+            hits.append(Hit('frontmatter-missing', 'error', "No YAML frontmatter block", 1))
+        else:
+            try:
+                metadata = document.metadata()
+            except yaml.YAMLError as e:
+                hits.append(Hit('frontmatter-invalid', 'error', f"Frontmatter is not valid YAML: {e}", 1))
+            else:
+                for key, default in DEFAULT_FRONTMATTER.items():
+                    if metadata.get(key) == default:
+                        hits.append(Hit('frontmatter-default', 'warning',
+                                        f"Frontmatter '{key}' still has its default value {default!r}", 1))
+
+        if document.title() is None:
+            hits.append(Hit('title-missing', 'error', "No level-one title heading"))
+
+        # Sections, against the closest template
+        headings = [heading for heading in document.headings if heading.level == 2]
+        titles = [normalize_title(heading.title) for heading in headings]
+        schema = self.select_schema(titles)
+
+        found = {}
+        for heading, title in zip(headings, titles):
+            position = schema.index.get(title)
+            if position is not None and position not in found:
+                found[position] = heading
+
+        for position, rule in enumerate(schema.sections):
+            if position not in found:
+                hits.append(Hit('section-missing', 'error', f"Missing section '{rule.title}'"))
+
+        latest = None
+        for position, heading in sorted(found.items(), key=lambda entry: entry[1].start):
+            rule = schema.sections[position]
+            line = line_of(heading.start)
+            if latest is not None and position < latest:
+                hits.append(Hit('section-order', 'warning',
+                                f"Section '{rule.title}' comes after '{schema.sections[latest].title}'", line))
+            latest = position if latest is None else max(latest, position)
+
+            number = _SECTION_NUMBER.match(heading.title)
+            if rule.number is not None and (number is None or int(number.group(1)) != rule.number):
+                hits.append(Hit('section-number', 'warning',
+                                f"Section '{heading.title}' should be numbered {rule.number}", line))
+
+            body = text[heading.body_start:heading.end]
+            if not body.replace('---', '').strip():
+                hits.append(Hit('section-empty', 'warning', f"Section '{rule.title}' is empty", line))
+
+            if rule.subsections:
+                present = {
+                    normalize_title(sub.title) for sub in document.headings
+                    if sub.level == 3 and heading.start < sub.start < heading.end
+                }
+                for subsection in rule.subsections:
+                    if normalize_title(subsection) not in present:
+                        hits.append(Hit('subsection-missing', 'info',
+                                        f"Section '{rule.title}' has no '{subsection}' subsection", line))
+
+        # Placeholder text left in from a template; frontmatter defaults are reported above
+        for match in self.placeholder_pattern.finditer(text, document.body_start):
+            hits.append(Hit('placeholder', 'warning', f"Placeholder text {match.group(0)!r}",
+                            line_of(match.start())))
+
+        return self._result(filepath, schema.name, hits)
+
+    @staticmethod
+    def _result(filepath, template: Optional[str], hits: List[Hit]) -> Dict:
+        return {
+            'path': str(filepath),
+            'template': template,
+            'hits': [hit._asdict() for hit in hits],
+        }
+
+    def iter_lint(self, scanner, jobs: int = 1, cache: Optional['LintCache'] = None) -> Iterator[Dict]:
+        """
+        Yield a lint result for every persona the scanner finds, in scan order.
+
+        Personas whose MD5 matches a cached result are not linted again; the
+        rest are linted serially from the scanner's document, or across
+        `jobs` processes when jobs > 1.
+        """
+        self.last_run = {'linted': 0, 'cached': 0}
+        entries = []
+        pending = []
+        for item in scanner:
+            if item.name in EXCLUDE_FILES:
+                continue
+            try:
+                md5sum = item.md5
+            except OSError as e:
+                entries.append(self._result(item.path, None, [Hit('unreadable', 'error', str(e))]))
+                continue
+            result = cache.get(item.path, md5sum) if cache else None
+            if result is None:
+                pending.append((len(entries), item, md5sum))
+            entries.append(result)
+        self.last_run['cached'] = len(entries) - len(pending)
+        self.last_run['linted'] = len(pending)
+
+        if jobs > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                     initargs=(str(self.templates_dir), self.template)) as executor:
+                results = executor.map(_lint_in_worker, [item.path for _, item, _ in pending], chunksize=8)
+                linted = list(results)
+        else:
+            linted = [self.lint_item(item) for _, item, _ in pending]
+
+        for (position, item, md5sum), result in zip(pending, linted):
+            entries[position] = result
+            if cache:
+                cache.put(item.path, md5sum, result)
+        if cache:
+            cache.commit()
+        yield from entries
+
+_worker_linter = None
+
+def _init_worker(templates_dir: str, template: Optional[str]):
+    global _worker_linter
+    _worker_linter = PersonaLinter(templates_dir, template)
+
+def _lint_in_worker(filepath: str) -> Dict:
+    return _worker_linter.lint_file(filepath)
+
+class LintCache:
+    """Lint results by persona path, valid for one file MD5, lint version and template set"""
+
+    def __init__(self, db_path: Path, schema_hash: str):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS lint_results (
+            path TEXT PRIMARY KEY,
+            md5 TEXT NOT NULL,
+            lint_version INTEGER NOT NULL,
+            schema_hash TEXT NOT NULL,
+            result TEXT NOT NULL
+        ) WITHOUT ROWID;
+        """)
+        self.conn.execute(
+            "DELETE FROM lint_results WHERE lint_version != ? OR schema_hash != ?;", (LINT_VERSION, schema_hash)
+        )
+        self.schema_hash = schema_hash
+
+    def get(self, path: str, md5sum: str) -> Optional[Dict]:
+        row = self.conn.execute(
+            "SELECT result FROM lint_results WHERE path = ? AND md5 = ?;", (path, md5sum)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, path: str, md5sum: str, result: Dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO lint_results (path, md5, lint_version, schema_hash, result) VALUES (?, ?, ?, ?, ?);",
+            (path, md5sum, LINT_VERSION, self.schema_hash, json.dumps(result))
+        )
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+def main():
+    """Lint every persona and print rule hits"""
+    parser = argparse.ArgumentParser(description="Lint personas against the persona templates")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Lint personas in N processes (default: 1)')
+    parser.add_argument('--no-cache', action='store_true', help='Relint every persona, ignoring cached results')
+    parser.add_argument('--template', help='Check every persona against this template instead of the closest one')
+    parser.add_argument('--severity', choices=SEVERITIES, default='warning',
+                        help='Lowest severity to print (default: warning)')
+    parser.add_argument('--json', action='store_true', help='Print one JSON result per persona')
+    args = parser.parse_args()
+
+    repo_dir = Path(__file__).parent.parent
+    personas_dir = repo_dir / '.ai-ley' / 'shared' / 'personas'
+    templates_dir = repo_dir / '.ai-ley' / 'shared' / 'templates' / 'personas'
+    if not personas_dir.exists():
+        print(f"Error: Personas directory not found at {personas_dir}")
+        return 2
+
+    try:
+        linter = PersonaLinter(templates_dir, args.template)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+
+    shown = SEVERITIES[:SEVERITIES.index(args.severity) + 1]
+    cache = None if args.no_cache else LintCache(repo_dir / '.project' / '.cache' / 'persona_lint.db', linter.schema_hash)
+    scanner = persona_scanner(personas_dir, default_cache_path(repo_dir))
+    counts = dict.fromkeys(SEVERITIES, 0)
+    personas = 0
+    try:
+        for result in linter.iter_lint(scanner, jobs=args.jobs, cache=cache):
+            personas += 1
+            hits = [hit for hit in result['hits'] if hit['severity'] in shown]
+            for hit in result['hits']:
+                counts[hit['severity']] += 1
+            if args.json:
+                print(json.dumps({**result, 'hits': hits}))
+                continue
+            rel_path = os.path.relpath(result['path'], repo_dir)
+            for hit in hits:
+                location = f"{rel_path}:{hit['line']}" if hit['line'] else rel_path
+                print(f"{location}: {hit['severity']}: {hit['message']} [{hit['rule']}]")
+    finally:
+        scanner.close()
+        if cache:
+            cache.close()
+
+    print(f"Linted {linter.last_run['linted']} personas, reused {linter.last_run['cached']} cached results: "
+          f"{counts['error']} errors, {counts['warning']} warnings, {counts['info']} notes across {personas} personas",
+          file=sys.stderr)
+    return 1 if counts['error'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
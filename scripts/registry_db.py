@@ -0,0 +1,327 @@
+"""
+Shared SQLite schema and helpers for the registry database
+"""
+import json
+import sqlite3
+from datetime import datetime
+
+# Normalized many-to-many tables: table name -> (term column, frontmatter key)
+TERM_TABLES = {
+    'item_keywords': ('keyword', 'keywords'),
+    'item_apply_to': ('apply_to', 'applyTo'),
+    'item_extensions': ('extension', 'extensions'),
+}
+
+# Lookup aliases accepted by find_items_by_tag
+TAG_KINDS = {
+    'keyword': 'item_keywords',
+    'keywords': 'item_keywords',
+    'apply_to': 'item_apply_to',
+    'applyTo': 'item_apply_to',
+    'extension': 'item_extensions',
+    'extensions': 'item_extensions',
+}
+
+# Applied on every open; journal_mode is only switched by writers
+READ_PRAGMAS = (
+    "PRAGMA mmap_size = 268435456;",
+    "PRAGMA cache_size = -16000;",
+    "PRAGMA temp_store = MEMORY;",
+)
+WRITE_PRAGMAS = (
+    "PRAGMA journal_mode = WAL;",
+    "PRAGMA synchronous = NORMAL;",
+)
+
+# Composite/covering indexes for the queries the CLI and agents actually run.
+# Each comment names the access pattern the index serves without a table
+# lookup or temp B-tree.
+COVERING_INDEXES = {
+    # type = ? ORDER BY summary_score DESC LIMIT n
+    'idx_type_score': "registry_items(type, summary_score DESC, name, path, title)",
+    # type = ? ORDER BY name (Registry.query default ordering)
+    'idx_type_name': "registry_items(type, name, path, title, summary_score)",
+    # type = ? AND (title|path) LIKE '%x%' ORDER BY title
+    'idx_type_title': "registry_items(type, title, path, description)",
+    # type = ? AND agent_mode = ? ORDER BY title
+    'idx_type_agent_mode': "registry_items(type, agent_mode, title, instruction_type)",
+    # source_repo = ? [AND type = ?] ORDER BY type, name (ported content)
+    'idx_source_repo': "registry_items(source_repo, type, name, path, title)",
+}
+
+# Columns added after the original schema, applied to existing databases
+ADDED_COLUMNS = {
+    'source_repo': 'TEXT',
+}
+
+# Superseded by the composite indexes above (path is already UNIQUE)
+REDUNDANT_INDEXES = ('idx_type', 'idx_path')
+
+def connect(db_path, readonly=False, cached_statements=256):
+    """Open registry.db with the read (and, for writers, WAL) pragmas applied"""
+    if readonly:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, cached_statements=cached_statements)
+    else:
+        conn = sqlite3.connect(str(db_path), cached_statements=cached_statements)
+        for pragma in WRITE_PRAGMAS:
+            conn.execute(pragma)
+    for pragma in READ_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def optimize(conn):
+    """Refresh planner statistics after a bulk load"""
+    conn.execute("ANALYZE;")
+
+def create_schema(cursor):
+    """Create the registry database schema"""
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS registry_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        type TEXT NOT NULL,
+        name TEXT NOT NULL,
+        path TEXT UNIQUE NOT NULL,
+        title TEXT,
+        description TEXT,
+        version TEXT,
+        author TEXT,
+        last_updated DATETIME,
+        md5sum TEXT,
+        summary_score REAL,
+        apply_to TEXT, -- JSON array as string
+        keywords TEXT, -- JSON array as string
+        extensions TEXT, -- JSON array as string
+        agent_mode TEXT,
+        instruction_type TEXT,
+        guidelines TEXT,
+        source_repo TEXT, -- NULL for native content
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+    existing = {row[1] for row in cursor.execute("PRAGMA table_info(registry_items);")}
+    for column, definition in ADDED_COLUMNS.items():
+        if column not in existing:
+            cursor.execute(f"ALTER TABLE registry_items ADD COLUMN {column} {definition};")
+
+    # Create indexes for better query performance
+    for index in REDUNDANT_INDEXES:
+        cursor.execute(f"DROP INDEX IF EXISTS {index};")
+    for index, definition in COVERING_INDEXES.items():
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {definition};")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_title ON registry_items(title);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_score ON registry_items(summary_score);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_agent_mode ON registry_items(agent_mode);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_instruction_type ON registry_items(instruction_type);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_last_updated ON registry_items(last_updated);")
+
+    # Normalized tag tables keyed by (term, item_id) so exact and prefix
+    # lookups are index seeks instead of LIKE scans over JSON strings
+    for table, (column, _) in TERM_TABLES.items():
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            item_id INTEGER NOT NULL REFERENCES registry_items(id) ON DELETE CASCADE,
+            {column} TEXT NOT NULL,
+            PRIMARY KEY ({column}, item_id)
+        ) WITHOUT ROWID;
+        """)
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_item ON {table}(item_id);")
+
+    # Cross-reference edges keyed by path so they survive registry rebuilds;
+    # the primary key serves reverse lookups, idx_item_references_source
+    # serves re-extraction of one source
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS item_references (
+        source TEXT NOT NULL,
+        target TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        PRIMARY KEY (target, source, kind)
+    ) WITHOUT ROWID;
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_item_references_source ON item_references(source);")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS reference_sources (
+        source TEXT PRIMARY KEY,
+        md5sum TEXT
+    ) WITHOUT ROWID;
+    """)
+
+    # Token counts and heading-delimited chunks keyed by path and md5sum so
+    # unchanged items keep them across rebuilds (see token_counts.py). A
+    # chunk is a heading's section as a byte range of the file, with its own
+    # hash so caches can be invalidated per section.
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS item_tokens (
+        path TEXT PRIMARY KEY,
+        md5sum TEXT,
+        tokenizer TEXT NOT NULL,
+        tokens INTEGER NOT NULL,
+        body_tokens INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    """)
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS item_chunks (
+        path TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        level INTEGER NOT NULL,
+        title TEXT NOT NULL,
+        byte_offset INTEGER NOT NULL,
+        byte_length INTEGER NOT NULL,
+        md5sum TEXT NOT NULL,
+        tokens INTEGER NOT NULL,
+        PRIMARY KEY (path, position)
+    ) WITHOUT ROWID;
+    """)
+
+def migrate_schema(conn):
+    """
+    Upgrade data left by older builds; call after create_schema.
+
+    Only writers call this. Pending changes are committed first, then each
+    step runs in a transaction of its own and is committed or rolled back
+    as a whole.
+    """
+    # section_tokens had no byte ranges; forgetting the stored counts makes
+    # the next build chunk every item again
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'section_tokens';").fetchone():
+        conn.commit()
+        conn.execute("BEGIN;")
+        try:
+            conn.execute("DELETE FROM item_tokens;")
+            conn.execute("DROP TABLE section_tokens;")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+def normalize_terms(value):
+    """Normalize a frontmatter list or comma-separated string into unique lowercase terms"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    elif not isinstance(value, (list, tuple, set)):
+        value = [value]
+
+    terms = []
+    for term in value:
+        if term is None:
+            continue
+        term = str(term).strip().strip('"\'').lower()
+        if term and term not in terms:
+            terms.append(term)
+    return terms
+
+def parse_last_updated(value):
+    """Parse a lastUpdated frontmatter value into a datetime, or None"""
+    if value and isinstance(value, str):
+        try:
+            # Handle ISO format with 'T' separator
+            if 'T' in value:
+                return datetime.fromisoformat(value.replace('Z', '+00:00'))
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    return value
+
+def clear_registry(cursor):
+    """Remove all registry items and their normalized terms"""
+    for table in TERM_TABLES:
+        cursor.execute(f"DELETE FROM {table};")
+    cursor.execute("DELETE FROM registry_items;")
+
+def replace_item_terms(cursor, item_id, metadata):
+    """Rewrite the normalized keyword/applyTo/extension rows for one item"""
+    for table, (column, key) in TERM_TABLES.items():
+        cursor.execute(f"DELETE FROM {table} WHERE item_id = ?;", (item_id,))
+        cursor.executemany(
+            f"INSERT OR IGNORE INTO {table} (item_id, {column}) VALUES (?, ?);",
+            [(item_id, term) for term in normalize_terms(metadata.get(key))]
+        )
+
+def upsert_item(cursor, item_type, name, metadata, last_updated, updated_at=None):
+    """Insert or replace a registry row and its normalized terms, returning the row id"""
+    # Convert arrays to JSON strings
+    keywords = json.dumps(metadata.get('keywords', [])) if metadata.get('keywords') else None
+    extensions = json.dumps(metadata.get('extensions', [])) if metadata.get('extensions') else None
+    apply_to = json.dumps(metadata.get('applyTo', [])) if metadata.get('applyTo') else None
+
+    # INSERT OR REPLACE assigns a new id, so drop the old item's terms first
+    for table in TERM_TABLES:
+        cursor.execute(f"""
+        DELETE FROM {table} WHERE item_id IN (SELECT id FROM registry_items WHERE path = ?);
+        """, (metadata.get('path'),))
+
+    cursor.execute("""
+    INSERT OR REPLACE INTO registry_items (
+        type, name, path, title, description, version, author,
+        last_updated, md5sum, summary_score, apply_to, keywords,
+        extensions, agent_mode, instruction_type, guidelines,
+        source_repo, updated_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+    """, (
+        item_type,
+        name,
+        metadata.get('path'),
+        metadata.get('title'),
+        metadata.get('description'),
+        metadata.get('version'),
+        metadata.get('author'),
+        last_updated,
+        metadata.get('md5sum'),
+        metadata.get('summaryScore'),
+        apply_to,
+        keywords,
+        extensions,
+        metadata.get('agentMode'),
+        metadata.get('instructionType'),
+        metadata.get('guidelines'),
+        metadata.get('sourceRepo'),
+        updated_at
+    ))
+    item_id = cursor.lastrowid
+    replace_item_terms(cursor, item_id, metadata)
+    return item_id
+
+def _prefix_upper_bound(prefix):
+    """Smallest string greater than every string starting with prefix"""
+    return prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def find_items_by_tag(conn, kind, value, prefix=False, item_type=None, columns=('type', 'name', 'path', 'title')):
+    """
+    Find registry items by keyword, applyTo or extension.
+
+    Exact matches use an equality seek on the (term, item_id) primary key;
+    prefix matches use a half-open range on the same key, so neither scans.
+    """
+    if kind not in TAG_KINDS:
+        raise ValueError(f"Unknown tag kind '{kind}'. Expected one of: {', '.join(sorted(TAG_KINDS))}")
+
+    table = TAG_KINDS[kind]
+    column = TERM_TABLES[table][0]
+    term = normalize_terms(value)
+    if not term:
+        return []
+    term = term[0]
+
+    select = ', '.join(f"r.{c}" for c in columns)
+    if prefix:
+        where = f"t.{column} >= ? AND t.{column} < ?"
+        params = [term, _prefix_upper_bound(term)]
+    else:
+        where = f"t.{column} = ?"
+        params = [term]
+
+    if item_type:
+        where += " AND r.type = ?"
+        params.append(item_type)
+
+    query = f"""
+    SELECT DISTINCT {select}
+    FROM {table} t
+    JOIN registry_items r ON r.id = t.item_id
+    WHERE {where}
+    ORDER BY r.type, r.name
+    """
+    return conn.execute(query, params).fetchall()
@@ -0,0 +1,198 @@
+"""
+Registry sections, item names and provenance for native and ported content
+
+Native content lives under .ai-ley/shared; chatmodes live under
+.github/chatmodes. Content copied in by ``ai-ley.py --port`` is recorded in
+variables/ported.json as {repository-relative path: source repo} so both
+the port-time ingest and full registry rebuilds tag it with source_repo.
+"""
+import json
+import os
+
+from content_scanner import ContentScanner
+from registry_db import TERM_TABLES, connect, create_schema, migrate_schema, parse_last_updated, upsert_item
+from token_counts import TokenCountRefresh
+
+PORTED_SOURCES_PATH = '.ai-ley/shared/variables/ported.json'
+
+# Path fragment -> registry section, checked in order
+SECTION_MARKERS = (
+    ('/chatmodes/', 'chatmodes'),
+    ('/personas/', 'personas'),
+    ('/instructions/', 'instructions'),
+    ('/workflows/', 'workflows'),
+    ('/schemas/', 'schemas'),
+    ('/prompts/', 'prompts'),
+    ('/policies/', 'policies'),
+)
+
+EXCLUDE_FILES = ('README.md', 'CHANGES.md', '.gitkeep')
+
+def determine_section(rel_path):
+    """Registry section for a repository-relative path, or 'unknown'"""
+    rel_path = '/' + rel_path.replace('\\', '/')
+    if rel_path.endswith('.chatmode.md'):
+        return 'chatmodes'
+    for marker, section in SECTION_MARKERS:
+        if marker in rel_path:
+            return section
+    return 'unknown'
+
+def item_name(rel_path):
+    """Unique registry item name for a repository-relative path"""
+    name = rel_path.replace('\\', '/')
+    for prefix in ('.ai-ley/shared/', '.github/'):
+        if name.startswith(prefix):
+            name = name[len(prefix):]
+            break
+    for suffix in ('.chatmode.md', '.prompt.md', '.md', '.yaml', '.yml'):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return name.replace('/', '_')
+
+def read_metadata(filepath, base_dir):
+    """Frontmatter metadata plus path and md5sum, or None if the file cannot be parsed"""
+    return item_metadata(ContentScanner(base_dir).item(filepath), base_dir)
+
+def item_metadata(item, base_dir):
+    """read_metadata for a content_scanner.ContentItem, reusing its cached facets"""
+    try:
+        metadata = item.metadata()
+    except OSError as e:
+        print(f"Error reading {item.path}: {e}")
+        return None
+    except Exception as e:
+        print(f"Error loading frontmatter from {item.path}: {e}")
+        return None
+
+    metadata['path'] = os.path.relpath(item.path, base_dir).replace(os.sep, '/')
+    metadata['md5sum'] = item.md5
+    if not metadata.get('title'):
+        metadata['title'] = item.title
+    for key in ('keywords', 'extensions'):
+        if isinstance(metadata.get(key), str):
+            metadata[key] = [value.strip() for value in metadata[key].split(',')]
+    return metadata
+
+def load_ported_sources(base_dir):
+    """{repository-relative path: source repo} for ported content"""
+    try:
+        with open(os.path.join(base_dir, PORTED_SOURCES_PATH), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def record_ported_sources(base_dir, rel_paths, source_repo, replaced_dirs=()):
+    """
+    Record rel_paths as ported from source_repo.
+
+    Entries under replaced_dirs that no longer exist are dropped, since a
+    directory port replaces the whole target. Returns the updated mapping.
+    """
+    sources = load_ported_sources(base_dir)
+    for directory in replaced_dirs:
+        prefix = directory.rstrip('/') + '/'
+        for path in [p for p in sources if p.startswith(prefix)]:
+            if not os.path.exists(os.path.join(base_dir, path)):
+                del sources[path]
+    for path in rel_paths:
+        sources[path] = source_repo
+
+    sources_path = os.path.join(base_dir, PORTED_SOURCES_PATH)
+    os.makedirs(os.path.dirname(sources_path), exist_ok=True)
+    tmp_path = f"{sources_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(sources.items())), f, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, sources_path)
+    return sources
+
+def prune_missing(cursor, base_dir, directories):
+    """
+    Delete registry rows, references and token counts for files under the
+    given repository-relative directories that no longer exist.
+
+    Returns the removed paths.
+    """
+    removed = []
+    for directory in directories:
+        prefix = directory.rstrip('/') + '/'
+        # '0' sorts right after '/', so this is a range scan over the prefix
+        bounds = (prefix, prefix[:-1] + '0')
+        paths = {path for (path,) in cursor.execute(
+            "SELECT path FROM registry_items WHERE path >= ? AND path < ?;", bounds
+        )}
+        paths.update(path for (path,) in cursor.execute(
+            "SELECT path FROM item_tokens WHERE path >= ? AND path < ?;", bounds
+        ))
+        paths.update(source for (source,) in cursor.execute(
+            "SELECT source FROM reference_sources WHERE source >= ? AND source < ?;", bounds
+        ))
+        for path in sorted(paths):
+            if os.path.exists(os.path.join(base_dir, path)):
+                continue
+            for table in TERM_TABLES:
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE item_id IN (SELECT id FROM registry_items WHERE path = ?);", (path,)
+                )
+            cursor.execute("DELETE FROM registry_items WHERE path = ?;", (path,))
+            cursor.execute("DELETE FROM item_references WHERE source = ?;", (path,))
+            cursor.execute("DELETE FROM reference_sources WHERE source = ?;", (path,))
+            cursor.execute("DELETE FROM item_chunks WHERE path = ?;", (path,))
+            cursor.execute("DELETE FROM item_tokens WHERE path = ?;", (path,))
+            removed.append(path)
+    return removed
+
+def ingest_files(db_path, base_dir, rel_paths, source_repo=None, replaced_dirs=()):
+    """
+    Upsert just the given files, and their token counts, into registry.db.
+
+    Rows for files that disappeared from replaced_dirs (directories a port
+    replaced wholesale) are deleted first. Files outside a known section are
+    skipped. Returns {section: count}.
+    """
+    counts = {}
+    scanner = ContentScanner(base_dir)
+    conn = connect(db_path)
+    try:
+        cursor = conn.cursor()
+        create_schema(cursor)
+        migrate_schema(conn)
+        removed = prune_missing(cursor, base_dir, replaced_dirs)
+        if removed:
+            print(f"Removed {len(removed)} registry item(s) no longer present after the port")
+        token_counts = TokenCountRefresh(conn)
+        for rel_path in rel_paths:
+            section = determine_section(rel_path)
+            if section == 'unknown' or os.path.basename(rel_path) in EXCLUDE_FILES:
+                continue
+            item = scanner.item(os.path.join(base_dir, rel_path))
+            metadata = item_metadata(item, base_dir)
+            if metadata is None:
+                continue
+            if source_repo:
+                metadata['sourceRepo'] = source_repo
+            upsert_item(cursor, section, item_name(rel_path), metadata,
+                        parse_last_updated(metadata.get('lastUpdated')))
+            counts[section] = counts.get(section, 0) + 1
+            # Counted from the bytes read for the metadata, not a second read
+            token_counts.add(metadata['path'], metadata['md5sum'], lambda: item.data)
+        token_counts.finish(prune=False)
+    finally:
+        conn.close()
+    return counts
+
+def iter_source_files(base_dir, folders, exclude_files=EXCLUDE_FILES, ported=None):
+    """
+    Yield absolute paths of registry source files.
+
+    Walks the given repository-relative folders, then adds ported files
+    that live outside them (e.g. .github/instructions).
+    """
+    return source_scanner(base_dir, folders, exclude_files, ported).paths()
+
+def source_scanner(base_dir, folders, exclude_files=EXCLUDE_FILES, ported=None, cache_path=None, hash_cache=None):
+    """ContentScanner over the registry source files that iter_source_files lists"""
+    return ContentScanner(base_dir, folders, exclude_files, extra_paths=ported or {},
+                          cache_path=cache_path, hash_cache=hash_cache)
@@ -0,0 +1,94 @@
+"""
+Streaming JSON Lines registry format
+
+Each line is one registry item::
+
+    {"type": "personas", "name": "personas_design_product", "metadata": {...}}
+
+The writer emits items as the builder scans them and the importer streams
+lines into SQLite, so neither side holds the whole catalog in memory.
+"""
+import json
+import os
+
+from registry_db import clear_registry, parse_last_updated, upsert_item
+
+class JsonlRegistryWriter:
+    """Write registry items one line at a time, replacing the target atomically on close"""
+
+    def __init__(self, jsonl_path):
+        self.jsonl_path = str(jsonl_path)
+        self.tmp_path = f"{self.jsonl_path}.tmp"
+        self.counts = {}
+        self._file = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.jsonl_path) or '.', exist_ok=True)
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        return self
+
+    def write(self, item_type, name, metadata):
+        """Append one item"""
+        line = json.dumps(
+            {'type': item_type, 'name': name, 'metadata': metadata},
+            ensure_ascii=False,
+            default=str,
+        )
+        self._file.write(line + '\n')
+        self.counts[item_type] = self.counts.get(item_type, 0) + 1
+
+    def __exit__(self, exc_type, exc, tb):
+        self._file.close()
+        if exc_type is None:
+            os.replace(self.tmp_path, self.jsonl_path)
+        else:
+            os.remove(self.tmp_path)
+
+def iter_registry_jsonl(jsonl_path):
+    """Yield (item_type, name, metadata) from a JSONL registry, one line at a time"""
+    with open(jsonl_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"Skipping invalid JSONL line {line_number} in {jsonl_path}: {e}")
+                continue
+            if not isinstance(entry, dict) or not isinstance(entry.get('metadata'), dict):
+                print(f"Skipping malformed registry entry on line {line_number} in {jsonl_path}")
+                continue
+            yield entry.get('type'), entry.get('name'), entry['metadata']
+
+def migrate_from_jsonl(conn, jsonl_path):
+    """
+    Replace the SQLite registry with a JSONL registry in one transaction.
+
+    Lines are streamed, so memory stays flat however large the file is.
+    The import is deliberately not split into per-batch commits. The
+    registry is cleared first, so committing part-way would leave a
+    half-imported registry behind after a failure. One transaction rolls
+    back to the previous registry instead. SQLite spills a large
+    transaction to its journal rather than holding it in memory, so the
+    cost is journal space on disk. Returns the number of items imported.
+    """
+    if not os.path.exists(jsonl_path):
+        print(f"JSONL registry not found at {jsonl_path}")
+        return 0
+
+    cursor = conn.cursor()
+    total = 0
+    try:
+        clear_registry(cursor)
+        for item_type, name, metadata in iter_registry_jsonl(jsonl_path):
+            last_updated = parse_last_updated(metadata.get('lastUpdated'))
+            upsert_item(cursor, item_type, name, metadata, last_updated)
+            total += 1
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+    print(f"Migrated {total} items from JSONL to SQLite")
+    return total
@@ -0,0 +1,264 @@
+"""
+Registry query API with a compact filter DSL
+
+Filters are whitespace-separated ``key<op>value`` terms, for example::
+
+    type=instructions tag=angular score>=4 sort=-score limit=10
+
+Each distinct filter string is compiled once into parameterized SQL. Queries
+with the same shape share SQL text, so sqlite3's per-connection statement
+cache reuses the prepared statement, and rows are streamed lazily.
+"""
+import json
+import shlex
+import sys
+from functools import lru_cache
+
+from registry_db import TAG_KINDS, TERM_TABLES, _prefix_upper_bound, connect, normalize_terms
+
+# DSL field name -> registry_items column
+FIELDS = {
+    'type': 'type',
+    'name': 'name',
+    'path': 'path',
+    'title': 'title',
+    'description': 'description',
+    'author': 'author',
+    'version': 'version',
+    'score': 'summary_score',
+    'agent_mode': 'agent_mode',
+    'instruction_type': 'instruction_type',
+    'updated': 'last_updated',
+    'md5': 'md5sum',
+    'source': 'source_repo',
+    # Primary-key lookup into the token-count index
+    'tokens': '(SELECT tokens FROM item_tokens WHERE item_tokens.path = registry_items.path)',
+}
+
+NUMERIC_FIELDS = {'score', 'tokens'}
+
+DEFAULT_COLUMNS = ('type', 'name', 'path', 'title', 'score')
+
+# Longest operators first so '>=' is not read as '>'
+OPERATORS = ('>=', '<=', '!=', '=', '>', '<', '~')
+
+OUTPUT_FORMATS = ('table', 'json', 'jsonl')
+
+class QueryError(ValueError):
+    """Raised when a filter expression cannot be compiled"""
+
+def _split_term(term):
+    """Split one 'key<op>value' term into its parts"""
+    for op in OPERATORS:
+        key, sep, value = term.partition(op)
+        if sep and key and not any(o in key for o in OPERATORS):
+            return key.strip(), op, value.strip()
+    raise QueryError(f"Invalid filter term '{term}'. Expected key<op>value, e.g. type=personas")
+
+def _like_contains(value):
+    """LIKE pattern matching value anywhere, with its wildcards and escapes taken literally"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f"%{escaped}%"
+
+def _tag_clause(tables, value):
+    """Build an item-id subquery against the normalized term tables"""
+    prefix = value.endswith('*')
+    term = normalize_terms(value.rstrip('*'))
+    if not term:
+        raise QueryError(f"Empty tag value '{value}'")
+    term = term[0]
+
+    parts = []
+    params = []
+    for table in tables:
+        column = TERM_TABLES[table][0]
+        if prefix:
+            parts.append(f"SELECT item_id FROM {table} WHERE {column} >= ? AND {column} < ?")
+            params.extend([term, _prefix_upper_bound(term)])
+        else:
+            parts.append(f"SELECT item_id FROM {table} WHERE {column} = ?")
+            params.append(term)
+
+    return f"id IN ({' UNION ALL '.join(parts)})", params
+
+@lru_cache(maxsize=256)
+def compile_query(expression, columns=DEFAULT_COLUMNS):
+    """
+    Compile a filter expression into (sql, params).
+
+    Supported keys are the entries of FIELDS plus ``tag`` (keywords or
+    applyTo), ``keyword``, ``apply_to``, ``extension``, ``sort``, ``limit``
+    and ``offset``. Comma-separated values match any of them, a trailing
+    ``*`` on tag values does a prefix match, and ``~`` is a substring match.
+    """
+    where = []
+    params = []
+    order = []
+    limit = None
+    offset = None
+
+    try:
+        terms = shlex.split(expression)
+    except ValueError as e:
+        raise QueryError(f"Could not parse query: {e}")
+
+    for term in terms:
+        key, op, value = _split_term(term)
+
+        if key == 'sort':
+            for field in value.split(','):
+                desc = field.startswith('-')
+                field = field.lstrip('+-')
+                if field not in FIELDS:
+                    raise QueryError(f"Unknown sort field '{field}'")
+                order.append(f"{FIELDS[field]} {'DESC' if desc else 'ASC'}")
+        elif key in ('limit', 'offset'):
+            if op != '=' or not value.isdigit():
+                raise QueryError(f"{key} expects a non-negative integer, got '{value}'")
+            if key == 'limit':
+                limit = int(value)
+            else:
+                offset = int(value)
+        elif key in ('tag', 'tags') or key in TAG_KINDS:
+            if op not in ('=', '!='):
+                raise QueryError(f"Tag filters support '=' and '!=' only, got '{op}'")
+            if key in ('tag', 'tags'):
+                tables = ('item_keywords', 'item_apply_to')
+            else:
+                tables = (TAG_KINDS[key],)
+            values = [v for v in value.split(',') if v]
+            clauses = []
+            for v in values:
+                clause, clause_params = _tag_clause(tables, v)
+                clauses.append(clause)
+                params.extend(clause_params)
+            joined = ' OR '.join(clauses)
+            where.append(f"NOT ({joined})" if op == '!=' else f"({joined})")
+        elif key in FIELDS:
+            column = FIELDS[key]
+            if op == '~':
+                where.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(_like_contains(value))
+                continue
+            values = value.split(',') if op in ('=', '!=') else [value]
+            if key in NUMERIC_FIELDS:
+                try:
+                    values = [float(v) for v in values]
+                except ValueError:
+                    raise QueryError(f"{key} expects a number, got '{value}'")
+            if len(values) > 1:
+                placeholders = ', '.join('?' for _ in values)
+                negate = 'NOT ' if op == '!=' else ''
+                where.append(f"{column} {negate}IN ({placeholders})")
+            else:
+                where.append(f"{column} {op} ?")
+            params.extend(values)
+        else:
+            raise QueryError(f"Unknown filter key '{key}'")
+
+    select = ', '.join(FIELDS[c] for c in columns)
+    sql = f"SELECT {select} FROM registry_items"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY " + ", ".join(order or ['type ASC', 'name ASC'])
+    if limit is not None or offset is not None:
+        sql += " LIMIT ?"
+        params.append(limit if limit is not None else -1)
+        if offset is not None:
+            sql += " OFFSET ?"
+            params.append(offset)
+
+    return sql, tuple(params)
+
+class Registry:
+    """Read-only query access to registry.db"""
+
+    def __init__(self, db_path, cached_statements=256):
+        self.db_path = str(db_path)
+        self.conn = connect(self.db_path, readonly=True, cached_statements=cached_statements)
+
+    def close(self):
+        """Close the underlying connection"""
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def query(self, expression='', columns=DEFAULT_COLUMNS, batch_size=256):
+        """
+        Matching items as dicts, fetching rows in batches.
+
+        The filter is compiled and executed before this returns, so QueryError
+        and sqlite3 errors are raised here rather than on the first row.
+        """
+        columns = tuple(columns)
+        unknown = [c for c in columns if c not in FIELDS]
+        if unknown:
+            raise QueryError(f"Unknown column(s): {', '.join(unknown)}")
+
+        sql, params = compile_query(expression, columns)
+        cursor = self.conn.execute(sql, params)
+        return self._rows(cursor, columns, batch_size)
+
+    @staticmethod
+    def _rows(cursor, columns, batch_size):
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            cursor.close()
+
+    def by_tag(self, value, item_type=None):
+        """Items whose keywords or applyTo contain value (trailing '*' for prefix)"""
+        expression = shlex.join(['tag=' + value] + (['type=' + item_type] if item_type else []))
+        return self.query(expression)
+
+def write_results(rows, output_format='table', stream=None):
+    """Write query results as a table, a JSON array or JSON Lines"""
+    stream = stream or sys.stdout
+
+    if output_format == 'jsonl':
+        count = 0
+        for row in rows:
+            stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+            count += 1
+        return count
+
+    if output_format == 'json':
+        # Fetch the first row before writing '[' so an error leaves no partial array
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            stream.write('[]\n')
+            return 0
+        stream.write('[\n ' + json.dumps(first, ensure_ascii=False))
+        count = 1
+        for row in rows:
+            stream.write(',\n ' + json.dumps(row, ensure_ascii=False))
+            count += 1
+        stream.write('\n]\n')
+        return count
+
+    if output_format != 'table':
+        raise QueryError(f"Unknown output format '{output_format}'. Expected one of: {', '.join(OUTPUT_FORMATS)}")
+
+    rows = list(rows)
+    if not rows:
+        stream.write("No matching registry items.\n")
+        return 0
+
+    headers = list(rows[0].keys())
+    cells = [['' if row[h] is None else str(row[h]) for h in headers] for row in rows]
+    widths = [max(len(h), *(len(c[i]) for c in cells)) for i, h in enumerate(headers)]
+    stream.write('  '.join(h.ljust(w) for h, w in zip(headers, widths)).rstrip() + '\n')
+    stream.write('  '.join('-' * w for w in widths) + '\n')
+    for c in cells:
+        stream.write('  '.join(v.ljust(w) for v, w in zip(c, widths)).rstrip() + '\n')
+    return len(rows)
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Cross-reference graph over prompts, personas, instructions and variables
+
+Edges (source, target, kind) live in registry.db's item_references table.
+Sources and path targets are repository-relative paths; variable targets
+are folder-structure.yaml keys such as ``folders.plan``. Kinds:
+
+    path        literal .ai-ley/shared/... reference
+    link        relative markdown link outside fenced code
+    variable    {{folders.*}} / {{files.*}} placeholder
+
+Edges are only re-extracted for sources whose md5sum changed since the
+last build, and dependents() walks edges backwards so a change can be
+propagated to exactly the files that depend on it.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+
+import yaml
+
+from registry_db import connect
+from variable_renderer import load_variables
+
+_SHARED_PATH = re.compile(r'\.ai-ley/shared/[A-Za-z0-9_./-]*[A-Za-z0-9_/-]')
+_VARIABLE = re.compile(r'\{\{\s*((?:folders|files)(?:\.[A-Za-z0-9_-]+)+)\s*\}\}')
+_MD_LINK = re.compile(r'\]\(([^)\s#]+)(?:#[^)]*)?\)')
+_FENCE = re.compile(r'^(```|~~~)', re.MULTILINE)
+
+# Characters that mark a path as a template placeholder rather than a reference
+_PLACEHOLDER_CHARS = set('[]<>{}*?|+\\')
+
+def _outside_fences(text):
+    """Text with fenced code blocks removed"""
+    parts = _FENCE.split(text)
+    # split() yields [text, fence, code, fence, text, ...]; keep every 4th part
+    return ''.join(parts[0::4])
+
+def extract_references(source, text):
+    """Return the set of (target, kind) references made by a source file's text"""
+    references = set()
+
+    for match in _SHARED_PATH.finditer(text):
+        references.add((match.group(0).rstrip('/.'), 'path'))
+
+    for match in _VARIABLE.finditer(text):
+        references.add((match.group(1), 'variable'))
+
+    source_dir = os.path.dirname(source)
+    for match in _MD_LINK.finditer(_outside_fences(text)):
+        target = match.group(1)
+        if '://' in target or target.startswith('mailto:') or _PLACEHOLDER_CHARS & set(target):
+            continue
+        if target.startswith('.ai-ley/'):
+            continue  # already captured as a literal path
+        references.add((os.path.normpath(os.path.join(source_dir, target)).replace(os.sep, '/'), 'link'))
+
+    return references
+
+def update_source(cursor, source, md5sum, text):
+    """Replace the edges of one source; returns the number of edges stored"""
+    references = extract_references(source, text)
+    cursor.execute("DELETE FROM item_references WHERE source = ?;", (source,))
+    cursor.executemany(
+        "INSERT OR IGNORE INTO item_references (source, target, kind) VALUES (?, ?, ?);",
+        [(source, target, kind) for target, kind in references]
+    )
+    cursor.execute(
+        "INSERT OR REPLACE INTO reference_sources (source, md5sum) VALUES (?, ?);",
+        (source, md5sum)
+    )
+    return len(references)
+
+def refresh_references(conn, sources, base_path):
+    """
+    Bring the edge table up to date with (source path, md5sum) pairs.
+
+    Only sources whose md5sum differs from the stored one are re-read, and
+    sources no longer present are dropped. Returns the set of sources whose
+    edges were re-derived or removed.
+    """
+    cursor = conn.cursor()
+    stored = dict(cursor.execute("SELECT source, md5sum FROM reference_sources;"))
+    changed = set()
+
+    for source, md5sum in sources:
+        previous = stored.pop(source, None)
+        if md5sum is not None and previous == md5sum:
+            continue
+        try:
+            with open(os.path.join(base_path, source), 'r', encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        except OSError as e:
+            print(f"Could not read {source} for reference extraction: {e}")
+            continue
+        update_source(cursor, source, md5sum, text)
+        changed.add(source)
+
+    for source in stored:
+        cursor.execute("DELETE FROM item_references WHERE source = ?;", (source,))
+        cursor.execute("DELETE FROM reference_sources WHERE source = ?;", (source,))
+        changed.add(source)
+
+    conn.commit()
+    return changed
+
+def references_to(conn, target, kind=None):
+    """(source, kind) rows for everything that references target"""
+    if kind is None:
+        return conn.execute(
+            "SELECT source, kind FROM item_references WHERE target = ? ORDER BY source;", (target,)
+        ).fetchall()
+    return conn.execute(
+        "SELECT source, kind FROM item_references WHERE target = ? AND kind = ? ORDER BY source;",
+        (target, kind)
+    ).fetchall()
+
+def references_from(conn, source):
+    """(target, kind) rows for everything source references"""
+    return conn.execute(
+        "SELECT target, kind FROM item_references WHERE source = ? ORDER BY target;", (source,)
+    ).fetchall()
+
+def dependents(conn, targets, transitive=True):
+    """
+    Sources that depend on any of targets, following edges backwards.
+
+    With transitive=True a dependent of a dependent is included too; the
+    targets themselves are not.
+    """
+    pending = list(targets)
+    seen = set(pending)
+    found = set()
+    while pending:
+        target = pending.pop()
+        for (source,) in conn.execute("SELECT DISTINCT source FROM item_references WHERE target = ?;", (target,)):
+            if source in found:
+                continue
+            found.add(source)
+            if transitive and source not in seen:
+                seen.add(source)
+                pending.append(source)
+    return found - set(targets)
+
+def broken_references(conn, base_path, folder_structure_path):
+    """
+    Yield (source, target, kind) for every edge whose target does not exist.
+
+    Each distinct target is checked once, so the whole tree is covered in a
+    single pass over the edge table.
+    """
+    try:
+        variables = load_variables(folder_structure_path)
+    except (OSError, yaml.YAMLError):
+        variables = {}
+    exists = {}
+    for source, target, kind in conn.execute(
+        "SELECT source, target, kind FROM item_references ORDER BY target, source;"
+    ):
+        key = (target, kind)
+        if key not in exists:
+            if kind == 'variable':
+                exists[key] = target in variables
+            else:
+                exists[key] = os.path.exists(os.path.join(base_path, target))
+        if not exists[key]:
+            yield source, target, kind
+
+def main():
+    """Query the reference graph in registry.db"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    base_path = os.path.normpath(os.path.join(script_dir, '..'))
+    variables_dir = os.path.join(base_path, '.ai-ley', 'shared', 'variables')
+
+    parser = argparse.ArgumentParser(description="Cross-reference graph over .ai-ley/shared")
+    parser.add_argument('--db', default=os.path.join(variables_dir, 'registry.db'),
+                        help='Registry database (default: .ai-ley/shared/variables/registry.db)')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--depends-on', metavar='TARGET',
+                       help='List everything that depends on a path or variable, transitively')
+    group.add_argument('--references', metavar='SOURCE', help='List what a file references')
+    group.add_argument('--broken', action='store_true', help='Report references to missing targets')
+    args = parser.parse_args()
+
+    try:
+        conn = connect(args.db, readonly=True)
+    except sqlite3.OperationalError as e:
+        print(f"Error: cannot open {args.db}: {e}")
+        sys.exit(1)
+    try:
+        if args.depends_on:
+            direct = {source for source, _ in references_to(conn, args.depends_on)}
+            for source in sorted(dependents(conn, [args.depends_on])):
+                print(f"{source}{'' if source in direct else '  (indirect)'}")
+        elif args.references:
+            for target, kind in references_from(conn, args.references):
+                print(f"{kind:>8}  {target}")
+        else:
+            broken = list(broken_references(
+                conn, base_path, os.path.join(variables_dir, 'folder-structure.yaml')
+            ))
+            for source, target, kind in broken:
+                print(f"{source}: {kind} {target}")
+            print(f"{len(broken)} broken reference(s)")
+            if broken:
+                sys.exit(1)
+    except sqlite3.OperationalError as e:
+        print(f"Error: {e}. Rebuild the registry.")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Compact binary registry snapshot for agent-side lookups
+
+Layout (little endian):
+
+    header      magic, version, record/type/string counts, section offsets
+    types       (type string id, first record, end record) per item type
+    records     fixed-width rows sorted by (type, name) as UTF-8 bytes
+    offsets     string_count + 1 uint32 offsets into the string blob
+    strings     interned UTF-8 strings, each stored once
+
+Opening a snapshot only maps the file and reads the header and type
+directory; records and strings are decoded on access.
+"""
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b'AILEYSN1'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<8sHHIIIQQQQ')
+TYPE_ENTRY = struct.Struct('<III')
+# type, name, path, title, description, md5sum string ids + summaryScore
+RECORD = struct.Struct('<IIIIIIf')
+OFFSET = struct.Struct('<I')
+
+RECORD_FIELDS = ('type', 'name', 'path', 'title', 'description', 'md5sum')
+
+# Sentinel string id for missing values
+NULL_STRING = 0xFFFFFFFF
+
+def _to_text(value):
+    """Normalize a metadata value to a string or None"""
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+def write_snapshot(items, snapshot_path):
+    """
+    Write a snapshot from an iterable of (item_type, name, metadata) tuples.
+
+    Returns the number of records written.
+    """
+    strings = []
+    string_ids = {}
+
+    def intern(value):
+        value = _to_text(value)
+        if value is None:
+            return NULL_STRING
+        string_id = string_ids.get(value)
+        if string_id is None:
+            string_id = len(strings)
+            string_ids[value] = string_id
+            strings.append(value)
+        return string_id
+
+    rows = []
+    for item_type, name, metadata in items:
+        score = metadata.get('summaryScore')
+        try:
+            score = float(score) if score is not None else float('nan')
+        except (TypeError, ValueError):
+            score = float('nan')
+        rows.append((
+            item_type.encode('utf-8'),
+            name.encode('utf-8'),
+            (intern(item_type), intern(name), intern(metadata.get('path')),
+             intern(metadata.get('title')), intern(metadata.get('description')),
+             intern(metadata.get('md5sum')), score)
+        ))
+
+    # Byte order of UTF-8 matches code point order, so readers can compare raw bytes
+    rows.sort(key=lambda row: (row[0], row[1]))
+
+    types = []
+    for index, (type_bytes, _, record) in enumerate(rows):
+        if not types or types[-1][0] != record[0]:
+            types.append([record[0], index, index + 1])
+        else:
+            types[-1][2] = index + 1
+
+    encoded = [s.encode('utf-8') for s in strings]
+    types_offset = HEADER.size
+    records_offset = types_offset + TYPE_ENTRY.size * len(types)
+    offsets_offset = records_offset + RECORD.size * len(rows)
+    strings_offset = offsets_offset + OFFSET.size * (len(encoded) + 1)
+
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(rows), len(types), len(encoded),
+                            types_offset, records_offset, offsets_offset, strings_offset))
+        for entry in types:
+            f.write(TYPE_ENTRY.pack(*entry))
+        for _, _, record in rows:
+            f.write(RECORD.pack(*record))
+        position = 0
+        for data in encoded:
+            f.write(OFFSET.pack(position))
+            position += len(data)
+        f.write(OFFSET.pack(position))
+        for data in encoded:
+            f.write(data)
+    os.replace(tmp_path, snapshot_path)
+
+    return len(rows)
+
+def write_snapshot_from_registry(registry, snapshot_path):
+    """Write a snapshot from a registry dict shaped like registry.json"""
+    items = (
+        (item_type, name, metadata)
+        for item_type, section in registry.items() if isinstance(section, dict)
+        for name, metadata in section.items() if isinstance(metadata, dict)
+    )
+    return write_snapshot(items, snapshot_path)
+
+class SnapshotRecord:
+    """A registry record whose fields are decoded from the snapshot on first access"""
+
+    __slots__ = ('_snapshot', '_index', '_raw')
+
+    def __init__(self, snapshot, index):
+        self._snapshot = snapshot
+        self._index = index
+        self._raw = None
+
+    def _fields(self):
+        if self._raw is None:
+            self._raw = self._snapshot._record(self._index)
+        return self._raw
+
+    def __getattr__(self, field):
+        if field == 'summary_score':
+            score = self._fields()[6]
+            return None if score != score else score
+        try:
+            position = RECORD_FIELDS.index(field)
+        except ValueError:
+            raise AttributeError(field)
+        return self._snapshot.string(self._fields()[position])
+
+    def to_dict(self):
+        """Decode every field into a plain dict"""
+        data = {field: getattr(self, field) for field in RECORD_FIELDS}
+        data['summaryScore'] = self.summary_score
+        return data
+
+    def __repr__(self):
+        return f"SnapshotRecord(type={self.type!r}, name={self.name!r})"
+
+class RegistrySnapshot:
+    """Memory-mapped reader for registry snapshots"""
+
+    def __init__(self, snapshot_path):
+        self.snapshot_path = str(snapshot_path)
+        with open(self.snapshot_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.record_count, type_count, self.string_count,
+         types_offset, self._records_offset, self._offsets_offset,
+         self._strings_offset) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{self.snapshot_path} is not a registry snapshot")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported snapshot version {version} in {self.snapshot_path}")
+
+        self.types = {}
+        for i in range(type_count):
+            string_id, start, end = TYPE_ENTRY.unpack_from(self._mm, types_offset + i * TYPE_ENTRY.size)
+            self.types[self.string(string_id)] = (start, end)
+
+    def close(self):
+        """Release the memory map"""
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.record_count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError(index)
+        return SnapshotRecord(self, index)
+
+    def __iter__(self):
+        for index in range(self.record_count):
+            yield SnapshotRecord(self, index)
+
+    def _record(self, index):
+        return RECORD.unpack_from(self._mm, self._records_offset + index * RECORD.size)
+
+    def _string_bytes(self, string_id):
+        start, = OFFSET.unpack_from(self._mm, self._offsets_offset + string_id * OFFSET.size)
+        end, = OFFSET.unpack_from(self._mm, self._offsets_offset + (string_id + 1) * OFFSET.size)
+        return self._mm[self._strings_offset + start:self._strings_offset + end]
+
+    def string(self, string_id):
+        """Decode an interned string by id"""
+        if string_id == NULL_STRING:
+            return None
+        return self._string_bytes(string_id).decode('utf-8')
+
+    def by_type(self, item_type):
+        """Iterate the records of one item type in name order"""
+        start, end = self.types.get(item_type, (0, 0))
+        for index in range(start, end):
+            yield SnapshotRecord(self, index)
+
+    def find(self, name, item_type=None):
+        """Binary-search a record by name, optionally within one type"""
+        key = name.encode('utf-8')
+        if item_type is None:
+            ranges = list(self.types.values())
+        else:
+            ranges = [self.types[item_type]] if item_type in self.types else []
+
+        for start, end in ranges:
+            names = _NameView(self, start, end)
+            position = bisect.bisect_left(names, key)
+            if position < len(names) and names[position] == key:
+                return SnapshotRecord(self, start + position)
+        return None
+
+class _NameView:
+    """Sequence of raw record names over a record range, for bisect"""
+
+    def __init__(self, snapshot, start, end):
+        self._snapshot = snapshot
+        self._start = start
+        self._end = end
+
+    def __len__(self):
+        return self._end - self._start
+
+    def __getitem__(self, index):
+        name_id = self._snapshot._record(self._start + index)[1]
+        return self._snapshot._string_bytes(name_id)
+
+def main():
+    """Convert registry.json into a snapshot, or look up records in one"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    variables_dir = os.path.join(script_dir, '..', '.ai-ley', 'shared', 'variables')
+
+    parser = argparse.ArgumentParser(description="Build or query the binary registry snapshot")
+    parser.add_argument('--registry', default=os.path.join(variables_dir, 'registry.json'),
+                        help='registry.json to convert')
+    parser.add_argument('--snapshot', default=os.path.join(variables_dir, 'registry.snap'),
+                        help='Snapshot file to write or read')
+    parser.add_argument('--type', help='Restrict lookups to one item type')
+    parser.add_argument('names', nargs='*', help='Item names to look up instead of converting')
+    args = parser.parse_args()
+
+    if not args.names and not args.type:
+        with open(args.registry, 'r', encoding='utf-8') as f:
+            registry = json.load(f)
+        count = write_snapshot_from_registry(registry, args.snapshot)
+        print(f"Snapshot written to {args.snapshot} with {count} records")
+        return
+
+    with RegistrySnapshot(args.snapshot) as snapshot:
+        if args.names:
+            for name in args.names:
+                record = snapshot.find(name, args.type)
+                if record is None:
+                    print(f"Not found: {name}", file=sys.stderr)
+                    continue
+                print(json.dumps(record.to_dict(), ensure_ascii=False))
+        else:
+            for record in snapshot.by_type(args.type):
+                print(f"{record.path}\t{record.title}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+"""
+Response providers and an asyncio runner for persona performance tests
+
+A provider turns a (persona, scenario) pair into a response. The runner
+drives any provider concurrently with a concurrency limit, a per-request
+timeout, retries with exponential backoff and latency capture, so
+run_performance_tests can exercise a real model endpoint instead of the
+canned simulated responses.
+
+HttpResponseProvider speaks a minimal JSON protocol: it POSTs
+{"persona", "category", "scenario", "prompt", "model"} and reads
+{"response": "..."} back over HTTP/1.1, reading Content-Length and
+chunked replies. scripts/response_stub_server.py serves that protocol
+locally for offline throughput tests.
+"""
+import asyncio
+import json
+import random
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from streaming_reports import Reservoir
+
+class ProviderError(Exception):
+    """A provider request failed; retryable errors may succeed on a later attempt"""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class ResponseProvider:
+    """Base provider: subclasses implement generate()"""
+
+    name = 'base'
+
+    def config(self) -> Dict:
+        """Settings that determine the responses, for cache and checkpoint keys"""
+        return {'provider': self.name}
+
+    async def generate(self, persona: Dict, scenario: Dict) -> str:
+        raise NotImplementedError
+
+class SimulatedResponseProvider(ResponseProvider):
+    """Canned responses from PersonaPerformanceTester.simulate_persona_response"""
+
+    name = 'simulated'
+
+    def __init__(self, tester):
+        self.tester = tester
+
+    async def generate(self, persona: Dict, scenario: Dict) -> str:
+        return self.tester.simulate_persona_response(persona, scenario)
+
+class HttpResponseProvider(ResponseProvider):
+    """POST each scenario to an HTTP endpoint and read the JSON response"""
+
+    name = 'http'
+
+    def __init__(self, url: str, model: Optional[str] = None, headers: Optional[Dict[str, str]] = None):
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"Unsupported provider URL: {url}")
+        self.url = url
+        self.model = model
+        self.headers = headers or {}
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == 'https' else 80)
+        self.path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.ssl = ssl.create_default_context() if parts.scheme == 'https' else None
+
+    def config(self) -> Dict:
+        return {'provider': self.name, 'url': self.url, 'model': self.model}
+
+    def build_payload(self, persona: Dict, scenario: Dict) -> Dict:
+        return {
+            'persona': persona['metadata'].get('title', 'Unknown'),
+            'category': persona['category'],
+            'scenario': scenario['name'],
+            'prompt': scenario['prompt'],
+            'model': self.model
+        }
+
+    def parse_response(self, body: bytes) -> str:
+        try:
+            data = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise ProviderError(f"Invalid JSON from provider: {e}", retryable=False)
+        if not isinstance(data, dict) or not isinstance(data.get('response'), str):
+            raise ProviderError("Provider reply has no 'response' string", retryable=False)
+        return data['response']
+
+    async def _read_body(self, reader, reply_headers: Dict[str, str]) -> bytes:
+        """Reply body framed by chunked transfer coding, Content-Length, or the connection closing"""
+        if 'chunked' in reply_headers.get('transfer-encoding', '').lower():
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                try:
+                    size = int(size_line.split(b';', 1)[0].strip(), 16)
+                except ValueError:
+                    size = -1
+                if size < 0:
+                    raise ProviderError(f"Malformed chunk size from {self.url}: {size_line!r}")
+                if size == 0:
+                    # Skip any trailer fields up to the blank line that ends the body
+                    while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    return b''.join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+        if 'content-length' in reply_headers:
+            try:
+                length = int(reply_headers['content-length'])
+            except ValueError:
+                length = -1
+            if length < 0:
+                raise ProviderError(f"Malformed Content-Length from {self.url}: {reply_headers['content-length']!r}")
+            return await reader.readexactly(length)
+        return await reader.read()
+
+    async def generate(self, persona: Dict, scenario: Dict) -> str:
+        body = json.dumps(self.build_payload(persona, scenario)).encode('utf-8')
+        headers = {
+            'Host': self.host if self.port in (80, 443) else f"{self.host}:{self.port}",
+            'Content-Type': 'application/json',
+            'Content-Length': str(len(body)),
+            'Connection': 'close',
+            **self.headers
+        }
+        request = f"POST {self.path} HTTP/1.1\r\n" + ''.join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+
+        try:
+            reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        except OSError as e:
+            raise ProviderError(f"Could not connect to {self.url}: {e}")
+        try:
+            writer.write(request.encode('latin-1') + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            try:
+                status = int(status_line.split()[1])
+            except (IndexError, ValueError):
+                raise ProviderError(f"Malformed HTTP status line: {status_line!r}")
+            reply_headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                reply_headers[name.strip().lower()] = value.strip()
+            payload = await self._read_body(reader, reply_headers)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise ProviderError(f"Request to {self.url} failed: {e}")
+        finally:
+            writer.close()
+
+        if status == 429 or status >= 500:
+            raise ProviderError(f"HTTP {status} from {self.url}")
+        if status >= 400:
+            raise ProviderError(f"HTTP {status} from {self.url}", retryable=False)
+        return self.parse_response(payload)
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linearly interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+class LatencyStats:
+    """Request latencies (a bounded sample, for percentiles) and outcome counts for one run"""
+
+    def __init__(self):
+        self.latencies = Reservoir()
+        self.errors = 0
+        self.retries = 0
+        self.started = None
+        self.finished = None
+
+    def summary(self) -> Dict:
+        latencies = sorted(self.latencies.values)
+        requests = self.latencies.count
+        elapsed = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        return {
+            'requests': requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_second': round(requests / elapsed, 2) if elapsed > 0 else 0.0,
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2)
+        }
+
+class ProviderRunner:
+    """Run a provider over many (persona, scenario) pairs concurrently"""
+
+    def __init__(self, provider: ResponseProvider, concurrency: int = 8, timeout: float = 60.0,
+                 retries: int = 3, backoff: float = 0.5):
+        self.provider = provider
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.stats = LatencyStats()
+
+    async def _generate(self, semaphore, index, persona, scenario, on_result) -> Tuple[Optional[str], Optional[str]]:
+        """(response, None) on success or (None, error message) once retries are exhausted"""
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                start = time.perf_counter()
+                try:
+                    response = await asyncio.wait_for(self.provider.generate(persona, scenario), self.timeout)
+                    self.stats.latencies.add(time.perf_counter() - start)
+                    if on_result:
+                        on_result(index, response)
+                    return response, None
+                except asyncio.TimeoutError:
+                    error = ProviderError(f"Timed out after {self.timeout}s")
+                except ProviderError as e:
+                    error = e
+                if not error.retryable or attempt == self.retries:
+                    self.stats.errors += 1
+                    return None, str(error)
+                self.stats.retries += 1
+                # Exponential backoff with jitter so retries do not arrive in lockstep
+                await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random() / 2))
+
+    async def run_async(self, jobs: List[Tuple[Dict, Dict]], on_result=None) -> List[Tuple[Optional[str], Optional[str]]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # A runner may be driven batch by batch; stats cover the whole run
+        if self.stats.started is None:
+            self.stats.started = time.perf_counter()
+        try:
+            return await asyncio.gather(*(
+                self._generate(semaphore, index, persona, scenario, on_result)
+                for index, (persona, scenario) in enumerate(jobs)
+            ))
+        finally:
+            self.stats.finished = time.perf_counter()
+
+    def run(self, jobs: List[Tuple[Dict, Dict]], on_result=None) -> List[Tuple[Optional[str], Optional[str]]]:
+        """
+        Generate a response per job, in job order.
+
+        on_result(index, response) is called as each response arrives, e.g.
+        to checkpoint it before the rest of the run finishes.
+        """
+        return asyncio.run(self.run_async(jobs, on_result))
@@ -0,0 +1,207 @@
+"""
+Batch scoring of persona responses
+
+BatchResponseScorer produces the same evaluations as
+PersonaPerformanceTester.evaluate_response_quality, but for a whole run at
+once. Responses are grouped by scenario rubric and deduplicated, each
+response is matched against all of the rubric's terms in one regex pass to
+fill a response x term presence matrix, and the completeness,
+technical-depth, tone, relevance and overall scores are computed for the
+batch with array operations.
+Needs numpy; without it callers fall back to the scalar path.
+"""
+import re
+from typing import Dict, List, Set
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TECHNICAL_INDICATORS = ('implement', 'configure', 'optimize', 'consider', 'recommend', 'use', 'deploy')
+PROFESSIONAL_INDICATORS = ('first', 'second', 'next', 'additionally', 'furthermore', 'however', 'therefore')
+
+# Bump when evaluate_response_quality's scoring changes so stored evaluations are recomputed
+RUBRIC_VERSION = 1
+
+class Rubric:
+    """
+    A scenario's expected elements and indicator terms, compiled for matching.
+
+    terms holds each distinct lowercased term once (indicators first, then
+    element keywords). The indicator columns and element columns index into
+    it, and pattern finds every term occurring in a response in a single
+    regex pass, as validate_persona_expertise.StandardsMatcher does.
+    """
+
+    def __init__(self, expected_elements=(), technical_indicators=TECHNICAL_INDICATORS,
+                 professional_indicators=PROFESSIONAL_INDICATORS):
+        self.expected_elements = tuple(expected_elements)
+        self.technical_indicators = tuple(technical_indicators)
+        self.professional_indicators = tuple(professional_indicators)
+        vocabulary = {}
+        self.technical_columns = [vocabulary.setdefault(term, len(vocabulary)) for term in self.technical_indicators]
+        self.professional_columns = [vocabulary.setdefault(term, len(vocabulary)) for term in self.professional_indicators]
+        self.element_columns = [[vocabulary.setdefault(keyword, len(vocabulary)) for keyword in element.lower().split()]
+                                for element in self.expected_elements]
+        self.terms = tuple(vocabulary)
+
+        # Longest alternative first, so at each position the regex reports the
+        # longest term starting there; the shorter terms starting at the same
+        # position are its prefixes, so their columns are implied by the match.
+        # The leading character class lets the engine skip to positions where a
+        # term can start; the lookbehind re-anchors on that character so the
+        # terms are matched without being consumed and overlapping ones are found.
+        keys = sorted((term for term in self.terms if term), key=len, reverse=True)
+        self.implied_columns = {key: [vocabulary[other] for other in keys if key.startswith(other)] for key in keys}
+        self.pattern = None
+        if keys:
+            initials = ''.join(sorted({re.escape(key[0]) for key in keys}))
+            alternatives = '|'.join(re.escape(key) for key in keys)
+            self.pattern = re.compile(f'[{initials}](?<=(?=({alternatives})).)', re.DOTALL)
+
+        # terms x elements: an element is found when any of its keywords is present
+        self.keyword_matrix = None
+        if np is not None and self.expected_elements:
+            self.keyword_matrix = np.zeros((len(self.terms), len(self.expected_elements)), dtype=np.int32)
+            for column, rows in enumerate(self.element_columns):
+                self.keyword_matrix[rows, column] = 1
+
+    def matched_columns(self, response_lower: str) -> Set[int]:
+        """Columns of the terms occurring in an already lowercased response"""
+        columns = set()
+        if self.pattern is not None:
+            for key in set(self.pattern.findall(response_lower)):
+                columns.update(self.implied_columns[key])
+        return columns
+
+    def presence(self, response_lower: str) -> List[bool]:
+        """Whether each term occurs in an already lowercased response"""
+        columns = self.matched_columns(response_lower)
+        return [column in columns for column in range(len(self.terms))]
+
+    def config(self) -> Dict:
+        """Everything that determines how a response is scored, for checkpoint keys"""
+        return {
+            'version': RUBRIC_VERSION,
+            'technical_indicators': self.technical_indicators,
+            'professional_indicators': self.professional_indicators,
+            'expected_elements': list(self.expected_elements)
+        }
+
+_default_rubrics = {}
+
+def scenario_rubric(scenario: Dict) -> Rubric:
+    """The compiled rubric of a scenario, compiling one with the default indicators if it has none"""
+    rubric = scenario.get('rubric')
+    if rubric is None:
+        elements = tuple(scenario.get('expected_elements', []))
+        rubric = _default_rubrics.get(elements)
+        if rubric is None:
+            rubric = _default_rubrics[elements] = Rubric(elements)
+    return rubric
+
+def rubric_config(scenario: Dict) -> Dict:
+    """Everything that determines how a response to scenario is scored"""
+    return scenario_rubric(scenario).config()
+
+def batch_scoring_available() -> bool:
+    """Whether numpy is installed"""
+    return np is not None
+
+class BatchResponseScorer:
+    """Score many (response, scenario) pairs with one term-presence matrix per rubric"""
+
+    def __init__(self):
+        if not batch_scoring_available():
+            raise RuntimeError("Batch scoring requires numpy")
+
+    def score(self, responses: List[str], scenarios: List[Dict]) -> List[Dict]:
+        """Evaluate responses[i] against scenarios[i], returning one evaluation dict each"""
+        count = len(responses)
+
+        # Responses grouped by rubric; identical responses within a group are scored once
+        groups = {}
+        unique_of = np.empty(count, dtype=np.intp)
+        unique_count = 0
+        for index, (response, scenario) in enumerate(zip(responses, scenarios)):
+            rubric = scenario_rubric(scenario)
+            texts = groups.setdefault(id(rubric), (rubric, {}))[1]
+            position = texts.get(response)
+            if position is None:
+                position = texts[response] = unique_count
+                unique_count += 1
+            unique_of[index] = position
+        unique_technical = np.empty(unique_count)
+        unique_professional = np.empty(unique_count)
+        unique_completeness = np.empty(unique_count)
+        unique_missing = [None] * unique_count
+        unique_words = np.empty(unique_count, dtype=np.int64)
+
+        for rubric, texts in groups.values():
+            positions = np.fromiter(texts.values(), dtype=np.intp, count=len(texts))
+            lowered = [response.lower() for response in texts]
+            unique_words[positions] = [len(response.split()) for response in texts]
+
+            # Presence matrix: responses x terms, filled from one regex pass per response
+            presence = np.zeros((len(lowered), len(rubric.terms)), dtype=np.int32)
+            hits = [(row, column) for row, text in enumerate(lowered) for column in rubric.matched_columns(text)]
+            if hits:
+                rows, columns = zip(*hits)
+                presence[rows, columns] = 1
+
+            technical = presence[:, rubric.technical_columns].sum(axis=1)
+            professional = presence[:, rubric.professional_columns].sum(axis=1)
+            unique_technical[positions] = np.minimum(5.0, technical / 3 * 5.0)
+            unique_professional[positions] = np.minimum(5.0, professional / 2 * 5.0)
+
+            elements = rubric.expected_elements
+            if elements:
+                found = (presence @ rubric.keyword_matrix) > 0
+                unique_completeness[positions] = found.sum(axis=1) / len(elements) * 5.0
+                for row, position in enumerate(positions):
+                    unique_missing[position] = [element for element, hit in zip(elements, found[row]) if not hit]
+            else:
+                unique_completeness[positions] = 3.0
+                for position in positions:
+                    unique_missing[position] = []
+
+        technical_depth = unique_technical[unique_of]
+        professional_tone = unique_professional[unique_of]
+        completeness = unique_completeness[unique_of]
+        word_counts = unique_words[unique_of]
+        relevance = np.where((word_counts >= 50) & (word_counts <= 1000), 4.0, np.where(word_counts < 50, 2.0, 3.0))
+        overall = (relevance + technical_depth + completeness + professional_tone) / 4
+
+        evaluations = []
+        for index in range(count):
+            evaluation = {
+                'relevance_score': float(relevance[index]),
+                'technical_depth_score': float(technical_depth[index]),
+                'completeness_score': float(completeness[index]),
+                'professional_tone_score': float(professional_tone[index]),
+                'overall_score': float(overall[index]),
+                'missing_elements': list(unique_missing[unique_of[index]]),
+                'strengths': [],
+                'weaknesses': []
+            }
+            _add_strengths_and_weaknesses(evaluation)
+            evaluations.append(evaluation)
+        return evaluations
+
+def _add_strengths_and_weaknesses(evaluation: Dict):
+    """Same thresholds as PersonaPerformanceTester.evaluate_response_quality"""
+    if evaluation['technical_depth_score'] >= 4.0:
+        evaluation['strengths'].append('Strong technical depth')
+    elif evaluation['technical_depth_score'] < 2.0:
+        evaluation['weaknesses'].append('Lacks technical specificity')
+
+    if evaluation['completeness_score'] >= 4.0:
+        evaluation['strengths'].append('Comprehensive response')
+    elif evaluation['completeness_score'] < 2.0:
+        evaluation['weaknesses'].append('Missing key elements')
+
+    if evaluation['professional_tone_score'] >= 4.0:
+        evaluation['strengths'].append('Professional communication style')
+    elif evaluation['professional_tone_score'] < 2.0:
+        evaluation['weaknesses'].append('Lacks professional structure')
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a model endpoint, for offline persona performance runs
+
+Serves the HttpResponseProvider protocol: POST a JSON scenario, get back
+{"response": "..."} after a configurable latency, with an optional share
+of 503 replies to exercise retries and optionally chunked transfer coding
+instead of Content-Length. Use StubResponseServer as a context
+manager in scripts, or run this file to serve it or benchmark the runner:
+
+    python scripts/response_stub_server.py --port 8765
+    python scripts/response_stub_server.py --bench 500 --concurrency 32
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from response_providers import HttpResponseProvider, ProviderRunner
+
+RESPONSE_TEMPLATE = """Thank you for the question about {scenario}.
+
+First, I recommend we consider the current requirements and constraints.
+Next, we should implement the change incrementally and configure monitoring.
+Additionally, deploy behind a feature flag so we can optimize safely.
+However, validate each step with the team before moving on.
+Therefore, my recommendation addresses: {prompt}
+"""
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get('Content-Length', 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            self._reply(400, {'error': 'invalid JSON'})
+            return
+
+        delay = server.latency * (1 + server.jitter * (2 * random.random() - 1))
+        if delay > 0:
+            time.sleep(delay)
+        if random.random() < server.failure_rate:
+            self._reply(503, {'error': 'stub failure'})
+            return
+        self._reply(200, {'response': RESPONSE_TEMPLATE.format(
+            scenario=request.get('scenario', 'this scenario'), prompt=request.get('prompt', '')
+        )})
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if self.server.chunked:
+            self.send_header('Transfer-Encoding', 'chunked')
+        else:
+            self.send_header('Content-Length', str(len(body)))
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        if self.server.chunked:
+            # Uneven pieces so replies span several chunks
+            for start in range(0, len(body), 97):
+                piece = body[start:start + 97]
+                self.wfile.write(f"{len(piece):x}\r\n".encode('ascii') + piece + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.wfile.write(body)
+        self.close_connection = True
+
+    def log_message(self, format, *args):
+        pass
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+class StubResponseServer:
+    """Threaded stub endpoint; port 0 picks a free port"""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.05, jitter=0.2, failure_rate=0.0, chunked=False):
+        self.httpd = _StubHTTPServer((host, port), _StubHandler)
+        self.httpd.chunked = chunked
+        self.httpd.latency = latency
+        self.httpd.jitter = jitter
+        self.httpd.failure_rate = failure_rate
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def main():
+    """Serve the stub endpoint, or benchmark ProviderRunner against it"""
+    parser = argparse.ArgumentParser(description="Local stand-in model endpoint for persona performance tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05, help='Mean response latency in seconds (default: 0.05)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Share of requests answered with 503')
+    parser.add_argument('--chunked', action='store_true', help='Send replies with chunked transfer coding')
+    parser.add_argument('--bench', type=int, metavar='REQUESTS', help='Send REQUESTS requests and print latency stats')
+    parser.add_argument('--concurrency', type=int, default=16, help='Concurrent requests for --bench (default: 16)')
+    args = parser.parse_args()
+
+    server = StubResponseServer(args.host, 0 if args.bench else args.port, args.latency,
+                                failure_rate=args.failure_rate, chunked=args.chunked)
+    if not args.bench:
+        print(f"Serving stub responses on {server.url}")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.httpd.server_close()
+        return
+
+    persona = {'metadata': {'title': 'Benchmark Persona'}, 'category': 'developer'}
+    scenario = {'name': 'Benchmark', 'prompt': 'Describe your approach.'}
+    with server:
+        runner = ProviderRunner(HttpResponseProvider(server.url), concurrency=args.concurrency, backoff=0.05)
+        runner.run([(persona, scenario)] * args.bench)
+    print(json.dumps(runner.stats.summary(), indent=2))
+
+if __name__ == "__main__":
+    main()
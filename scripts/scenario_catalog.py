@@ -0,0 +1,130 @@
+"""
+Persona test scenarios loaded from YAML, one file per category
+
+Each file under .ai-ley/shared/scenarios looks like:
+
+    category: developer        # defaults to the file name
+    paths: [developer]         # persona directories, relative to the personas
+                               # directory; defaults to [category]
+    indicators:                # optional; defaults to response_scoring's
+      technical: [implement, configure]
+      professional: [first, next]
+    scenarios:
+      - name: Code Review Request
+        prompt: Please review this Python function...
+        expected_elements:
+          - list comprehension suggestion
+
+Every scenario gets a compiled response_scoring.Rubric. Compiled files are
+cached by content hash, in memory and optionally in a pickle file, so an
+unchanged catalog is neither re-parsed nor re-compiled. Persona paths are
+resolved to categories through a prefix table built at load time, longest
+prefix first.
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+from typing import Dict, Optional
+
+import yaml
+
+from response_scoring import PROFESSIONAL_INDICATORS, RUBRIC_VERSION, TECHNICAL_INDICATORS, Rubric
+
+# Bump when the file format or compiled layout changes so cached catalogs are rebuilt
+CATALOG_VERSION = 2
+
+_compiled_files = {}
+
+def compile_category_file(path: Path, data: bytes) -> Dict:
+    """Parse one category file and compile its rubrics"""
+    spec = yaml.safe_load(data) or {}
+    if not isinstance(spec, dict) or not isinstance(spec.get('scenarios'), list):
+        raise ValueError(f"{path}: expected a mapping with a 'scenarios' list")
+
+    category = str(spec.get('category') or path.stem)
+    indicators = spec.get('indicators') or {}
+    technical = indicators.get('technical') or TECHNICAL_INDICATORS
+    professional = indicators.get('professional') or PROFESSIONAL_INDICATORS
+
+    scenarios = []
+    for item in spec['scenarios']:
+        if not isinstance(item, dict) or not item.get('name') or not item.get('prompt'):
+            raise ValueError(f"{path}: every scenario needs a name and a prompt")
+        elements = [str(element) for element in item.get('expected_elements') or []]
+        scenarios.append({
+            'name': str(item['name']),
+            'prompt': str(item['prompt']).strip(),
+            'expected_elements': elements,
+            'rubric': Rubric(elements, technical, professional)
+        })
+
+    return {
+        'category': category,
+        'paths': [str(prefix).strip('/') for prefix in spec.get('paths') or [category]],
+        'scenarios': scenarios
+    }
+
+class ScenarioCatalog:
+    """Scenarios by category, and the persona directory -> category table"""
+
+    def __init__(self, scenarios_dir, personas_dir, cache_path: Optional[Path] = None):
+        self.scenarios_dir = Path(scenarios_dir)
+        self.personas_dir = Path(personas_dir)
+        self.categories = {}
+        self.prefixes = {}
+        self._load(cache_path)
+
+    def _load(self, cache_path: Optional[Path]):
+        cached = self._read_cache(cache_path)
+        compiled = {}
+        for path in sorted(self.scenarios_dir.glob('*.y*ml')):
+            data = path.read_bytes()
+            key = f"{path.name}:{hashlib.md5(data).hexdigest()}"
+            entry = cached.get(key) or _compiled_files.get(key) or compile_category_file(path, data)
+            compiled[key] = _compiled_files[key] = entry
+
+            category = entry['category']
+            if category in self.categories:
+                raise ValueError(f"{path}: category '{category}' is defined more than once")
+            self.categories[category] = {'scenarios': entry['scenarios']}
+            for prefix in entry['paths']:
+                parts = Path(prefix).parts
+                if self.prefixes.get(parts, category) != category:
+                    raise ValueError(f"{path}: '{prefix}' is already mapped to '{self.prefixes[parts]}'")
+                self.prefixes[parts] = category
+
+        if cache_path and compiled.keys() != cached.keys():
+            self._write_cache(cache_path, compiled)
+        self._longest_prefix = max(map(len, self.prefixes), default=0)
+
+    def _read_cache(self, cache_path: Optional[Path]) -> Dict:
+        if not cache_path:
+            return {}
+        try:
+            with open(cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            return {}
+        if cache.get('version') != (CATALOG_VERSION, RUBRIC_VERSION):
+            return {}
+        return cache.get('files', {})
+
+    def _write_cache(self, cache_path: Path, compiled: Dict):
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': (CATALOG_VERSION, RUBRIC_VERSION), 'files': compiled}, f)
+        os.replace(tmp_path, cache_path)
+
+    def category_for(self, filepath) -> str:
+        """Category of the persona at filepath, by its longest mapped directory prefix"""
+        try:
+            parts = Path(filepath).relative_to(self.personas_dir).parent.parts
+        except ValueError:
+            return 'general'
+        for length in range(min(len(parts), self._longest_prefix), 0, -1):
+            category = self.prefixes.get(parts[:length])
+            if category:
+                return category
+        return 'general'
@@ -0,0 +1,104 @@
+"""
+Bounded-memory building blocks for the persona result reports
+
+Per-persona results are appended to a JSONL file as they are produced,
+and reports are built from aggregators that keep only counters, running
+sums and fixed-size heaps, so memory does not grow with the catalog.
+"""
+import heapq
+import itertools
+import json
+import os
+import random
+
+class JsonlWriter:
+    """Write one JSON record per line to path.tmp and move it into place on close"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.tmp_path = f"{self.path}.tmp"
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self.tmp_path, 'w', encoding='utf-8')
+        self.count = 0
+
+    def write(self, record):
+        self._file.write(json.dumps(record))
+        self._file.write('\n')
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            # Keep the partial file for inspection, but do not replace the last good run
+            self._file.close()
+
+def read_jsonl(path):
+    """Yield the records of a JSONL file one at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+class TopK:
+    """
+    The k items with the highest key, in descending key order.
+
+    Ties keep arrival order, matching sorted(items, key=key, reverse=True)[:k].
+    With lowest=True it keeps the k lowest instead, in ascending order,
+    matching sorted(items, key=key)[:k]. k=None keeps every item.
+    """
+
+    def __init__(self, k, key, lowest=False):
+        self.k = k
+        self.key = key
+        self.lowest = lowest
+        self.seen = 0
+        self._heap = []
+        self._counter = itertools.count()
+
+    def push(self, item):
+        self.seen += 1
+        if self.k is not None and self.k <= 0:
+            return
+        score = self.key(item)
+        if self.lowest:
+            score = -score
+        # Earlier items win ties, so a later arrival ranks below them
+        entry = (score, -next(self._counter), item)
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def __len__(self):
+        return len(self._heap)
+
+class Reservoir:
+    """Uniform sample of at most `size` values from a stream, for percentiles"""
+
+    def __init__(self, size=10000, seed=None):
+        self.size = size
+        self.count = 0
+        self.values = []
+        self._random = random.Random(seed)
+
+    def add(self, value):
+        self.count += 1
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            index = self._random.randrange(self.count)
+            if index < self.size:
+                self.values[index] = value
@@ -17,6 +17,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+from markdown_sections import read_document
+
 class PersonaPerformanceTester:
     """Tests persona performance in realistic scenarios"""
     
@@ -137,40 +139,11 @@ class PersonaPerformanceTester:
     def extract_persona_info(self, filepath: Path) -> Dict:
         """Extract key information from persona file"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract metadata
-            metadata = {}
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    frontmatter = parts[1].strip()
-                    for line in frontmatter.split('\n'):
-                        if ':' in line:
-                            key, value = line.split(':', 1)
-                            metadata[key.strip()] = value.strip().strip('"\'')
-            
-            # Extract key sections
-            sections = {}
-            current_section = None
-            current_content = []
-            
-            for line in content.split('\n'):
-                if line.startswith('## '):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = line[3:].strip()
-                    current_content = []
-                else:
-                    current_content.append(line)
-            
-            if current_section:
-                sections[current_section] = '\n'.join(current_content)
+            document = read_document(filepath)
             
             return {
-                'metadata': metadata,
-                'sections': sections,
+                'metadata': document.simple_metadata(),
+                'sections': document.sections(),
                 'filepath': str(filepath),
                 'category': self.determine_category(filepath)
             }
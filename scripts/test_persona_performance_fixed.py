@@ -11,145 +11,53 @@ Tests persona performance in realistic scenarios by evaluating:
 """
 
 import os
+import argparse
 import json
 import random
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
 
+from content_scanner import ContentItem, default_cache_path, persona_scanner
+from performance_checkpoints import CheckpointStore, config_key, scenario_id
+from response_providers import HttpResponseProvider, ProviderRunner, ResponseProvider, SimulatedResponseProvider
+from response_scoring import BatchResponseScorer, batch_scoring_available, rubric_config, scenario_rubric
+from scenario_catalog import ScenarioCatalog
+from streaming_reports import JsonlWriter, TopK
+
+# Per-persona results, one JSON object per line, next to the summary JSON
+RESULTS_JSONL = 'persona_performance_results.jsonl'
+
 class PersonaPerformanceTester:
     """Tests persona performance in realistic scenarios"""
     
-    def __init__(self, personas_dir: str):
+    def __init__(self, personas_dir: str, scenarios_dir: Optional[str] = None, scenario_cache: Optional[Path] = None,
+                 facet_cache: Optional[Path] = None):
         self.personas_dir = Path(personas_dir)
+        self.scanner = persona_scanner(self.personas_dir, facet_cache)
         self.test_results = {}
+        # Scenario files live next to the personas, in .ai-ley/shared/scenarios
+        self.catalog = ScenarioCatalog(scenarios_dir or self.personas_dir.parent / 'scenarios', self.personas_dir,
+                                       scenario_cache)
         self.test_scenarios = self.load_test_scenarios()
+        self.batch_scorer = BatchResponseScorer() if batch_scoring_available() else None
+        self.last_run = {}
     
     def load_test_scenarios(self) -> Dict:
-        """Load realistic test scenarios for different persona types"""
-        return {
-            "developer": {
-                "scenarios": [
-                    {
-                        "name": "Code Review Request",
-                        "prompt": "Please review this Python function for performance issues and suggest improvements",
-                        "expected_elements": [
-                            "list comprehension suggestion",
-                            "performance analysis",
-                            "code quality improvements",
-                            "pythonic patterns",
-                            "alternative implementations"
-                        ]
-                    },
-                    {
-                        "name": "Architecture Design Question",
-                        "prompt": "Design a microservices architecture for an e-commerce platform handling 100k requests per day",
-                        "expected_elements": [
-                            "microservices breakdown",
-                            "database design",
-                            "scalability considerations",
-                            "technology stack recommendations",
-                            "deployment strategies"
-                        ]
-                    }
-                ]
-            },
-            "ai": {
-                "scenarios": [
-                    {
-                        "name": "Model Selection Advice",
-                        "prompt": "I need a customer service chatbot for technical support in multiple languages. Which model would you recommend?",
-                        "expected_elements": [
-                            "model architecture recommendations",
-                            "multilingual considerations",
-                            "training data requirements",
-                            "evaluation metrics",
-                            "deployment considerations"
-                        ]
-                    },
-                    {
-                        "name": "RAG Implementation Challenge",
-                        "prompt": "Our RAG system has 60% retrieval precision. How can we improve this?",
-                        "expected_elements": [
-                            "retrieval optimization techniques",
-                            "query understanding improvements",
-                            "embedding strategies",
-                            "evaluation methods",
-                            "specific implementation recommendations"
-                        ]
-                    }
-                ]
-            },
-            "security": {
-                "scenarios": [
-                    {
-                        "name": "Incident Response Plan",
-                        "prompt": "We detected unusual network traffic suggesting data exfiltration. What are the immediate response steps?",
-                        "expected_elements": [
-                            "immediate containment steps",
-                            "forensic procedures",
-                            "stakeholder communication",
-                            "evidence preservation",
-                            "recovery procedures"
-                        ]
-                    }
-                ]
-            },
-            "finance": {
-                "scenarios": [
-                    {
-                        "name": "Risk Assessment Request",
-                        "prompt": "Portfolio allocation: 60% equities, 30% bonds, 10% crypto. What's your risk assessment?",
-                        "expected_elements": [
-                            "risk analysis",
-                            "market conditions assessment",
-                            "diversification evaluation",
-                            "volatility considerations",
-                            "alternative allocations"
-                        ]
-                    }
-                ]
-            }
-        }
+        """Load realistic test scenarios for different persona types from the scenario catalog"""
+        return self.catalog.categories
     
-    def extract_persona_info(self, filepath: Path) -> Dict:
+    def extract_persona_info(self, filepath: Path, item: Optional[ContentItem] = None) -> Dict:
         """Extract key information from persona file"""
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Extract metadata
-            metadata = {}
-            if content.startswith('---'):
-                parts = content.split('---', 2)
-                if len(parts) >= 3:
-                    frontmatter = parts[1].strip()
-                    for line in frontmatter.split('\n'):
-                        if ':' in line:
-                            key, value = line.split(':', 1)
-                            metadata[key.strip()] = value.strip().strip('"\'')
-            
-            # Extract key sections
-            sections = {}
-            current_section = None
-            current_content = []
-            
-            for line in content.split('\n'):
-                if line.startswith('## '):
-                    if current_section:
-                        sections[current_section] = '\n'.join(current_content)
-                    current_section = line[3:].strip()
-                    current_content = []
-                else:
-                    current_content.append(line)
-            
-            if current_section:
-                sections[current_section] = '\n'.join(current_content)
+            item = item or self.scanner.item(filepath)
+            document = item.document
             
             return {
-                'metadata': metadata,
-                'sections': sections,
+                'metadata': document.simple_metadata(),
+                'sections': document.sections(),
                 'filepath': str(filepath),
+                'md5': item.md5,
                 'category': self.determine_category(filepath)
             }
             
@@ -159,18 +67,7 @@ class PersonaPerformanceTester:
     
     def determine_category(self, filepath: Path) -> str:
         """Determine persona category from file path"""
-        path_parts = str(filepath).lower()
-        
-        if '/developer/' in path_parts:
-            return 'developer'
-        elif '/ai/' in path_parts:
-            return 'ai'
-        elif '/security/' in path_parts:
-            return 'security'
-        elif '/finance/' in path_parts:
-            return 'finance'
-        else:
-            return 'general'
+        return self.catalog.category_for(filepath)
     
     def evaluate_response_quality(self, response: str, scenario: Dict) -> Dict:
         """Evaluate the quality of a persona's response to a scenario"""
@@ -186,13 +83,14 @@ class PersonaPerformanceTester:
             'weaknesses': []
         }
         
-        response_lower = response.lower()
-        expected_elements = scenario.get('expected_elements', [])
+        rubric = scenario_rubric(scenario)
+        presence = rubric.presence(response.lower())
+        expected_elements = rubric.expected_elements
         
         # Check for expected elements
         elements_found = 0
-        for element in expected_elements:
-            if any(keyword in response_lower for keyword in element.lower().split()):
+        for element, columns in zip(expected_elements, rubric.element_columns):
+            if any(presence[column] for column in columns):
                 elements_found += 1
             else:
                 evaluation['missing_elements'].append(element)
@@ -201,13 +99,11 @@ class PersonaPerformanceTester:
         evaluation['completeness_score'] = (elements_found / len(expected_elements)) * 5.0 if expected_elements else 3.0
         
         # Technical depth
-        technical_indicators = ['implement', 'configure', 'optimize', 'consider', 'recommend', 'use', 'deploy']
-        technical_score = sum(1 for indicator in technical_indicators if indicator in response_lower)
+        technical_score = sum(presence[column] for column in rubric.technical_columns)
         evaluation['technical_depth_score'] = min(5.0, technical_score / 3 * 5.0)
         
         # Professional tone
-        professional_indicators = ['first', 'second', 'next', 'additionally', 'furthermore', 'however', 'therefore']
-        professional_score = sum(1 for indicator in professional_indicators if indicator in response_lower)
+        professional_score = sum(presence[column] for column in rubric.professional_columns)
         evaluation['professional_tone_score'] = min(5.0, professional_score / 2 * 5.0)
         
         # Relevance
@@ -245,6 +141,12 @@ class PersonaPerformanceTester:
         
         return evaluation
     
+    def evaluate_responses(self, responses: List[str], scenarios: List[Dict]) -> List[Dict]:
+        """Evaluate responses[i] against scenarios[i]; batched when numpy is available"""
+        if self.batch_scorer and len(responses) > 1:
+            return self.batch_scorer.score(responses, scenarios)
+        return [self.evaluate_response_quality(response, scenario) for response, scenario in zip(responses, scenarios)]
+    
     def simulate_persona_response(self, persona: Dict, scenario: Dict) -> str:
         """Simulate a persona's response to a scenario"""
         
@@ -355,8 +257,14 @@ Based on my expertise in {category}, here are my recommendations:
 
 Would you like me to dive deeper into any specific aspect of this recommendation?"""
     
-    def test_persona_performance(self, persona: Dict) -> Dict:
-        """Test a persona's performance across relevant scenarios"""
+    def test_persona_performance(self, persona: Dict, responses: Optional[List[str]] = None,
+                                 evaluations: Optional[List[Dict]] = None) -> Dict:
+        """
+        Test a persona's performance across relevant scenarios.
+        
+        responses and evaluations (one per scenario) may be passed in when a
+        whole run was simulated and scored as one batch.
+        """
         category = persona['category']
         persona_name = persona['metadata'].get('title', 'Unknown')
         
@@ -376,13 +284,14 @@ Would you like me to dive deeper into any specific aspect of this recommendation
         scenarios = self.test_scenarios[category]['scenarios']
         total_score = 0.0
         
-        for scenario in scenarios:
-            # Simulate persona response
-            response = self.simulate_persona_response(persona, scenario)
-            
+        if responses is None:
+            # Simulate persona responses
+            responses = [self.simulate_persona_response(persona, scenario) for scenario in scenarios]
+        if evaluations is None:
             # Evaluate response quality
-            evaluation = self.evaluate_response_quality(response, scenario)
-            
+            evaluations = self.evaluate_responses(responses, scenarios)
+        
+        for scenario, response, evaluation in zip(scenarios, responses, evaluations):
             scenario_result = {
                 'scenario_name': scenario['name'],
                 'response_length': len(response.split()),
@@ -415,85 +324,134 @@ Would you like me to dive deeper into any specific aspect of this recommendation
         
         return test_results
     
-    def run_performance_tests(self, sample_size: Optional[int] = None) -> Dict:
-        """Run performance tests on personas"""
-        results = {
-            'test_date': datetime.now().isoformat(),
-            'personas_tested': [],
-            'summary': {
-                'total_personas': 0,
-                'high_performers': 0,  # Score >= 4.0
-                'average_performers': 0,  # Score 3.0-3.9
-                'low_performers': 0,  # Score < 3.0
-                'average_score': 0.0,
-                'category_performance': {}
-            }
-        }
-        
-        # Find all persona files
-        persona_files = list(self.personas_dir.rglob('*.md'))
-        persona_files = [f for f in persona_files if 'psychological-consistency-framework' not in f.name]
+    def run_performance_tests(self, sample_size: Optional[int] = None, provider: Optional[ResponseProvider] = None,
+                              concurrency: int = 8, timeout: float = 60.0, retries: int = 3,
+                              checkpoint: Optional[CheckpointStore] = None, resume: bool = False) -> Dict:
+        """
+        Run performance tests on personas, returning a result per persona plus the summary.
+        
+        Results are kept without their per-scenario responses and
+        evaluations, so only one batch of those is held at a time; use
+        iter_performance_tests to see them.
+        """
+        results = {'test_date': datetime.now().isoformat(), 'personas_tested': []}
+        aggregator = PerformanceSummary()
+        for test_result in self.iter_performance_tests(sample_size, provider, concurrency, timeout, retries,
+                                                       checkpoint, resume):
+            aggregator.add(test_result)
+            test_result.pop('scenario_results', None)
+            results['personas_tested'].append(test_result)
+        results['summary'] = aggregator.summary
+        results['provider'] = self.last_run
+        return results
+    
+    def iter_performance_tests(self, sample_size: Optional[int] = None, provider: Optional[ResponseProvider] = None,
+                               concurrency: int = 8, timeout: float = 60.0, retries: int = 3,
+                               checkpoint: Optional[CheckpointStore] = None, resume: bool = False,
+                               batch_size: int = 256):
+        """
+        Yield a test result per persona as each batch of personas finishes.
+        
+        Responses come from provider (simulated by default), generated
+        concurrently through a ProviderRunner and scored a batch of
+        `batch_size` personas at a time, so memory stays bounded however
+        many personas are tested; personas with a failed request are
+        reported and skipped. Provider and reuse statistics for the run are
+        left in self.last_run.
+        
+        With a checkpoint store every response and evaluation is saved as
+        it completes. With resume, stored evaluations for the current
+        rubric are reused and stored responses are re-scored rather than
+        regenerated.
+        """
+        # Find all persona files; items only read their file when a facet is needed
+        persona_files = list(self.scanner)
         
         # Sample personas if requested
         if sample_size and sample_size < len(persona_files):
             persona_files = random.sample(persona_files, sample_size)
         
-        total_score = 0.0
-        tested_count = 0
-        
-        for filepath in persona_files:
-            persona = self.extract_persona_info(filepath)
-            if not persona:
-                continue
-            
-            test_result = self.test_persona_performance(persona)
-            if not test_result:
+        provider = provider or SimulatedResponseProvider(self)
+        provider_key = config_key(provider.config())
+        runner = ProviderRunner(provider, concurrency=concurrency, timeout=timeout, retries=retries)
+        reused = {'cached_responses': 0, 'cached_evaluations': 0}
+        self.last_run = {**provider.config(), **runner.stats.summary(), **reused}
+        
+        batch = []
+        for position, item in enumerate(persona_files, 1):
+            persona = self.extract_persona_info(Path(item.path), item)
+            if persona and persona['category'] in self.test_scenarios:
+                batch.append(persona)
+            if len(batch) == batch_size or (position == len(persona_files) and batch):
+                yield from self._test_batch(batch, runner, provider_key, checkpoint, resume, reused)
+                self.last_run = {**provider.config(), **runner.stats.summary(), **reused}
+                batch = []
+    
+    def _test_batch(self, personas: List[Dict], runner: ProviderRunner, provider_key: str,
+                    checkpoint: Optional[CheckpointStore], resume: bool, reused: Dict):
+        """Generate, score and yield the results for one batch of personas"""
+        pairs = [(persona, scenario) for persona in personas
+                 for scenario in self.test_scenarios[persona['category']]['scenarios']]
+        keys = [(persona['md5'], scenario_id(persona['category'], scenario), provider_key) for persona, scenario in pairs]
+        rubric_keys = [config_key(rubric_config(scenario)) for _, scenario in pairs]
+        
+        outcomes = [(None, None)] * len(pairs)
+        evaluations = [None] * len(pairs)
+        if checkpoint and resume:
+            for index, key in enumerate(keys):
+                response = checkpoint.get_response(key)
+                if response is not None:
+                    outcomes[index] = (response, None)
+                    evaluations[index] = checkpoint.get_evaluation(key, rubric_keys[index])
+        
+        reused['cached_evaluations'] += sum(1 for evaluation in evaluations if evaluation is not None)
+        pending = [index for index, (response, _) in enumerate(outcomes) if response is None]
+        reused['cached_responses'] += len(pairs) - len(pending)
+        on_result = (lambda job, response: checkpoint.put_response(keys[pending[job]], response)) if checkpoint else None
+        for index, outcome in zip(pending, runner.run([pairs[index] for index in pending], on_result)):
+            outcomes[index] = outcome
+        
+        responses = [response or '' for response, _ in outcomes]
+        unscored = [index for index, (response, _) in enumerate(outcomes)
+                    if response is not None and evaluations[index] is None]
+        scored = self.evaluate_responses([responses[index] for index in unscored],
+                                         [pairs[index][1] for index in unscored])
+        for index, evaluation in zip(unscored, scored):
+            evaluations[index] = evaluation
+        if checkpoint:
+            checkpoint.put_evaluations([(keys[index], rubric_keys[index], evaluations[index]) for index in unscored])
+        
+        offset = 0
+        for persona in personas:
+            scenario_count = len(self.test_scenarios[persona['category']]['scenarios'])
+            errors = [error for _, error in outcomes[offset:offset + scenario_count] if error]
+            if errors:
+                print(f"Error testing {persona['filepath']}: {errors[0]}")
+                offset += scenario_count
                 continue
-            
-            results['personas_tested'].append(test_result)
-            tested_count += 1
-            
-            score = test_result['overall_performance']
-            total_score += score
-            
-            # Categorize performance
-            if score >= 4.0:
-                results['summary']['high_performers'] += 1
-            elif score >= 3.0:
-                results['summary']['average_performers'] += 1
-            else:
-                results['summary']['low_performers'] += 1
-            
-            # Track category performance
-            category = test_result['category']
-            if category not in results['summary']['category_performance']:
-                results['summary']['category_performance'][category] = {
-                    'count': 0,
-                    'average_score': 0.0,
-                    'scores': []
-                }
-            
-            cat_perf = results['summary']['category_performance'][category]
-            cat_perf['count'] += 1
-            cat_perf['scores'].append(score)
-            cat_perf['average_score'] = sum(cat_perf['scores']) / len(cat_perf['scores'])
-        
-        # Calculate summary statistics
-        results['summary']['total_personas'] = tested_count
-        if tested_count > 0:
-            results['summary']['average_score'] = total_score / tested_count
-        
-        return results
+            test_result = self.test_persona_performance(
+                persona, responses[offset:offset + scenario_count], evaluations[offset:offset + scenario_count]
+            )
+            offset += scenario_count
+            if test_result:
+                yield test_result
     
     def generate_performance_report(self, results: Dict) -> str:
-        """Generate a comprehensive performance report"""
+        """Generate a comprehensive performance report from a full set of results"""
+        aggregator = PerformanceSummary()
+        for test_result in results['personas_tested']:
+            aggregator.add(test_result)
+        return self.render_performance_report(results['test_date'], aggregator)
+    
+    def render_performance_report(self, test_date: str, aggregator: 'PerformanceSummary') -> str:
+        """Generate a comprehensive performance report from a streaming summary"""
         report = []
         report.append("# Persona Performance Testing Report")
-        report.append(f"Generated: {results['test_date']}")
+        report.append(f"Generated: {test_date}")
         report.append("")
         
         # Executive Summary
-        summary = results['summary']
+        summary = aggregator.summary
         report.append("## Executive Summary")
         report.append(f"- **Total Personas Tested**: {summary['total_personas']}")
         report.append(f"- **Average Performance Score**: {summary['average_score']:.2f}/5.0")
@@ -512,17 +470,81 @@ Would you like me to dive deeper into any specific aspect of this recommendation
         
         # Top Performers
         report.append("## Top Performing Personas")
-        top_performers = sorted(results['personas_tested'], key=lambda x: x['overall_performance'], reverse=True)[:10]
-        for persona in top_performers:
+        for persona in aggregator.top.items():
             report.append(f"- **{persona['persona_name']}** ({persona['category']}): {persona['overall_performance']:.2f}/5.0")
             if persona['strengths']:
-                report.append(f"  - Strengths: {', '.join(persona['strengths'][:2])}")
+                report.append(f"  - Strengths: {', '.join(persona['strengths'])}")
         report.append("")
         
         return "\n".join(report)
 
+class PerformanceSummary:
+    """Summary statistics built one persona result at a time, without keeping the results"""
+    
+    def __init__(self, top_limit: int = 10):
+        self.summary = {
+            'total_personas': 0,
+            'high_performers': 0,  # Score >= 4.0
+            'average_performers': 0,  # Score 3.0-3.9
+            'low_performers': 0,  # Score < 3.0
+            'average_score': 0.0,
+            'category_performance': {}
+        }
+        self.total_score = 0.0
+        self.category_totals = {}
+        self.top = TopK(top_limit, lambda persona: persona['overall_performance'])
+    
+    def add(self, test_result: Dict):
+        summary = self.summary
+        score = test_result['overall_performance']
+        summary['total_personas'] += 1
+        self.total_score += score
+        summary['average_score'] = self.total_score / summary['total_personas']
+        
+        # Categorize performance
+        if score >= 4.0:
+            summary['high_performers'] += 1
+        elif score >= 3.0:
+            summary['average_performers'] += 1
+        else:
+            summary['low_performers'] += 1
+        
+        # Track category performance
+        category = test_result['category']
+        if category not in summary['category_performance']:
+            summary['category_performance'][category] = {
+                'count': 0,
+                'average_score': 0.0
+            }
+            self.category_totals[category] = 0.0
+        
+        cat_perf = summary['category_performance'][category]
+        cat_perf['count'] += 1
+        self.category_totals[category] += score
+        cat_perf['average_score'] = self.category_totals[category] / cat_perf['count']
+        
+        self.top.push({
+            'persona_name': test_result['persona_name'],
+            'category': category,
+            'overall_performance': score,
+            'strengths': test_result['strengths'][:2]
+        })
+
 def main():
     """Run the persona performance testing"""
+    parser = argparse.ArgumentParser(description="Test persona performance in realistic scenarios")
+    parser.add_argument('--sample-size', type=int, default=15, help='Personas to sample (default: 15, 0 for all)')
+    parser.add_argument('--provider-url', help='HTTP endpoint to generate responses (default: simulated responses)')
+    parser.add_argument('--model', help='Model name sent to the provider')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent provider requests (default: 8)')
+    parser.add_argument('--timeout', type=float, default=60.0, help='Per-request timeout in seconds (default: 60)')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per failed request (default: 3)')
+    parser.add_argument('--seed', type=int, help='Random seed for persona sampling (use the same seed to resume a sample)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Reuse checkpointed responses and evaluations from earlier runs')
+    parser.add_argument('--no-checkpoint', action='store_true', help='Do not record responses and evaluations')
+    args = parser.parse_args()
+    
     script_dir = Path(__file__).parent
     personas_dir = script_dir.parent / '.ai-ley' / 'shared' / 'personas'
     
@@ -531,22 +553,54 @@ def main():
         return
     
     print("Starting persona performance testing...")
-    tester = PersonaPerformanceTester(str(personas_dir))
+    tester = PersonaPerformanceTester(str(personas_dir),
+                                      scenario_cache=script_dir.parent / '.project' / '.cache' / 'scenarios.pickle',
+                                      facet_cache=default_cache_path(script_dir.parent))
     
-    # Run tests on a sample of personas
-    results = tester.run_performance_tests(sample_size=15)
+    if args.seed is not None:
+        random.seed(args.seed)
     
-    # Generate report
-    report = tester.generate_performance_report(results)
+    checkpoint = None
+    if not args.no_checkpoint:
+        checkpoint_path = script_dir.parent / '.project' / '.cache' / 'persona_performance.db'
+        checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        checkpoint = CheckpointStore(checkpoint_path)
     
-    # Save results
     output_dir = script_dir.parent / '.project'
     output_dir.mkdir(exist_ok=True)
+    test_date = datetime.now().isoformat()
+    
+    # Run tests on a sample of personas, streaming results to JSONL
+    provider = HttpResponseProvider(args.provider_url, model=args.model) if args.provider_url else None
+    aggregator = PerformanceSummary()
+    jsonl_output = output_dir / RESULTS_JSONL
+    try:
+        with JsonlWriter(jsonl_output) as writer:
+            for test_result in tester.iter_performance_tests(
+                sample_size=args.sample_size or None, provider=provider,
+                concurrency=args.concurrency, timeout=args.timeout, retries=args.retries,
+                checkpoint=checkpoint, resume=args.resume
+            ):
+                writer.write(test_result)
+                aggregator.add(test_result)
+    finally:
+        tester.scanner.close()
+        if checkpoint:
+            checkpoint.close()
+    
+    # Generate report
+    report = tester.render_performance_report(test_date, aggregator)
     
-    # Save JSON results
+    # Save summary JSON
+    stats = tester.last_run
     json_output = output_dir / 'persona_performance_results.json'
     with open(json_output, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2)
+        json.dump({
+            'test_date': test_date,
+            'results_file': RESULTS_JSONL,
+            'summary': aggregator.summary,
+            'provider': stats
+        }, f, indent=2)
     
     # Save markdown report
     report_output = output_dir / 'PERSONA_PERFORMANCE_REPORT.md'
@@ -554,11 +608,15 @@ def main():
         f.write(report)
     
     print(f"\nPerformance testing complete!")
-    print(f"- Results saved to: {json_output}")
+    print(f"- Results saved to: {jsonl_output}")
+    print(f"- Summary saved to: {json_output}")
     print(f"- Report saved to: {report_output}")
-    print(f"- Personas tested: {results['summary']['total_personas']}")
-    print(f"- Average performance: {results['summary']['average_score']:.2f}/5.0")
-    print(f"- High performers: {results['summary']['high_performers']}")
+    print(f"- Personas tested: {aggregator.summary['total_personas']}")
+    print(f"- Average performance: {aggregator.summary['average_score']:.2f}/5.0")
+    print(f"- High performers: {aggregator.summary['high_performers']}")
+    print(f"- Responses: {stats['requests']} ({stats['errors']} failed) at {stats['requests_per_second']} req/s, "
+          f"p50 {stats['p50_ms']}ms, p95 {stats['p95_ms']}ms, p99 {stats['p99_ms']}ms")
+    print(f"- Reused: {stats['cached_responses']} responses, {stats['cached_evaluations']} evaluations")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
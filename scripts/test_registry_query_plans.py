@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Query-plan regression suite for registry.db
+
+Builds a synthetic registry, asserts on EXPLAIN QUERY PLAN output for each
+canonical CLI/agent query, and times each query. Exits non-zero when a plan
+regresses (table scan, temp B-tree or missing index) or a query exceeds its
+time budget.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from registry_db import connect, create_schema, optimize, upsert_item
+from registry_query import compile_query
+
+ITEM_TYPES = ('instructions', 'personas', 'prompts', 'workflows', 'schemas', 'policies', 'chatmodes')
+SOURCE_REPOS = ('awesome-copilot', 'awesome-copilot-chatmodes', 'agentic-chatmodes')
+CATEGORIES = ('developer', 'architect', 'security', 'ai', 'finance', 'design', 'data', 'devops')
+AGENT_MODES = ('general', 'framework-specific', 'language-specific', 'tool-specific')
+TAGS = ('angular', 'react', 'vue', 'java', 'javascript', 'typescript', 'python', 'go',
+        'rust', 'kubernetes', 'terraform', 'aws', 'azure', 'gcp', 'sql', 'general')
+
+# Long-tail vocabulary so named tags have realistic selectivity
+TAG_POOL = tuple(f"topic-{n}" for n in range(5000))
+
+def _query(expression):
+    sql, params = compile_query(expression)
+    return sql, list(params)
+
+def _canonical(sql, params, index, allow=()):
+    return {'sql': sql, 'params': params, 'index': index, 'allow': allow}
+
+# Access patterns the CLI and agents run, with the index each plan must use.
+# Tag-driven queries start from the term tables, so sorting their (small)
+# result set in a temp B-tree is expected.
+CANONICAL_QUERIES = {
+    'top scored by type': _canonical(
+        "SELECT type, name, path, title, summary_score FROM registry_items "
+        "WHERE type = ? ORDER BY summary_score DESC LIMIT ?",
+        ['instructions', 10],
+        'idx_type_score',
+    ),
+    'personas by path substring': _canonical(
+        "SELECT title, description FROM registry_items "
+        "WHERE type = 'personas' AND (title LIKE ? OR path LIKE ?) ORDER BY title LIMIT ?",
+        ['%developer%', '%developer%', 5],
+        'idx_type_title',
+    ),
+    'framework-specific instructions': _canonical(
+        "SELECT title, agent_mode, instruction_type FROM registry_items "
+        "WHERE type = 'instructions' AND agent_mode = ? ORDER BY title LIMIT ?",
+        ['framework-specific', 10],
+        'idx_type_agent_mode',
+    ),
+    'high scoring items': _canonical(
+        "SELECT type, title, summary_score FROM registry_items "
+        "WHERE summary_score > ? ORDER BY summary_score DESC LIMIT ?",
+        [4.0, 10],
+        'idx_score',
+    ),
+    'recently updated': _canonical(
+        "SELECT type, title, last_updated FROM registry_items "
+        "WHERE last_updated > ? ORDER BY last_updated DESC LIMIT ?",
+        ['2025-01-01', 5],
+        'idx_last_updated',
+    ),
+    'item by path': _canonical(
+        "SELECT type, name, title, md5sum FROM registry_items WHERE path = ?",
+        ['.ai-ley/shared/personas/developer/item-42.md'],
+        'sqlite_autoindex_registry_items_1',
+    ),
+    'exact tag lookup': _canonical(
+        "SELECT r.type, r.name, r.path, r.title FROM item_apply_to t "
+        "JOIN registry_items r ON r.id = t.item_id WHERE t.apply_to = ?",
+        ['typescript'],
+        'PRIMARY KEY',
+    ),
+    'prefix tag lookup': _canonical(
+        "SELECT r.type, r.name, r.path, r.title FROM item_keywords t "
+        "JOIN registry_items r ON r.id = t.item_id WHERE t.keyword >= ? AND t.keyword < ?",
+        ['java', 'javb'],
+        'PRIMARY KEY',
+    ),
+    'reverse reference lookup': _canonical(
+        "SELECT source, kind FROM item_references WHERE target = ? ORDER BY source",
+        ['.ai-ley/shared/global-instructions.md'],
+        'item_references USING PRIMARY KEY',
+    ),
+    'references from source': _canonical(
+        "SELECT target, kind FROM item_references WHERE source = ?",
+        ['.ai-ley/shared/prompts/plan.md'],
+        'idx_item_references_source',
+    ),
+    'sections of an item': _canonical(
+        "SELECT level, title, tokens FROM item_chunks WHERE path = ? ORDER BY position",
+        ['.ai-ley/shared/personas/developer/item-42.md'],
+        'item_chunks USING PRIMARY KEY',
+    ),
+    'chunk by title': _canonical(
+        "SELECT position, level, title, byte_offset, byte_length, md5sum, tokens FROM item_chunks "
+        "WHERE path = ? AND title = ? ORDER BY position LIMIT 1",
+        ['.ai-ley/shared/personas/developer/item-42.md', '2. Section'],
+        'item_chunks USING PRIMARY KEY',
+    ),
+    'cli: type listing': _canonical(*_query('type=personas limit=20'), 'idx_type_name'),
+    'cli: type within token budget': _canonical(
+        *_query('type=personas tokens<=2000 limit=20'),
+        'item_tokens USING PRIMARY KEY',
+    ),
+    'cli: ported content': _canonical(*_query('source=awesome-copilot type=chatmodes'), 'idx_source_repo'),
+    'cli: tag + score + sort': _canonical(
+        *_query('type=instructions tag=angular score>=4 sort=-score limit=10'),
+        'item_keywords USING PRIMARY KEY',
+        allow=('USE TEMP B-TREE FOR ORDER BY',),
+    ),
+}
+
+# Plan fragments that indicate a regression
+FORBIDDEN_PLAN_FRAGMENTS = ('SCAN registry_items', 'SCAN r ', 'USE TEMP B-TREE')
+
+def build_synthetic_registry(db_path, rows, seed=2025):
+    """Populate db_path with a deterministic synthetic registry"""
+    rng = random.Random(seed)
+    conn = connect(db_path)
+    cursor = conn.cursor()
+    create_schema(cursor)
+
+    for i in range(rows):
+        item_type = ITEM_TYPES[i % len(ITEM_TYPES)]
+        category = rng.choice(CATEGORIES)
+        name = f"{item_type}_{category}_item-{i}"
+        metadata = {
+            'path': f".ai-ley/shared/{item_type}/{category}/item-{i}.md",
+            'title': f"{category.title()} Item {i}",
+            'description': f"Synthetic {category} {item_type} entry {i}",
+            'version': '1.0.0',
+            'author': 'AI-LEY',
+            'md5sum': f"{rng.getrandbits(128):032x}",
+            'summaryScore': round(rng.uniform(1.0, 5.0), 1),
+            'keywords': rng.sample(TAG_POOL, 3) + ([rng.choice(TAGS)] if rng.random() < 0.05 else []),
+            'applyTo': rng.sample(TAG_POOL, 2) + ([rng.choice(TAGS)] if rng.random() < 0.05 else []),
+            'extensions': ['.md'],
+            'agentMode': rng.choice(AGENT_MODES),
+            'instructionType': 'general',
+            'guidelines': 'N/A',
+            'sourceRepo': rng.choice(SOURCE_REPOS) if rng.random() < 0.1 else None,
+        }
+        last_updated = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        upsert_item(cursor, item_type, name, metadata, last_updated)
+
+        sections = [rng.randint(50, 600) for _ in range(rng.randint(3, 10))]
+        cursor.execute(
+            "INSERT INTO item_tokens (path, md5sum, tokenizer, tokens, body_tokens) VALUES (?, ?, 'approx', ?, ?);",
+            (metadata['path'], metadata['md5sum'], sum(sections) + 60, sum(sections))
+        )
+        cursor.executemany(
+            "INSERT INTO item_chunks (path, position, level, title, byte_offset, byte_length, md5sum, tokens) "
+            "VALUES (?, ?, 2, ?, ?, ?, ?, ?);",
+            [(metadata['path'], position, f"{position + 1}. Section", 200 + sum(sections[:position]) * 4,
+              tokens * 4, metadata['md5sum'], tokens)
+             for position, tokens in enumerate(sections)]
+        )
+
+    conn.commit()
+    optimize(conn)
+    return conn
+
+def explain(conn, sql, params):
+    """Return the EXPLAIN QUERY PLAN detail lines for a query"""
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+def time_query(conn, sql, params, repeat):
+    """Median wall time in milliseconds over repeat runs"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description="Registry query-plan regression suite")
+    parser.add_argument('--rows', type=int, default=100_000, help='Synthetic registry size (default: 100000)')
+    parser.add_argument('--repeat', type=int, default=25, help='Timing repetitions per query (default: 25)')
+    parser.add_argument('--budget-ms', type=float, default=5.0, help='Per-query median time budget (default: 5.0)')
+    args = parser.parse_args()
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'registry.db')
+        print(f"=== Registry Query Plan Suite ({args.rows} rows) ===\n")
+        start = time.perf_counter()
+        conn = build_synthetic_registry(db_path, args.rows)
+        print(f"Synthetic registry built in {time.perf_counter() - start:.1f}s\n")
+
+        try:
+            for name, query in CANONICAL_QUERIES.items():
+                plan_text = ' | '.join(explain(conn, query['sql'], query['params']))
+                checked = plan_text + ' '
+                for allowed in query['allow']:
+                    checked = checked.replace(allowed, '')
+                problems = [f for f in FORBIDDEN_PLAN_FRAGMENTS if f in checked]
+                if query['index'] not in plan_text:
+                    problems.append(f"expected {query['index']}")
+
+                elapsed = time_query(conn, query['sql'], query['params'], args.repeat)
+                if elapsed > args.budget_ms:
+                    problems.append(f"{elapsed:.2f}ms over {args.budget_ms}ms budget")
+
+                status = 'FAIL' if problems else 'ok'
+                print(f"[{status:>4}] {name}: {elapsed:.3f}ms")
+                print(f"       plan: {plan_text}")
+                for problem in problems:
+                    print(f"       - {problem}")
+                failures += bool(problems)
+        finally:
+            conn.close()
+
+    print()
+    if failures:
+        print(f"=== {failures} query plan regression(s) ===")
+        sys.exit(1)
+    print("=== All query plans OK ===")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Protocol checks for HttpResponseProvider
+
+Runs the provider through ProviderRunner against StubResponseServer with
+Content-Length and with chunked replies, and against canned raw replies
+with a malformed Content-Length or chunk size. Malformed replies must come
+back as per-request errors without aborting the rest of the batch. Exits
+non-zero when a check fails.
+"""
+import socketserver
+import sys
+import threading
+
+from response_providers import HttpResponseProvider, ProviderRunner
+from response_stub_server import StubResponseServer
+
+PERSONA = {'metadata': {'title': 'Check Persona'}, 'category': 'developer'}
+SCENARIO = {'name': 'Chunked Check', 'prompt': 'Explain chunked transfer coding. ' * 20}
+
+MALFORMED_REPLIES = {
+    'malformed Content-Length': (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                                 b"Content-Length: twelve\r\nConnection: close\r\n\r\n{\"response\": \"x\"}"),
+    'malformed chunk size': (b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                             b"Transfer-Encoding: chunked\r\nConnection: close\r\n\r\nzz\r\n{}\r\n0\r\n\r\n"),
+}
+
+class _RawReplyHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        length = 0
+        while True:
+            line = self.rfile.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value.strip())
+        self.rfile.read(length)
+        self.wfile.write(self.server.reply)
+
+class RawReplyServer(socketserver.ThreadingTCPServer):
+    """Answers every request with the same canned bytes"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, reply):
+        super().__init__(('127.0.0.1', 0), _RawReplyHandler)
+        self.reply = reply
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+def run(url, jobs=4):
+    runner = ProviderRunner(HttpResponseProvider(url), concurrency=2, timeout=10, retries=1, backoff=0.01)
+    return runner.run([(PERSONA, SCENARIO)] * jobs)
+
+def main():
+    failures = 0
+
+    def report(name, problem):
+        nonlocal failures
+        print(f"[{'FAIL' if problem else 'ok':>4}] {name}{f': {problem}' if problem else ''}")
+        failures += bool(problem)
+
+    replies = {}
+    for chunked in (False, True):
+        name = 'chunked reply' if chunked else 'Content-Length reply'
+        with StubResponseServer(latency=0, chunked=chunked) as server:
+            outcomes = run(server.url)
+        errors = [error for _, error in outcomes if error]
+        replies[chunked] = [response for response, _ in outcomes]
+        if errors:
+            report(name, errors[0])
+        elif not all(response and SCENARIO['prompt'].strip() in response for response in replies[chunked]):
+            report(name, 'response does not echo the prompt')
+        else:
+            report(name, None)
+    report('chunked and Content-Length replies agree',
+           None if replies[True] == replies[False] else 'decoded bodies differ')
+
+    for name, reply in MALFORMED_REPLIES.items():
+        try:
+            with RawReplyServer(reply) as server:
+                outcomes = run(server.url)
+        except Exception as e:
+            report(name, f"batch aborted with {type(e).__name__}: {e}")
+            continue
+        if len(outcomes) != 4 or any(response is not None or not error for response, error in outcomes):
+            report(name, f"expected 4 per-request errors, got {outcomes!r}")
+        else:
+            report(name, None)
+
+    print()
+    if failures:
+        print(f"=== {failures} provider check(s) failed ===")
+        sys.exit(1)
+    print("=== All provider checks OK ===")
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ import sqlite3
 import json
 import os
 
+from registry_db import connect, find_items_by_tag
+
 def main():
     base_path = "/Users/blainemcdonnell/git/ai-ley"
     registry_path = os.path.join(base_path, ".ai-ley/shared/variables/registry.db")
@@ -14,7 +16,7 @@ def main():
         print(f"SQLite registry not found at {registry_path}")
         return
     
-    conn = sqlite3.connect(registry_path)
+    conn = connect(registry_path, readonly=True)
     cursor = conn.cursor()
     
     try:
@@ -147,6 +149,18 @@ def main():
             print("   - No JavaScript/TypeScript items found")
         print()
         
+        # Query 8: Normalized tag lookups (exact and prefix, no LIKE scans)
+        print("8. Instructions applying exactly to 'java' vs. prefix 'java':")
+        exact = find_items_by_tag(conn, 'apply_to', 'java', item_type='instructions')
+        prefixed = find_items_by_tag(conn, 'apply_to', 'java', prefix=True, item_type='instructions')
+        print(f"   - Exact matches: {len(exact)}")
+        for item_type, name, path, title in exact[:5]:
+            print(f"     {title} ({path})")
+        print(f"   - Prefix matches: {len(prefixed)}")
+        for item_type, name, path, title in prefixed[:5]:
+            print(f"     {title} ({path})")
+        print()
+        
         print("=== Test Complete ===")
         
     except Exception as e:
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Token-count and chunk index for registry items and their sections
+
+Both live in registry.db, keyed by path so they survive registry rebuilds:
+
+    item_tokens   whole file and body (after frontmatter) per item
+    item_chunks   each heading's section, heading line included, as a byte
+                  range of the file with its md5 and token estimate
+
+They are only recomputed for items whose md5sum or tokenizer changed since
+the last build, so deciding what fits a context budget is a query rather
+than a file read, and chunk_reader.py can load one section by byte range.
+The default tokenizer is an offline approximation of byte-level BPE
+vocabularies; exact tokenizers can be registered with register_tokenizer(),
+and ``tiktoken:<encoding>`` is available when the tiktoken package is
+installed.
+"""
+import argparse
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+from typing import List, NamedTuple
+
+from markdown_sections import MarkdownDocument
+from registry_db import connect, create_schema, migrate_schema
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_TOKENIZER = 'approx'
+
+# Pre-tokenizer pieces: a word with its leading space, up to three digits,
+# a run of punctuation, or whitespace
+_PIECE = re.compile(r" ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+")
+
+def approximate_tokens(text):
+    """Estimate the token count of text without a vocabulary"""
+    count = 0
+    for piece in _PIECE.findall(text):
+        word = piece.lstrip(' ')
+        if not word or word.isspace():
+            count += 1
+        elif word[0].isdigit():
+            count += 1
+        elif word[0].isalpha():
+            if word.isascii():
+                # Common words are one token; longer ones split every few letters
+                count += 1 if len(word) <= 7 else 1 + (len(word) - 4) // 5
+            else:
+                count += len(word)
+        else:
+            # Markdown punctuation such as '**', '---' and '```' merges in pairs
+            count += (len(word) + 1) // 2
+    return count
+
+TOKENIZERS = {DEFAULT_TOKENIZER: approximate_tokens}
+
+def register_tokenizer(name, count):
+    """Make count(text) -> int available as tokenizer name"""
+    TOKENIZERS[name] = count
+
+def get_tokenizer(name=DEFAULT_TOKENIZER):
+    """Token counting function for a registered name or ``tiktoken:<encoding>``"""
+    if name in TOKENIZERS:
+        return TOKENIZERS[name]
+    if name.startswith('tiktoken:'):
+        if tiktoken is None:
+            raise ValueError(f"Tokenizer '{name}' requires the tiktoken package")
+        encoding = tiktoken.get_encoding(name.split(':', 1)[1])
+        register_tokenizer(name, lambda text: len(encoding.encode(text, disallowed_special=())))
+        return TOKENIZERS[name]
+    raise ValueError(f"Unknown tokenizer '{name}'. Expected one of: {', '.join(sorted(TOKENIZERS))} "
+                     "or tiktoken:<encoding>")
+
+class Chunk(NamedTuple):
+    """A heading's section as a byte range of its file"""
+    position: int
+    level: int
+    title: str
+    byte_offset: int
+    byte_length: int
+    md5sum: str
+    tokens: int
+
+class DocumentChunks(NamedTuple):
+    tokens: int
+    body_tokens: int
+    body_offset: int
+    chunks: List[Chunk]
+
+def _byte_offsets(text, offsets):
+    """{character offset: byte offset} in the UTF-8 (surrogateescape) encoding of text"""
+    if text.isascii():
+        return {offset: offset for offset in offsets}
+    found = {}
+    position = size = 0
+    for offset in sorted(set(offsets)):
+        size += len(text[position:offset].encode('utf-8', 'surrogateescape'))
+        found[offset] = size
+        position = offset
+    return found
+
+def chunk_document(data, count):
+    """
+    Token counts and heading-delimited chunks of one markdown file's bytes.
+
+    The bytes are decoded with surrogateescape, so offsets map back to the
+    file exactly even when it is not valid UTF-8; chunk text is decoded
+    with replacement characters for counting.
+    """
+    text = data.decode('utf-8', 'surrogateescape')
+    document = MarkdownDocument(text)
+    bytes_at = _byte_offsets(text, [document.body_start] + [
+        offset for heading in document.headings for offset in (heading.start, heading.end)
+    ])
+
+    chunks = []
+    for position, heading in enumerate(document.headings):
+        start, end = bytes_at[heading.start], bytes_at[heading.end]
+        chunk = data[start:end]
+        title = heading.title
+        if not title.isascii():
+            title = title.encode('utf-8', 'surrogateescape').decode('utf-8', 'replace')
+        chunks.append(Chunk(position, heading.level, title, start, end - start,
+                            hashlib.md5(chunk).hexdigest(), count(chunk.decode('utf-8', 'replace'))))
+
+    body_offset = bytes_at[document.body_start]
+    body_tokens = count(data[body_offset:].decode('utf-8', 'replace'))
+    tokens = body_tokens if body_offset == 0 else count(data.decode('utf-8', 'replace'))
+    return DocumentChunks(tokens, body_tokens, body_offset, chunks)
+
+def update_item(cursor, path, md5sum, tokenizer, data, count):
+    """Replace the counts and chunks of one item; returns its total token count"""
+    counted = chunk_document(data, count)
+    cursor.execute("DELETE FROM item_chunks WHERE path = ?;", (path,))
+    cursor.executemany(
+        "INSERT INTO item_chunks (path, position, level, title, byte_offset, byte_length, md5sum, tokens) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?);",
+        [(path, *chunk) for chunk in counted.chunks]
+    )
+    cursor.execute(
+        "INSERT OR REPLACE INTO item_tokens (path, md5sum, tokenizer, tokens, body_tokens) VALUES (?, ?, ?, ?, ?);",
+        (path, md5sum, tokenizer, counted.tokens, counted.body_tokens)
+    )
+    return counted.tokens
+
+class TokenCountRefresh:
+    """
+    Bring the token and chunk tables up to date one item at a time.
+
+    A scan that has already read an item hands its bytes over with add(), so
+    stale counts are recomputed without opening the file again. finish()
+    prunes items that were never added and commits.
+    """
+
+    def __init__(self, conn, tokenizer=DEFAULT_TOKENIZER):
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.tokenizer = tokenizer
+        self.count = get_tokenizer(tokenizer)
+        self.stored = {path: (md5sum, name) for path, md5sum, name in
+                       self.cursor.execute("SELECT path, md5sum, tokenizer FROM item_tokens;")}
+        self.changed = set()
+
+    def add(self, path, md5sum, read):
+        """
+        Record that path is present with md5sum, recounting it when stale.
+
+        read() returns the file's bytes and is only called when the stored
+        md5sum or tokenizer differs. Returns whether the item was recounted.
+        """
+        previous = self.stored.pop(path, None)
+        if md5sum is not None and previous == (md5sum, self.tokenizer):
+            return False
+        update_item(self.cursor, path, md5sum, self.tokenizer, read(), self.count)
+        self.changed.add(path)
+        return True
+
+    def finish(self, prune=True):
+        """
+        Commit, first dropping items that were not added when prune is set.
+        Returns the set of paths whose counts were recomputed or removed.
+        """
+        if prune:
+            for path in self.stored:
+                self.cursor.execute("DELETE FROM item_chunks WHERE path = ?;", (path,))
+                self.cursor.execute("DELETE FROM item_tokens WHERE path = ?;", (path,))
+                self.changed.add(path)
+            self.stored = {}
+        self.conn.commit()
+        return self.changed
+
+def _read_file(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+def refresh_token_counts(conn, sources, base_path, tokenizer=DEFAULT_TOKENIZER, prune=True):
+    """
+    Bring the token and chunk tables up to date with (path, md5sum) pairs.
+
+    Only items whose md5sum or tokenizer differs from the stored counts are
+    re-read. With prune=True, items no longer present are dropped; pass
+    prune=False when sources is only part of the registry. Returns the set
+    of paths whose counts were recomputed or removed. Callers that already
+    hold the files' bytes should use TokenCountRefresh instead.
+    """
+    refresh = TokenCountRefresh(conn, tokenizer)
+    for path, md5sum in sources:
+        full_path = os.path.join(base_path, path)
+        try:
+            refresh.add(path, md5sum, lambda: _read_file(full_path))
+        except OSError as e:
+            print(f"Could not read {path} for token counting: {e}")
+    return refresh.finish(prune)
+
+def item_token_counts(conn, paths):
+    """{path: (tokens, body_tokens)} for the given paths that have counts"""
+    counts = {}
+    for path in paths:
+        row = conn.execute("SELECT tokens, body_tokens FROM item_tokens WHERE path = ?;", (path,)).fetchone()
+        if row:
+            counts[path] = row
+    return counts
+
+def section_token_counts(conn, path, max_level=None):
+    """(level, title, tokens) rows for the sections of one item, in document order"""
+    if max_level is None:
+        return conn.execute(
+            "SELECT level, title, tokens FROM item_chunks WHERE path = ? ORDER BY position;", (path,)
+        ).fetchall()
+    return conn.execute(
+        "SELECT level, title, tokens FROM item_chunks WHERE path = ? AND level <= ? ORDER BY position;",
+        (path, max_level)
+    ).fetchall()
+
+def main():
+    """Show or refresh token counts in registry.db"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    base_path = os.path.normpath(os.path.join(script_dir, '..'))
+
+    parser = argparse.ArgumentParser(description="Token counts for registry items and sections")
+    parser.add_argument('paths', nargs='*', help='Repository-relative item paths to show')
+    parser.add_argument('--db', default=os.path.join(base_path, '.ai-ley', 'shared', 'variables', 'registry.db'),
+                        help='Registry database (default: .ai-ley/shared/variables/registry.db)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Recount registry items whose md5sum or tokenizer changed')
+    parser.add_argument('--tokenizer', default=DEFAULT_TOKENIZER,
+                        help=f"Tokenizer for --refresh (default: {DEFAULT_TOKENIZER}; or tiktoken:<encoding>)")
+    parser.add_argument('--sections', type=int, metavar='LEVEL', nargs='?', const=6,
+                        help='Also list section counts, down to heading LEVEL (default: all)')
+    args = parser.parse_args()
+
+    # Only --refresh writes; showing counts opens the database read-only
+    try:
+        conn = connect(args.db, readonly=not args.refresh)
+    except sqlite3.OperationalError as e:
+        print(f"Error: cannot open {args.db}: {e}")
+        sys.exit(1)
+    try:
+        if args.refresh:
+            create_schema(conn.cursor())
+            migrate_schema(conn)
+            try:
+                changed = refresh_token_counts(
+                    conn, conn.execute("SELECT path, md5sum FROM registry_items;").fetchall(),
+                    base_path, args.tokenizer
+                )
+            except ValueError as e:
+                print(f"Error: {e}")
+                sys.exit(2)
+            print(f"Token counts recomputed for {len(changed)} item(s)")
+
+        counts = item_token_counts(conn, args.paths)
+        for path in args.paths:
+            if path not in counts:
+                print(f"{path}: no token counts (not in the registry?)")
+                continue
+            tokens, body_tokens = counts[path]
+            print(f"{path}: {tokens} tokens ({body_tokens} after frontmatter)")
+            if args.sections:
+                for level, title, section_tokens in section_token_counts(conn, path, args.sections):
+                    print(f"  {'  ' * (level - 1)}{title}: {section_tokens}")
+    except sqlite3.OperationalError as e:
+        print(f"Error: {e}. Rebuild the registry.")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -11,11 +11,72 @@ Validates persona industry expertise against 2025 standards including:
 """
 
 import os
+import argparse
+import hashlib
 import json
 import re
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from content_scanner import ContentScanner, default_cache_path, persona_scanner
+from markdown_sections import MarkdownDocument, read_document
+from streaming_reports import JsonlWriter, TopK
+
+# Bump when validation logic changes so cached results are recomputed
+VALIDATOR_VERSION = 2
+
+# Per-persona results, one JSON object per line, next to the summary JSON
+RESULTS_JSONL = 'persona_validation_results.jsonl'
+
+class StandardsMatcher:
+    """Find which of a fixed set of terms occur in a text in a single regex pass"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = list(dict.fromkeys(terms))
+        canonical = {}
+        for term in self.terms:
+            canonical.setdefault(term.lower(), []).append(term)
+        self.canonical = canonical
+
+        # Longest alternative first, so at each position the regex reports the
+        # longest term starting there. A shorter term starting at the same
+        # position is a prefix of it, so it is implied by that match.
+        keys = sorted(canonical, key=len, reverse=True)
+        self.implied = {key: [other for other in keys if other != key and key.startswith(other)] for key in keys}
+        self.pattern = re.compile('(?=(' + '|'.join(re.escape(key) for key in keys) + '))') if keys else None
+
+    def find(self, text: str) -> Set[str]:
+        """Terms (original spelling) occurring case-insensitively in text"""
+        if self.pattern is None:
+            return set()
+        found = set()
+        for key in {match.group(1) for match in self.pattern.finditer(text.lower())}:
+            for hit in (key, *self.implied[key]):
+                found.update(self.canonical[hit])
+        return found
+
+def _standard_terms(value) -> List[str]:
+    """Flatten a standards entry (a list, or a dict of lists) into its terms"""
+    if isinstance(value, dict):
+        return [term for terms in value.values() for term in _standard_terms(terms)]
+    return list(value or [])
+
+_worker_validator = None
+
+def _init_worker(personas_dir: str):
+    global _worker_validator
+    _worker_validator = PersonaExpertiseValidator(personas_dir)
+
+def _validate_in_worker(filepath: str) -> Tuple[Optional[Dict], Optional[str]]:
+    """Validate one persona in a pool worker, returning (result, error)"""
+    try:
+        return _worker_validator.validate_persona(Path(filepath)), None
+    except Exception as e:
+        return None, str(e)
 
 class PersonaExpertiseValidator:
     """Validates persona expertise against current industry standards"""
@@ -24,6 +85,11 @@ class PersonaExpertiseValidator:
         self.personas_dir = Path(personas_dir)
         self.validation_results = {}
         self.industry_standards_2025 = self.load_industry_standards()
+        self.technology_matchers, self.practice_matchers = self.compile_standards()
+        self.standards_hash = hashlib.md5(
+            json.dumps(self.industry_standards_2025, sort_keys=True).encode('utf-8')
+        ).hexdigest()
+        self.last_run = {'validated': 0, 'cached': 0}
     
     def load_industry_standards(self) -> Dict:
         """Load current industry standards and best practices for 2025"""
@@ -61,42 +127,23 @@ class PersonaExpertiseValidator:
             }
         }
     
-    def extract_persona_content(self, filepath: Path) -> Dict:
+    def compile_standards(self) -> Tuple[Dict[str, StandardsMatcher], Dict[str, StandardsMatcher]]:
+        """Compile each category's technologies and practices into one matcher apiece"""
+        technology_matchers = {}
+        practice_matchers = {}
+        for category, standards in self.industry_standards_2025.items():
+            technology_matchers[category] = StandardsMatcher(_standard_terms(standards.get('technologies')))
+            practice_matchers[category] = StandardsMatcher(_standard_terms(standards.get('practices')))
+        return technology_matchers, practice_matchers
+    
+    def extract_persona_content(self, filepath: Path, document: Optional[MarkdownDocument] = None) -> Dict:
         """Extract structured content from persona markdown file"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract metadata from frontmatter
-        metadata = {}
-        if content.startswith('---'):
-            parts = content.split('---', 2)
-            if len(parts) >= 3:
-                frontmatter = parts[1].strip()
-                for line in frontmatter.split('\n'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        metadata[key.strip()] = value.strip().strip('"\'')
-        
-        # Extract sections
-        sections = {}
-        current_section = None
-        current_content = []
-        
-        for line in content.split('\n'):
-            if line.startswith('## '):
-                if current_section:
-                    sections[current_section] = '\n'.join(current_content)
-                current_section = line[3:].strip()
-                current_content = []
-            else:
-                current_content.append(line)
-        
-        if current_section:
-            sections[current_section] = '\n'.join(current_content)
+        if document is None:
+            document = read_document(filepath)
         
         return {
-            'metadata': metadata,
-            'sections': sections,
+            'metadata': document.simple_metadata(),
+            'sections': document.sections(),
             'filepath': str(filepath)
         }
     
@@ -111,14 +158,14 @@ class PersonaExpertiseValidator:
         }
         
         if category in self.industry_standards_2025:
-            standards = self.industry_standards_2025[category]['technologies']
+            matcher = self.technology_matchers[category]
+            found = matcher.find(tools_section)
             
-            for tech_category, current_versions in standards.items():
-                for version in current_versions:
-                    if version.lower() in tools_section.lower():
-                        validation_results['current_technologies'].append(version)
-                    else:
-                        validation_results['missing_technologies'].append(version)
+            for version in _standard_terms(self.industry_standards_2025[category].get('technologies')):
+                if version in found:
+                    validation_results['current_technologies'].append(version)
+                else:
+                    validation_results['missing_technologies'].append(version)
             
             # Calculate score based on current vs missing technologies
             total = len(validation_results['current_technologies']) + len(validation_results['missing_technologies'])
@@ -129,7 +176,7 @@ class PersonaExpertiseValidator:
     
     def validate_industry_practices(self, persona: Dict, category: str) -> Dict:
         """Validate adherence to current industry best practices"""
-        content = ' '.join(persona['sections'].values()).lower()
+        content = ' '.join(persona['sections'].values())
         validation_results = {
             'implemented_practices': [],
             'missing_practices': [],
@@ -138,9 +185,10 @@ class PersonaExpertiseValidator:
         
         if category in self.industry_standards_2025:
             practices = self.industry_standards_2025[category].get('practices', [])
+            found = self.practice_matchers[category].find(content)
             
             for practice in practices:
-                if practice.lower() in content:
+                if practice in found:
                     validation_results['implemented_practices'].append(practice)
                 else:
                     validation_results['missing_practices'].append(practice)
@@ -171,9 +219,9 @@ class PersonaExpertiseValidator:
             'depth_score': depth_score
         }
     
-    def validate_persona(self, filepath: Path) -> Dict:
+    def validate_persona(self, filepath: Path, document: Optional[MarkdownDocument] = None) -> Dict:
         """Validate a single persona against industry standards"""
-        persona = self.extract_persona_content(filepath)
+        persona = self.extract_persona_content(filepath, document)
         
         # Determine category from file path
         category_map = {
@@ -213,71 +261,102 @@ class PersonaExpertiseValidator:
             'needs_update': overall_score < 4.0
         }
     
-    def validate_all_personas(self) -> Dict:
-        """Validate all personas in the directory"""
-        results = {
-            'validation_date': datetime.now().isoformat(),
-            'personas': [],
-            'summary': {
-                'total_personas': 0,
-                'high_quality': 0,  # Score >= 4.0
-                'needs_improvement': 0,  # Score < 4.0
-                'average_score': 0.0,
-                'categories': {}
-            }
-        }
+    def iter_validations(self, jobs: int = 1, cache: Optional['ValidationCache'] = None,
+                         scanner: Optional[ContentScanner] = None) -> Iterator[Tuple[Path, Optional[Dict], Optional[str]]]:
+        """
+        Yield (filepath, result, error) for every persona, in directory order.
         
-        # Find all persona files
-        persona_files = list(self.personas_dir.rglob('*.md'))
-        persona_files = [f for f in persona_files if 'psychological-consistency-framework' not in f.name]
+        Personas whose MD5 matches a cached result (for the same validator
+        version and standards pack) reuse it; the rest are validated, across
+        `jobs` processes when jobs > 1. At most a few batches of work are in
+        flight at once, so memory does not grow with the number of personas.
+        With a scanner backed by a facet cache, unchanged personas are
+        recognized without being read.
+        """
+        self.last_run = {'validated': 0, 'cached': 0}
+        scanner = scanner or persona_scanner(self.personas_dir)
         
-        for filepath in persona_files:
-            try:
-                validation_result = self.validate_persona(filepath)
-                results['personas'].append(validation_result)
-                
-                # Update summary statistics
-                results['summary']['total_personas'] += 1
-                score = validation_result['overall_expertise_score']
-                
-                if score >= 4.0:
-                    results['summary']['high_quality'] += 1
-                else:
-                    results['summary']['needs_improvement'] += 1
-                
-                category = validation_result['category']
-                if category not in results['summary']['categories']:
-                    results['summary']['categories'][category] = {
-                        'count': 0,
-                        'average_score': 0.0,
-                        'high_quality': 0
-                    }
-                
-                cat_stats = results['summary']['categories'][category]
-                cat_stats['count'] += 1
-                cat_stats['average_score'] = ((cat_stats['average_score'] * (cat_stats['count'] - 1)) + score) / cat_stats['count']
-                if score >= 4.0:
-                    cat_stats['high_quality'] += 1
-                    
-            except Exception as e:
-                print(f"Error validating {filepath}: {e}")
+        executor = None
+        if jobs > 1:
+            executor = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                           initargs=(str(self.personas_dir),))
+        window = deque()
         
-        # Calculate overall average score
-        if results['personas']:
-            total_score = sum(p['overall_expertise_score'] for p in results['personas'])
-            results['summary']['average_score'] = total_score / len(results['personas'])
+        def drain(limit):
+            while len(window) > limit:
+                filepath, md5sum, outcome = window.popleft()
+                if md5sum is not None:
+                    result, error = outcome.result() if executor else outcome
+                    if cache:
+                        cache.put(str(filepath), md5sum, result, error)
+                    outcome = (result, error)
+                yield (filepath, *outcome)
         
+        try:
+            for item in scanner:
+                filepath = Path(item.path)
+                try:
+                    md5sum = item.md5
+                except OSError as e:
+                    window.append((filepath, None, (None, str(e))))
+                    yield from drain(jobs * 4)
+                    continue
+                entry = cache.get(str(filepath), md5sum) if cache else None
+                if entry is not None:
+                    self.last_run['cached'] += 1
+                    window.append((filepath, None, entry))
+                else:
+                    self.last_run['validated'] += 1
+                    if executor:
+                        outcome = executor.submit(_validate_in_worker, str(filepath))
+                    else:
+                        try:
+                            outcome = (self.validate_persona(filepath, item.document), None)
+                        except Exception as e:
+                            outcome = (None, str(e))
+                    window.append((filepath, md5sum, outcome))
+                yield from drain(jobs * 4)
+            yield from drain(0)
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
+            if cache:
+                cache.commit()
+    
+    def validate_all_personas(self, jobs: int = 1, cache_path: Optional[Path] = None) -> Dict:
+        """Validate all personas, returning every result plus the summary"""
+        cache = ValidationCache(cache_path, self.standards_hash) if cache_path else None
+        aggregator = ValidationSummary()
+        results = {'validation_date': datetime.now().isoformat(), 'personas': []}
+        try:
+            for filepath, validation_result, error in self.iter_validations(jobs, cache):
+                if error is not None:
+                    print(f"Error validating {filepath}: {error}")
+                    continue
+                results['personas'].append(validation_result)
+                aggregator.add(validation_result)
+        finally:
+            if cache:
+                cache.close()
+        results['summary'] = aggregator.summary
         return results
     
     def generate_report(self, results: Dict) -> str:
-        """Generate a comprehensive validation report"""
+        """Generate a comprehensive validation report from a full set of results"""
+        aggregator = ValidationSummary(low_limit=None)
+        for persona in results['personas']:
+            aggregator.add(persona)
+        return self.render_report(results['validation_date'], aggregator)
+    
+    def render_report(self, validation_date: str, aggregator: 'ValidationSummary') -> str:
+        """Generate a comprehensive validation report from a streaming summary"""
         report = []
         report.append("# Persona Expertise Validation Report")
-        report.append(f"Generated: {results['validation_date']}")
+        report.append(f"Generated: {validation_date}")
         report.append("")
         
         # Summary statistics
-        summary = results['summary']
+        summary = aggregator.summary
         report.append("## Executive Summary")
         report.append(f"- **Total Personas**: {summary['total_personas']}")
         report.append(f"- **Average Expertise Score**: {summary['average_score']:.2f}/5.0")
@@ -296,37 +375,154 @@ class PersonaExpertiseValidator:
         
         # Top performers
         report.append("## Top Performing Personas")
-        top_personas = sorted(results['personas'], key=lambda x: x['overall_expertise_score'], reverse=True)[:10]
-        for persona in top_personas:
+        for persona in aggregator.top.items():
             report.append(f"- **{persona['persona_name']}** ({persona['category']}): {persona['overall_expertise_score']:.2f}/5.0")
         report.append("")
         
         # Personas needing improvement
         report.append("## Personas Requiring Updates")
-        low_scoring = [p for p in results['personas'] if p['overall_expertise_score'] < 4.0]
-        low_scoring.sort(key=lambda x: x['overall_expertise_score'])
-        
-        for persona in low_scoring:
+        for persona in aggregator.low.items():
             report.append(f"### {persona['persona_name']} ({persona['category']}) - {persona['overall_expertise_score']:.2f}/5.0")
             
             # Technology issues
-            if persona['technology_validation']['missing_technologies']:
+            if persona['missing_technologies']:
                 report.append("**Missing Current Technologies:**")
-                for tech in persona['technology_validation']['missing_technologies'][:5]:
+                for tech in persona['missing_technologies']:
                     report.append(f"- {tech}")
             
             # Practice issues
-            if persona['practice_validation']['missing_practices']:
+            if persona['missing_practices']:
                 report.append("**Missing Industry Practices:**")
-                for practice in persona['practice_validation']['missing_practices'][:3]:
+                for practice in persona['missing_practices']:
                     report.append(f"- {practice}")
             
             report.append("")
         
+        hidden = aggregator.low.seen - len(aggregator.low)
+        if hidden > 0:
+            report.append(f"...and {hidden} more (see {RESULTS_JSONL})")
+            report.append("")
+        
         return "\n".join(report)
 
+class ValidationCache:
+    """
+    Validation results by persona path, in SQLite so a run never loads them all.
+    
+    Entries are only valid for the validator version and standards pack they
+    were computed with; anything else is dropped when the cache is opened.
+    """
+    
+    def __init__(self, db_path: Path, standards_hash: str):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS validations (
+            path TEXT PRIMARY KEY,
+            md5 TEXT NOT NULL,
+            validator_version INTEGER NOT NULL,
+            standards_hash TEXT NOT NULL,
+            result TEXT,
+            error TEXT
+        ) WITHOUT ROWID;
+        """)
+        self.conn.execute(
+            "DELETE FROM validations WHERE validator_version != ? OR standards_hash != ?;",
+            (VALIDATOR_VERSION, standards_hash)
+        )
+        self.standards_hash = standards_hash
+    
+    def get(self, path: str, md5sum: str) -> Optional[Tuple[Optional[Dict], Optional[str]]]:
+        """Cached (result, error) for an unchanged persona, else None"""
+        row = self.conn.execute(
+            "SELECT result, error FROM validations WHERE path = ? AND md5 = ?;", (path, md5sum)
+        ).fetchone()
+        if row is None:
+            return None
+        return (json.loads(row[0]) if row[0] is not None else None), row[1]
+    
+    def put(self, path: str, md5sum: str, result: Optional[Dict], error: Optional[str]):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO validations (path, md5, validator_version, standards_hash, result, error) "
+            "VALUES (?, ?, ?, ?, ?, ?);",
+            (path, md5sum, VALIDATOR_VERSION, self.standards_hash,
+             json.dumps(result) if result is not None else None, error)
+        )
+    
+    def commit(self):
+        self.conn.commit()
+    
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
+
+class ValidationSummary:
+    """
+    Summary statistics built one result at a time.
+    
+    Keeps counters, running per-category means, the top scorers and the
+    lowest-scoring personas that need updates (up to low_limit of them;
+    None keeps all), never the full result list.
+    """
+    
+    def __init__(self, top_limit: int = 10, low_limit: Optional[int] = 50):
+        self.summary = {
+            'total_personas': 0,
+            'high_quality': 0,  # Score >= 4.0
+            'needs_improvement': 0,  # Score < 4.0
+            'average_score': 0.0,
+            'categories': {}
+        }
+        self.total_score = 0.0
+        score = lambda persona: persona['overall_expertise_score']
+        self.top = TopK(top_limit, score)
+        self.low = TopK(low_limit, score, lowest=True)
+    
+    def add(self, validation_result: Dict):
+        summary = self.summary
+        summary['total_personas'] += 1
+        score = validation_result['overall_expertise_score']
+        self.total_score += score
+        summary['average_score'] = self.total_score / summary['total_personas']
+        
+        if score >= 4.0:
+            summary['high_quality'] += 1
+        else:
+            summary['needs_improvement'] += 1
+        
+        category = validation_result['category']
+        if category not in summary['categories']:
+            summary['categories'][category] = {
+                'count': 0,
+                'average_score': 0.0,
+                'high_quality': 0
+            }
+        
+        cat_stats = summary['categories'][category]
+        cat_stats['count'] += 1
+        cat_stats['average_score'] = ((cat_stats['average_score'] * (cat_stats['count'] - 1)) + score) / cat_stats['count']
+        if score >= 4.0:
+            cat_stats['high_quality'] += 1
+        
+        # Only what the report prints is kept for the ranked lists
+        entry = {
+            'persona_name': validation_result['persona_name'],
+            'category': category,
+            'overall_expertise_score': score,
+            'missing_technologies': validation_result['technology_validation']['missing_technologies'][:5],
+            'missing_practices': validation_result['practice_validation']['missing_practices'][:3]
+        }
+        self.top.push(entry)
+        if score < 4.0:
+            self.low.push(entry)
+
 def main():
     """Run the persona expertise validation"""
+    parser = argparse.ArgumentParser(description="Validate persona expertise against 2025 industry standards")
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Validate personas in N processes (default: 1)')
+    parser.add_argument('--no-cache', action='store_true', help='Revalidate every persona, ignoring cached results')
+    args = parser.parse_args()
+    
     script_dir = Path(__file__).parent
     personas_dir = script_dir.parent / '.ai-ley' / 'shared' / 'personas'
     
@@ -337,20 +533,43 @@ def main():
     print("Starting persona expertise validation...")
     validator = PersonaExpertiseValidator(str(personas_dir))
     
-    # Run validation
-    results = validator.validate_all_personas()
-    
-    # Generate report
-    report = validator.generate_report(results)
-    
-    # Save results
     output_dir = script_dir.parent / '.project'
     output_dir.mkdir(exist_ok=True)
+    validation_date = datetime.now().isoformat()
+    
+    # Stream results to JSONL as they are produced, reusing results for unchanged personas
+    cache = None if args.no_cache else ValidationCache(
+        script_dir.parent / '.project' / '.cache' / 'persona_validation.db', validator.standards_hash
+    )
+    scanner = persona_scanner(personas_dir, default_cache_path(script_dir.parent))
+    aggregator = ValidationSummary()
+    jsonl_output = output_dir / RESULTS_JSONL
+    try:
+        with JsonlWriter(jsonl_output) as writer:
+            for filepath, validation_result, error in validator.iter_validations(jobs=args.jobs, cache=cache,
+                                                                                 scanner=scanner):
+                if error is not None:
+                    print(f"Error validating {filepath}: {error}")
+                    continue
+                writer.write(validation_result)
+                aggregator.add(validation_result)
+    finally:
+        scanner.close()
+        if cache:
+            cache.close()
+    print(f"Validated {validator.last_run['validated']} personas, reused {validator.last_run['cached']} cached results")
+    
+    # Generate report
+    report = validator.render_report(validation_date, aggregator)
     
-    # Save JSON results
+    # Save summary JSON
     json_output = output_dir / 'persona_validation_results.json'
     with open(json_output, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2)
+        json.dump({
+            'validation_date': validation_date,
+            'results_file': RESULTS_JSONL,
+            'summary': aggregator.summary
+        }, f, indent=2)
     
     # Save markdown report
     report_output = output_dir / 'PERSONA_VALIDATION_REPORT.md'
@@ -358,10 +577,11 @@ def main():
         f.write(report)
     
     print(f"\nValidation complete!")
-    print(f"- Results saved to: {json_output}")
+    print(f"- Results saved to: {jsonl_output}")
+    print(f"- Summary saved to: {json_output}")
     print(f"- Report saved to: {report_output}")
-    print(f"- Average expertise score: {results['summary']['average_score']:.2f}/5.0")
-    print(f"- Personas needing improvement: {results['summary']['needs_improvement']}")
+    print(f"- Average expertise score: {aggregator.summary['average_score']:.2f}/5.0")
+    print(f"- Personas needing improvement: {aggregator.summary['needs_improvement']}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Render {{folders.*}} / {{files.*}} placeholders from folder-structure.yaml
+
+Variables are loaded once and flattened to dotted keys. Each template is
+compiled into a list of literal and variable parts and cached by the MD5 of
+its text, so re-rendering an unchanged prompt only joins strings. Only
+placeholders under a top-level variables key (folders, files, ...) are
+resolved; others such as {{ComponentName}} are agent-facing and left as is.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from collections import OrderedDict
+
+import yaml
+
+_PLACEHOLDER = re.compile(r'\{\{\s*([A-Za-z0-9_-]+(?:\.[A-Za-z0-9_-]+)+)\s*\}\}')
+
+# Compiled templates kept per process, keyed by template text MD5
+TEMPLATE_CACHE_SIZE = 512
+
+def flatten_variables(data, prefix=''):
+    """
+    Flatten nested mappings into {dotted key: string}.
+
+    A mapping with a ``base`` entry also resolves under its own key, so
+    ``folders.templates`` means ``folders.templates.base``.
+    """
+    variables = {}
+    if not isinstance(data, dict):
+        return variables
+    for key, value in data.items():
+        dotted = f"{prefix}.{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            variables.update(flatten_variables(value, dotted))
+            if 'base' in value and not isinstance(value['base'], dict):
+                variables[dotted] = str(value['base'])
+        elif value is not None:
+            variables[dotted] = str(value)
+    return variables
+
+def load_variables(variables_path):
+    """Load and flatten folder-structure.yaml"""
+    with open(variables_path, 'r', encoding='utf-8') as f:
+        return flatten_variables(yaml.safe_load(f) or {})
+
+class CompiledTemplate:
+    """A template split into literal text and variable names"""
+
+    __slots__ = ('parts', 'names')
+
+    def __init__(self, text):
+        # parts alternates literal, variable name, literal, ... and always
+        # starts and ends with a literal
+        self.parts = _PLACEHOLDER.split(text)
+        self.names = frozenset(self.parts[1::2])
+
+    def render(self, variables, namespaces):
+        """Return (rendered text, sorted unresolved variable names)"""
+        if len(self.parts) == 1:
+            return self.parts[0], []
+
+        output = list(self.parts)
+        unresolved = set()
+        for index in range(1, len(output), 2):
+            name = output[index]
+            value = variables.get(name)
+            if value is not None:
+                output[index] = value
+            else:
+                if name.split('.', 1)[0] in namespaces:
+                    unresolved.add(name)
+                output[index] = '{{' + name + '}}'
+        return ''.join(output), sorted(unresolved)
+
+class VariableRenderer:
+    """Render templates against folder-structure.yaml, reloading it only when it changes"""
+
+    def __init__(self, variables_path, cache_size=TEMPLATE_CACHE_SIZE):
+        self.variables_path = str(variables_path)
+        self.cache_size = cache_size
+        self._templates = OrderedDict()
+        self._variables = {}
+        self._namespaces = frozenset()
+        self._variables_stat = None
+
+    @property
+    def variables(self):
+        """Flattened variables, reloaded if the YAML file changed"""
+        try:
+            stat = os.stat(self.variables_path)
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            stat_key = None
+        if stat_key != self._variables_stat:
+            self._variables = load_variables(self.variables_path) if stat_key else {}
+            self._namespaces = frozenset(key.split('.', 1)[0] for key in self._variables)
+            self._variables_stat = stat_key
+        return self._variables
+
+    def compile(self, text):
+        """Compiled template for text, from the cache when its hash was seen before"""
+        key = hashlib.md5(text.encode('utf-8')).digest()
+        template = self._templates.get(key)
+        if template is None:
+            template = CompiledTemplate(text)
+            self._templates[key] = template
+            if len(self._templates) > self.cache_size:
+                self._templates.popitem(last=False)
+        else:
+            self._templates.move_to_end(key)
+        return template
+
+    def render(self, text):
+        """Return (rendered text, unresolved variable names)"""
+        variables = self.variables
+        return self.compile(text).render(variables, self._namespaces)
+
+    def render_file(self, path):
+        """Render one file; returns (rendered text, unresolved variable names)"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return self.render(f.read())
+
+    def render_tree(self, root, suffixes=('.md',)):
+        """
+        Render every matching file under root.
+
+        Returns {relative path: (rendered text, unresolved variable names)}.
+        """
+        results = {}
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames.sort()
+            for filename in sorted(filenames):
+                if not filename.endswith(suffixes):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    results[os.path.relpath(path, root)] = self.render_file(path)
+                except (OSError, UnicodeDecodeError) as e:
+                    print(f"Could not render {path}: {e}")
+        return results
+
+def main():
+    """Render a prompt, or report unresolved variables across a directory"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    shared_dir = os.path.normpath(os.path.join(script_dir, '..', '.ai-ley', 'shared'))
+
+    parser = argparse.ArgumentParser(description="Render folder-structure.yaml variables in prompts")
+    parser.add_argument('paths', nargs='*', help='Files to render to stdout')
+    parser.add_argument('--variables', default=os.path.join(shared_dir, 'variables', 'folder-structure.yaml'),
+                        help='Variables file (default: .ai-ley/shared/variables/folder-structure.yaml)')
+    parser.add_argument('--report', nargs='?', const=os.path.join(shared_dir, 'prompts'), metavar='DIR',
+                        help='Render every prompt under DIR and list unresolved variables (default: prompts)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    renderer = VariableRenderer(args.variables)
+
+    if args.report:
+        start = time.perf_counter()
+        results = renderer.render_tree(args.report)
+        elapsed = (time.perf_counter() - start) * 1000
+        unresolved = {path: names for path, (_, names) in results.items() if names}
+        if args.json:
+            print(json.dumps({'files': len(results), 'elapsed_ms': round(elapsed, 2), 'unresolved': unresolved}, indent=2))
+        else:
+            for path, names in unresolved.items():
+                print(f"{path}: {', '.join(names)}")
+            print(f"Rendered {len(results)} files in {elapsed:.1f}ms, {len(unresolved)} with unresolved variables")
+        if unresolved:
+            sys.exit(1)
+        return
+
+    if not args.paths:
+        parser.error('give files to render or --report')
+    for path in args.paths:
+        text, unresolved = renderer.render_file(path)
+        sys.stdout.write(text)
+        for name in unresolved:
+            print(f"Unresolved variable in {path}: {{{{{name}}}}}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()